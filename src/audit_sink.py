@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Audit Sink: Write-behind buffer for append-only audit inserts"""
+import sqlite3
+import atexit
+import sys
+import threading
+import time
+
+FLUSH_ROWS = 500  # buffered statements that wake the writer immediately
+FLUSH_INTERVAL = 0.5  # seconds between background flushes
+DEAD_LETTER_MAX = 1000  # failed statements kept for inspection per sink
+
+
+class AuditSink:
+    """Buffers writes for one database and applies them with executemany
+
+    Statements are grouped by SQL text, so they must not depend on each
+    other's order across groups: appends to audit tables and commutative
+    counter updates are fine, read-modify-write logic is not. Everything
+    buffered is written in one transaction by a background thread every
+    FLUSH_INTERVAL seconds or as soon as FLUSH_ROWS statements are waiting.
+
+    Each group runs in its own savepoint, so a statement that fails (a
+    missing table or column, a constraint) only loses its own rows: they
+    are logged and kept in `dead` while every other group commits.
+    """
+
+    def __init__(self, db_path, max_rows=FLUSH_ROWS, interval=FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.interval = interval
+        self.pending = {}  # sql -> [params], in first-seen order
+        self.count = 0
+        self.lock = threading.Lock()  # guards pending/count
+        self.write_lock = threading.Lock()  # one flush at a time
+        self.wake = threading.Event()
+        self.conn = None
+        self.thread = None
+        self.written = 0
+        self.dead = []  # (sql, params, error) of statements that could not be written
+
+    def write(self, sql, params=()):
+        """Queue one statement; returns immediately"""
+        with self.lock:
+            self.pending.setdefault(sql, []).append(params)
+            self.count += 1
+            full = self.count >= self.max_rows
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        if full:
+            self.wake.set()
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of statements written
+
+        Write errors are never raised here, since callers are usually
+        readers flushing other modules' writes: failing statements are
+        dead-lettered, and a locked database requeues the whole batch
+        for the next flush.
+        """
+        with self.write_lock:
+            with self.lock:
+                batch, self.pending, self.count = self.pending, {}, 0
+            if not batch:
+                return 0
+
+            written = 0
+            try:
+                if self.conn is None:
+                    self.conn = sqlite3.connect(
+                        self.db_path, timeout=30, check_same_thread=False, isolation_level=None
+                    )
+                self.conn.execute("BEGIN")
+                for sql, rows in batch.items():
+                    written += self._write_group(sql, rows)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self.conn is not None and self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                if _is_lock_error(e):
+                    self._requeue(batch)
+                    print(f"⚠️  audit sink {self.db_path}: {e}; will retry", file=sys.stderr)
+                else:
+                    print(f"⚠️  audit sink {self.db_path}: dropped batch: {e}", file=sys.stderr)
+                    for sql, rows in batch.items():
+                        self.dead.extend((sql, params, str(e)) for params in rows)
+                    del self.dead[:-DEAD_LETTER_MAX]
+                return 0
+
+            self.written += written
+            return written
+
+    def _write_group(self, sql, rows):
+        """executemany one group in a savepoint; on failure retry row by row
+
+        Returns the rows written. Rows that still fail are dead-lettered.
+        Lock errors propagate so flush can requeue the batch.
+        """
+        try:
+            self.conn.execute("SAVEPOINT audit_group")
+            self.conn.executemany(sql, rows)
+            self.conn.execute("RELEASE audit_group")
+            return len(rows)
+        except sqlite3.Error as e:
+            self._rollback_to("audit_group", e)
+
+        written = 0
+        for params in rows:
+            try:
+                self.conn.execute("SAVEPOINT audit_row")
+                self.conn.execute(sql, params)
+                self.conn.execute("RELEASE audit_row")
+                written += 1
+            except sqlite3.Error as e:
+                self._rollback_to("audit_row", e)
+                self._dead_letter(sql, params, e)
+        return written
+
+    def _rollback_to(self, savepoint, error):
+        """Undo a failed savepoint; errors that end the transaction go up to flush"""
+        if _is_lock_error(error) or not self.conn.in_transaction:
+            raise error
+        self.conn.execute(f"ROLLBACK TO {savepoint}")
+        self.conn.execute(f"RELEASE {savepoint}")
+
+    def _dead_letter(self, sql, params, error):
+        print(f"⚠️  audit sink {self.db_path}: dropped write ({error}): {sql}", file=sys.stderr)
+        self.dead.append((sql, params, str(error)))
+        del self.dead[:-DEAD_LETTER_MAX]
+
+    def _requeue(self, batch):
+        """Put a failed batch back in front of anything queued meanwhile"""
+        with self.lock:
+            for sql, rows in self.pending.items():
+                batch.setdefault(sql, []).extend(rows)
+            self.pending = batch
+            self.count = sum(len(rows) for rows in batch.values())
+
+
+def _is_lock_error(error):
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in str(error) or "busy" in str(error)
+    )
+
+
+# database path -> AuditSink
+_SINKS = {}
+_SINKS_LOCK = threading.Lock()
+
+
+def get_sink(db_path):
+    """Sink for a database, created on first use"""
+    key = str(db_path)
+    with _SINKS_LOCK:
+        if key not in _SINKS:
+            _SINKS[key] = AuditSink(db_path)
+        return _SINKS[key]
+
+
+def write(db_path, sql, params=()):
+    """Buffer one append-only statement for db_path"""
+    get_sink(db_path).write(sql, params)
+
+
+def flush(db_path):
+    """Flush db_path's sink (if any) so a following read sees every write"""
+    sink = _SINKS.get(str(db_path))
+    return sink.flush() if sink else 0
+
+
+@atexit.register
+def flush_all():
+    """Flush every sink; registered to run at interpreter exit"""
+    for sink in list(_SINKS.values()):
+        sink.flush()
+
+
+def benchmark(db_path, rows=10000):
+    """Insert `rows` audit rows directly and through the sink; returns timings"""
+    sql = "INSERT INTO audit_benchmark (value, created_at) VALUES (?, ?)"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS audit_benchmark (id INTEGER PRIMARY KEY, value, created_at)"
+    )
+    conn.commit()
+    conn.close()
+
+    start = time.perf_counter()
+    for i in range(rows):
+        conn = sqlite3.connect(db_path)
+        conn.execute(sql, (i, time.time()))
+        conn.commit()
+        conn.close()
+    direct = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(rows):
+        write(db_path, sql, (i, time.time()))
+    flush(db_path)
+    buffered = time.perf_counter() - start
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE audit_benchmark")
+    conn.commit()
+    conn.close()
+    return {"rows": rows, "direct": direct, "buffered": buffered}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "bench"
+
+    if cmd == "bench":
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        with tempfile.TemporaryDirectory() as tmp:
+            result = benchmark(Path(tmp) / "bench.db", rows)
+        print(f"\n⏱️  {result['rows']} audit inserts")
+        print(f"  Direct (commit per row): {result['direct']:.3f}s")
+        print(f"  Buffered (audit sink):   {result['buffered']:.3f}s")
+
+    else:
+        print("Usage: audit_sink.py [bench [rows]]")
@@ -1,21 +1,30 @@
 #!/usr/bin/env python3
 """Automation Manager: Self-review, study, conclude, and report"""
 import sqlite3
+import hashlib
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import audit_sink
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
 # Import all systems for analysis
 try:
-    from maintenance_system import get_complexity_score, get_utilization_summary
-    from quality_gate import run_assessment, get_alerts
+    from maintenance_system import (
+        complexity_from_counts,
+        get_complexity_score,
+        get_utilization_summary,
+    )
+    from quality_gate import assess_system, get_alerts, grade_for, run_assessment, save_assessment
     from prevention_system import get_prevention_stats, proactive_check
     from tools_manager import list_tools, get_tool_stats
     from workspace_manager import todo_list, progress_list
     from proposal_system import list_proposals
     from session_manager import list_sessions
+    from workspace_summary import get_summary, install as install_summary
+    import trend_analysis
 except ImportError:
     pass
 
@@ -55,23 +64,165 @@ def init_db():
     conn.close()
 
 
+# === REPORT SNAPSHOT ===
+# Scalar report inputs: name -> (table it needs, aggregate query)
+SNAPSHOT_METRICS = {
+    "capabilities": ("capabilities", "SELECT COUNT(*) FROM capabilities"),
+    "total_complexity": ("capabilities", "SELECT COALESCE(SUM(complexity), 0) FROM capabilities"),
+    "dependencies": (
+        "capabilities",
+        """SELECT COALESCE(SUM(json_array_length(dependencies)), 0) FROM capabilities
+           WHERE json_valid(dependencies)""",
+    ),
+    "sessions_active": ("sessions", "SELECT COUNT(*) FROM sessions WHERE status='active'"),
+    "tool_usage": (
+        "tools",
+        "SELECT COALESCE(SUM(usage_count), 0) FROM tools WHERE status='active'",
+    ),
+    "tool_success": (
+        "tools",
+        "SELECT COALESCE(SUM(success_count), 0) FROM tools WHERE status='active'",
+    ),
+    "tool_avg_success": (
+        "tools",
+        """SELECT AVG(success_count * 1.0 / NULLIF(usage_count, 0)) FROM tools
+           WHERE status='active'""",
+    ),
+    "tools_used_week": (
+        "tool_executions",
+        """SELECT COUNT(*) FROM (SELECT tool_id FROM tool_executions
+           WHERE created_at > :week_ago GROUP BY tool_id LIMIT 5)""",
+    ),
+    "reviews_week": (
+        "code_reviews",
+        "SELECT COUNT(*) FROM code_reviews WHERE created_at > :week_ago",
+    ),
+    "todos_completed_week": (
+        "todos",
+        "SELECT COUNT(*) FROM todos WHERE status='done' AND updated_at > :week_ago",
+    ),
+    "prevention_total": ("prevention_events", "SELECT COUNT(*) FROM prevention_events"),
+    "prevention_recent": (
+        "prevention_events",
+        "SELECT COUNT(*) FROM prevention_events WHERE created_at > :week_ago",
+    ),
+}
+
+# Counts kept by workspace_summary's triggers: name -> (table, reader of its entry)
+SUMMARY_METRICS = {
+    "tools_active": ("tools", lambda e: e["status"].get("active", 0)),
+    "proposals_submitted": ("proposals", lambda e: e["status"].get("submitted", 0)),
+    "alerts_unresolved": ("degradation_alerts", lambda e: e["status"].get("unresolved", 0)),
+    "todos_total": ("todos", lambda e: e["total"]),
+    "todos_urgent": ("todos", lambda e: e["priority"].get("urgent", 0)),
+    "todos_done": ("todos", lambda e: e["status"].get("done", 0)),
+    "todos_pending": ("todos", lambda e: e["total"] - e["status"].get("done", 0)),
+}
+
+# Recent values (newest first) used for trend analysis
+SNAPSHOT_HISTORY = {
+    "complexity": (
+        "complexity_metrics",
+        """SELECT value FROM complexity_metrics WHERE metric_type='total'
+           ORDER BY created_at DESC LIMIT 10""",
+    ),
+    "quality": (
+        "assessments",
+        "SELECT score FROM assessments WHERE type='system' ORDER BY created_at DESC LIMIT 10",
+    ),
+}
+
+
+def take_snapshot(conn=None):
+    """Read every report input inside one read transaction
+
+    All metrics come from a single SELECT of scalar subqueries plus two
+    history queries, so the review, study and conclusion see the same
+    state. Todo, proposal, alert and tool counts come from get_summary()
+    in the same transaction. Metrics whose table does not exist yet are None.
+    """
+    audit_sink.flush(DB_PATH)
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
+    now = datetime.now()
+    params = {"week_ago": (now - timedelta(days=7)).isoformat()}
+
+    c = conn.cursor()
+    # Summary triggers are installed (a write) before the read transaction starts
+    install_summary(c)
+    conn.commit()
+    c.execute("BEGIN")
+    try:
+        c.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in c.fetchall()}
+
+        columns = [
+            f"({sql}) AS {name}" if table in tables else f"NULL AS {name}"
+            for name, (table, sql) in SNAPSHOT_METRICS.items()
+        ]
+        c.execute("SELECT " + ", ".join(columns), params)
+        metrics = dict(zip(SNAPSHOT_METRICS, c.fetchone()))
+
+        summary = get_summary(conn)
+        for name, (table, read) in SUMMARY_METRICS.items():
+            metrics[name] = read(summary[table]) if table in tables else None
+
+        history = {}
+        for name, (table, sql) in SNAPSHOT_HISTORY.items():
+            history[name] = [row[0] for row in c.execute(sql)] if table in tables else []
+
+        # Every metric series scanned together when numpy is available;
+        # the scan is optional, so a schema it cannot read does not fail the snapshot
+        if trend_analysis.np is not None:
+            try:
+                history["degrading_series"] = [
+                    f"{r['component']}.{r['series']}"
+                    for r in trend_analysis.analyze_series(conn)
+                    if r["degrading"]
+                ]
+            except sqlite3.Error:
+                history["degrading_series"] = []
+    finally:
+        conn.rollback()
+        if own_conn:
+            conn.close()
+
+    return {"taken_at": now.isoformat(), "metrics": metrics, "history": history}
+
+
+def snapshot_fingerprint(snapshot):
+    """Stable hash of the snapshot contents (ignores when it was taken)"""
+    payload = json.dumps([snapshot["metrics"], snapshot["history"]], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _available(metrics, *names):
+    return all(metrics.get(name) is not None for name in names)
+
+
 # === AUTOMATED REVIEW ===
-def auto_review():
+def auto_review(snapshot=None):
     """Automatically review system state"""
+    snapshot = snapshot or take_snapshot()
+    m = snapshot["metrics"]
     review = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": snapshot["taken_at"],
         "metrics": {},
         "status": {},
         "issues": [],
         "achievements": [],
     }
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     # Complexity
-    try:
-        complexity = get_complexity_score()
+    if _available(m, "capabilities", "tools_active", "sessions_active"):
+        complexity = complexity_from_counts(
+            m["capabilities"],
+            m["total_complexity"],
+            m["dependencies"],
+            m["tools_active"],
+            m["sessions_active"],
+        )
         review["metrics"]["complexity"] = complexity["score"]
         review["status"]["complexity"] = complexity["level"]
 
@@ -79,105 +230,90 @@ def auto_review():
             review["achievements"].append(f"Maintained low complexity: {complexity['score']}")
         elif complexity["level"] == "high":
             review["issues"].append(f"High complexity detected: {complexity['score']}")
-    except:
-        pass
 
     # Quality
-    try:
-        assessment = run_assessment("system", "workspace")
-        review["metrics"]["quality_score"] = assessment["score"]
-        review["metrics"]["quality_grade"] = assessment["grade"]
-
-        if assessment["grade"] in ["A", "B"]:
-            review["achievements"].append(f"High quality maintained: {assessment['grade']}")
+    if _available(m, "tools_active", "reviews_week", "proposals_submitted", "alerts_unresolved"):
+        score, findings, recommendations = assess_system(
+            m["tools_active"],
+            m["tool_avg_success"],
+            m["reviews_week"],
+            m["proposals_submitted"],
+            m["alerts_unresolved"],
+        )
+        grade = grade_for(score)
+        review["metrics"]["quality_score"] = score
+        review["metrics"]["quality_grade"] = grade
+        review["assessment"] = {
+            "score": score,
+            "grade": grade,
+            "findings": findings,
+            "recommendations": recommendations,
+        }
+
+        if grade in ["A", "B"]:
+            review["achievements"].append(f"High quality maintained: {grade}")
         else:
-            review["issues"].append(f"Quality needs improvement: {assessment['grade']}")
-    except:
-        pass
+            review["issues"].append(f"Quality needs improvement: {grade}")
 
     # Tools
-    try:
-        tools = list_tools()
-        active_tools = [t for t in tools if t[7] == "active"]
-        total_usage = sum(t[8] for t in active_tools)
-        total_success = sum(t[9] for t in active_tools)
-        success_rate = (total_success / total_usage * 100) if total_usage > 0 else 0
+    if _available(m, "tools_active"):
+        usage = m["tool_usage"]
+        success_rate = (m["tool_success"] / usage * 100) if usage > 0 else 0
 
-        review["metrics"]["tools_active"] = len(active_tools)
+        review["metrics"]["tools_active"] = m["tools_active"]
         review["metrics"]["tool_success_rate"] = round(success_rate, 1)
 
         if success_rate >= 90:
             review["achievements"].append(f"High tool success rate: {success_rate:.1f}%")
         elif success_rate < 70:
             review["issues"].append(f"Low tool success rate: {success_rate:.1f}%")
-    except:
-        pass
 
     # Todos
-    try:
-        todos = todo_list()
-        urgent = sum(1 for t in todos if t[4] == "urgent")
-        completed = sum(1 for t in todos if t[3] == "done")
-
-        review["metrics"]["todos_total"] = len(todos)
-        review["metrics"]["todos_urgent"] = urgent
-        review["metrics"]["todos_completed"] = completed
+    if _available(m, "todos_total"):
+        review["metrics"]["todos_total"] = m["todos_total"]
+        review["metrics"]["todos_urgent"] = m["todos_urgent"]
+        review["metrics"]["todos_completed"] = m["todos_done"]
 
-        if urgent > 5:
-            review["issues"].append(f"High urgent todo count: {urgent}")
-    except:
-        pass
+        if m["todos_urgent"] > 5:
+            review["issues"].append(f"High urgent todo count: {m['todos_urgent']}")
 
     # Alerts
-    try:
-        alerts = get_alerts()
-        review["metrics"]["alerts_unresolved"] = len(alerts)
+    if _available(m, "alerts_unresolved"):
+        review["metrics"]["alerts_unresolved"] = m["alerts_unresolved"]
 
-        if len(alerts) > 0:
-            review["issues"].append(f"{len(alerts)} unresolved alerts")
-    except:
-        pass
+        if m["alerts_unresolved"] > 0:
+            review["issues"].append(f"{m['alerts_unresolved']} unresolved alerts")
 
     # Prevention
-    try:
-        prev_stats = get_prevention_stats()
-        review["metrics"]["prevention_total"] = prev_stats["total_prevented"]
-        review["metrics"]["prevention_recent"] = prev_stats["recent_prevented"]
+    if _available(m, "prevention_total"):
+        review["metrics"]["prevention_total"] = m["prevention_total"]
+        review["metrics"]["prevention_recent"] = m["prevention_recent"]
 
-        if prev_stats["recent_prevented"] > 0:
+        if m["prevention_recent"] > 0:
             review["achievements"].append(
-                f"Prevented {prev_stats['recent_prevented']} issues this week"
+                f"Prevented {m['prevention_recent']} issues this week"
             )
-    except:
-        pass
 
-    conn.close()
     return review
 
 
 # === AUTOMATED STUDY ===
-def auto_study():
+def auto_study(snapshot=None):
     """Study trends and patterns"""
+    snapshot = snapshot or take_snapshot()
+    m = snapshot["metrics"]
     study = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": snapshot["taken_at"],
         "trends": {},
         "patterns": [],
         "insights": [],
     }
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     # Complexity trend
-    c.execute(
-        """SELECT value, created_at FROM complexity_metrics 
-                 WHERE metric_type="total" 
-                 ORDER BY created_at DESC LIMIT 10"""
-    )
-    complexity_history = c.fetchall()
+    complexity_history = snapshot["history"]["complexity"]
     if len(complexity_history) >= 2:
-        recent = complexity_history[0][0]
-        older = complexity_history[-1][0]
+        recent = complexity_history[0]
+        older = complexity_history[-1]
         if recent < older:
             study["trends"]["complexity"] = "decreasing"
             study["insights"].append("Complexity is decreasing - good!")
@@ -188,15 +324,10 @@ def auto_study():
             study["trends"]["complexity"] = "stable"
 
     # Quality trend
-    c.execute(
-        """SELECT score, created_at FROM assessments 
-                 WHERE type="system" 
-                 ORDER BY created_at DESC LIMIT 10"""
-    )
-    quality_history = c.fetchall()
+    quality_history = snapshot["history"]["quality"]
     if len(quality_history) >= 2:
-        recent_avg = sum(q[0] for q in quality_history[:3]) / 3
-        older_avg = sum(q[0] for q in quality_history[-3:]) / 3
+        recent_avg = sum(quality_history[:3]) / 3
+        older_avg = sum(quality_history[-3:]) / 3
         if recent_avg > older_avg:
             study["trends"]["quality"] = "improving"
             study["insights"].append("Quality is improving - keep it up!")
@@ -207,34 +338,26 @@ def auto_study():
             study["trends"]["quality"] = "stable"
 
     # Tool usage patterns
-    c.execute(
-        """SELECT tool_id, COUNT(*) as usage 
-                 FROM tool_executions 
-                 WHERE created_at > datetime("now", "-7 days")
-                 GROUP BY tool_id 
-                 ORDER BY usage DESC LIMIT 5"""
-    )
-    top_tools = c.fetchall()
-    if top_tools:
+    if m["tools_used_week"]:
         study["patterns"].append(
-            f"Most used tools: {len(top_tools)} tools account for majority of usage"
+            f"Most used tools: {m['tools_used_week']} tools account for majority of usage"
         )
 
-    # Todo completion rate
-    c.execute(
-        """SELECT COUNT(*) FROM todos WHERE status="done" 
-                 AND updated_at > datetime("now", "-7 days")"""
-    )
-    completed_week = c.fetchone()[0]
-    c.execute('SELECT COUNT(*) FROM todos WHERE status!="done"')
-    pending = c.fetchone()[0]
+    # Degrading series from the vectorized scan
+    degrading = snapshot["history"].get("degrading_series")
+    if degrading:
+        study["trends"]["series"] = "degrading"
+        study["insights"].append(
+            f"{len(degrading)} metric series degrading: {', '.join(degrading[:5])}"
+        )
 
+    # Todo completion rate
+    completed_week = m["todos_completed_week"] or 0
     if completed_week > 0:
         study["patterns"].append(f"Completed {completed_week} todos this week")
-        if pending > completed_week * 2:
+        if m["todos_pending"] > completed_week * 2:
             study["insights"].append("Todo backlog growing - prioritize completion")
 
-    conn.close()
     return study
 
 
@@ -295,6 +418,10 @@ def auto_conclude(review, study):
         conclusion["recommendations"].append("Investigate and fix failing tools")
         conclusion["action_items"].append("Run: python3 tools_manager.py tool list")
 
+    if study["trends"].get("series") == "degrading":
+        conclusion["recommendations"].append("Investigate degrading metric series")
+        conclusion["action_items"].append("Run: python3 trend_analysis.py alert")
+
     if study["trends"].get("quality") == "degrading":
         conclusion["recommendations"].append("Focus on quality improvement")
         conclusion["action_items"].append("Run: ./ws check")
@@ -308,115 +435,186 @@ def auto_conclude(review, study):
 
 
 # === GENERATE REPORT ===
-def generate_report(period="daily"):
-    """Generate comprehensive automated report"""
-    print(f"\n{'='*70}")
-    print(f"AUTOMATED SYSTEM REPORT - {period.upper()}")
-    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*70}\n")
-
-    # Review
-    print("📊 SYSTEM REVIEW")
-    print("-" * 70)
-    review = auto_review()
-
-    print("\nMetrics:")
+STATUS_ICONS = {
+    "excellent": "🟢",
+    "healthy": "🟢",
+    "needs_attention": "🟡",
+    "critical": "🔴",
+}
+
+
+def reports_dir():
+    """Directory holding the cached report artifacts (next to the database)"""
+    return Path(DB_PATH).parent / "reports"
+
+
+def period_key(period, now=None):
+    """Window a cached report stays valid for: the day, ISO week or month"""
+    now = now or datetime.now()
+    if period == "weekly":
+        year, week, _ = now.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return now.strftime("%Y-%m")
+    return now.strftime("%Y-%m-%d")
+
+
+def render_markdown(report, period):
+    """Render a report as Markdown"""
+    review, study, conclusion = report["review"], report["study"], report["conclusion"]
+    lines = [
+        f"# Automated System Report - {period.title()}",
+        "",
+        f"Generated: {report['generated_at'][:19].replace('T', ' ')}",
+        "",
+        "## 📊 System Review",
+        "",
+    ]
     for key, value in review["metrics"].items():
-        print(f"  • {key.replace('_', ' ').title()}: {value}")
-
+        lines.append(f"- {key.replace('_', ' ').title()}: {value}")
     if review["achievements"]:
-        print("\n✅ Achievements:")
-        for achievement in review["achievements"]:
-            print(f"  • {achievement}")
-
+        lines += ["", "### ✅ Achievements", ""] + [f"- {a}" for a in review["achievements"]]
     if review["issues"]:
-        print("\n⚠️  Issues:")
-        for issue in review["issues"]:
-            print(f"  • {issue}")
-
-    # Study
-    print(f"\n{'='*70}")
-    print("🔍 TREND ANALYSIS")
-    print("-" * 70)
-    study = auto_study()
+        lines += ["", "### ⚠️ Issues", ""] + [f"- {i}" for i in review["issues"]]
 
+    lines += ["", "## 🔍 Trend Analysis"]
     if study["trends"]:
-        print("\nTrends:")
+        lines += ["", "### Trends", ""]
         for metric, trend in study["trends"].items():
             icon = (
                 "📈"
                 if trend in ["improving", "decreasing"]
                 else "📉" if trend in ["degrading", "increasing"] else "➡️"
             )
-            print(f"  {icon} {metric.title()}: {trend}")
-
+            lines.append(f"- {icon} {metric.title()}: {trend}")
     if study["patterns"]:
-        print("\nPatterns:")
-        for pattern in study["patterns"]:
-            print(f"  • {pattern}")
-
+        lines += ["", "### Patterns", ""] + [f"- {p}" for p in study["patterns"]]
     if study["insights"]:
-        print("\nInsights:")
-        for insight in study["insights"]:
-            print(f"  💡 {insight}")
-
-    # Conclusion
-    print(f"\n{'='*70}")
-    print("🎯 CONCLUSIONS & RECOMMENDATIONS")
-    print("-" * 70)
-    conclusion = auto_conclude(review, study)
-
-    status_icons = {
-        "excellent": "🟢",
-        "healthy": "🟢",
-        "needs_attention": "🟡",
-        "critical": "🔴",
-    }
-    icon = status_icons.get(conclusion["overall_status"], "⚪")
-    print(f"\nOverall Status: {icon} {conclusion['overall_status'].upper()}")
-
+        lines += ["", "### Insights", ""] + [f"- 💡 {i}" for i in study["insights"]]
+
+    icon = STATUS_ICONS.get(conclusion["overall_status"], "⚪")
+    lines += [
+        "",
+        "## 🎯 Conclusions & Recommendations",
+        "",
+        f"Overall Status: {icon} {conclusion['overall_status'].upper()}",
+    ]
     if conclusion["key_findings"]:
-        print("\nKey Findings:")
-        for finding in conclusion["key_findings"]:
-            print(f"  • {finding}")
-
+        lines += ["", "### Key Findings", ""] + [f"- {f}" for f in conclusion["key_findings"]]
     if conclusion["recommendations"]:
-        print("\nRecommendations:")
-        for i, rec in enumerate(conclusion["recommendations"], 1):
-            print(f"  {i}. {rec}")
-
+        lines += ["", "### Recommendations", ""]
+        lines += [f"{i}. {rec}" for i, rec in enumerate(conclusion["recommendations"], 1)]
     if conclusion["action_items"]:
-        print("\nAction Items:")
-        for i, action in enumerate(conclusion["action_items"], 1):
-            print(f"  {i}. {action}")
+        lines += ["", "### Action Items", ""]
+        lines += [f"{i}. {item}" for i, item in enumerate(conclusion["action_items"], 1)]
 
-    print(f"\n{'='*70}\n")
+    return "\n".join(lines) + "\n"
 
-    # Save report
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
 
-    report_data = {"review": review, "study": study, "conclusion": conclusion}
+def load_cached_report(period):
+    """Cached report artifact for a period, or None"""
+    path = reports_dir() / f"{period}.json"
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
 
-    summary = f"Status: {conclusion['overall_status']}, Issues: {len(review['issues'])}, Achievements: {len(review['achievements'])}"
-    recommendations = json.dumps(conclusion["recommendations"])
 
-    c.execute(
-        """INSERT INTO automated_reports (report_type, period, data, summary, recommendations, created_at)
-                 VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            "system_review",
-            period,
-            json.dumps(report_data),
-            summary,
-            recommendations,
-            datetime.now().isoformat(),
-        ),
-    )
+def _write_artifacts(period, cached, markdown):
+    directory = reports_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{period}.json").write_text(json.dumps(cached, indent=2))
+    (directory / f"{period}.md").write_text(markdown)
 
-    conn.commit()
-    conn.close()
 
+def build_report(period="daily", refresh=False):
+    """Build (or reuse) a report; returns (report_data, markdown, from_cache)
+
+    Every input is read in one snapshot on one connection. If the cached
+    artifact for this period window was built from identical data it is
+    returned as-is; otherwise the report, its assessment row and the
+    JSON/Markdown artifacts are written.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        snapshot = take_snapshot(conn)
+        key = period_key(period, datetime.fromisoformat(snapshot["taken_at"]))
+        fingerprint = snapshot_fingerprint(snapshot)
+
+        cached = load_cached_report(period)
+        if (
+            not refresh
+            and cached
+            and cached.get("period_key") == key
+            and cached.get("fingerprint") == fingerprint
+        ):
+            markdown_path = reports_dir() / f"{period}.md"
+            markdown = markdown_path.read_text() if markdown_path.exists() else None
+            return cached["report"], markdown or render_markdown(cached["report"], period), True
+
+        review = auto_review(snapshot)
+        study = auto_study(snapshot)
+        conclusion = auto_conclude(review, study)
+        report_data = {
+            "generated_at": snapshot["taken_at"],
+            "review": review,
+            "study": study,
+            "conclusion": conclusion,
+        }
+
+        summary = (
+            f"Status: {conclusion['overall_status']}, Issues: {len(review['issues'])}, "
+            f"Achievements: {len(review['achievements'])}"
+        )
+        c = conn.cursor()
+        assessment = review.get("assessment")
+        if assessment:
+            save_assessment(
+                c,
+                "system",
+                "workspace",
+                assessment["score"],
+                assessment["grade"],
+                assessment["findings"],
+                assessment["recommendations"],
+            )
+        c.execute(
+            """INSERT INTO automated_reports (report_type, period, data, summary, recommendations, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                "system_review",
+                period,
+                json.dumps(report_data),
+                summary,
+                json.dumps(conclusion["recommendations"]),
+                datetime.now().isoformat(),
+            ),
+        )
+        conn.commit()
+
+        # The saved assessment is part of the next snapshot, so fingerprint after it
+        markdown = render_markdown(report_data, period)
+        cached = {
+            "period": period,
+            "period_key": key,
+            "fingerprint": snapshot_fingerprint(take_snapshot(conn)),
+            "report": report_data,
+        }
+        _write_artifacts(period, cached, markdown)
+        return report_data, markdown, False
+    finally:
+        conn.close()
+
+
+def generate_report(period="daily", refresh=False):
+    """Generate comprehensive automated report"""
+    report_data, markdown, from_cache = build_report(period, refresh)
+    print()
+    print(markdown)
+    if from_cache:
+        print(f"(cached: {reports_dir() / (period + '.md')})\n")
+    else:
+        print(f"✓ Saved {reports_dir() / (period + '.md')}\n")
     return report_data
 
 
@@ -497,7 +695,7 @@ def quick_health_check():
 
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  Report:   python automation_manager.py report [daily|weekly|monthly]")
+        print("  Report:   python automation_manager.py report [daily|weekly|monthly] [--refresh]")
         print("  Review:   python automation_manager.py review")
         print("  Study:    python automation_manager.py study")
         print("  Conclude: python automation_manager.py conclude")
@@ -508,8 +706,9 @@ def quick_health_check():
     cmd = sys.argv[1]
 
     if cmd == "report":
-        period = sys.argv[2] if len(sys.argv) > 2 else "daily"
-        generate_report(period)
+        args = [a for a in sys.argv[2:] if a != "--refresh"]
+        period = args[0] if args else "daily"
+        generate_report(period, refresh="--refresh" in sys.argv)
 
     elif cmd == "review":
         review = auto_review()
@@ -520,8 +719,9 @@ def quick_health_check():
         print(json.dumps(study, indent=2))
 
     elif cmd == "conclude":
-        review = auto_review()
-        study = auto_study()
+        snapshot = take_snapshot()
+        review = auto_review(snapshot)
+        study = auto_study(snapshot)
         conclusion = auto_conclude(review, study)
         print(json.dumps(conclusion, indent=2))
 
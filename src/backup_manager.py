@@ -1,108 +1,289 @@
 #!/usr/bin/env python3
 """Backup Manager: Automated database backups with rotation"""
-import shutil
+import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
 
+import backup_store
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 BACKUP_DIR = Path(__file__).parent / "backups"
 
+BACKUP_PAGES = 256  # pages copied per backup step
+BACKUP_PAUSE = 0.02  # seconds between steps, so writers get the lock
+BACKUP_MAX_RESTARTS = 3  # copies restarted by concurrent writes before copying in one step
+
+# Backups kept per grandfather-father-son tier by rotate_backups
+RETENTION = {"hourly": 0, "daily": 7, "weekly": 4, "monthly": 12}
+
+
+class _Restarted(Exception):
+    """Raised from the progress callback to abandon a paged copy"""
+
+
+def copy_database(
+    source, target, pages=BACKUP_PAGES, pause=BACKUP_PAUSE, max_restarts=BACKUP_MAX_RESTARTS
+):
+    """Copy a live SQLite database with the online backup API
+
+    Pages are copied `pages` at a time with a short pause between steps,
+    so other connections keep reading and writing. SQLite restarts the
+    copy whenever another connection writes to the source, so the result
+    is always a consistent snapshot (WAL contents included). A source
+    that is written faster than it can be copied would restart forever,
+    so after `max_restarts` the copy is redone in one step, which in WAL
+    mode reads a snapshot without blocking writers.
+    Returns {"pages", "steps", "restarts", "seconds"}.
+    """
+    stats = {"steps": 0, "restarts": 0}
+    last = None
+
+    def progress(status, remaining, total):
+        nonlocal last
+        stats["steps"] += 1
+        if last is not None and remaining > last:
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _Restarted()
+        last = remaining
+        if remaining and pause:
+            time.sleep(pause)
+
+    start = time.perf_counter()
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except _Restarted:
+            src.backup(dst)
+            stats["steps"] += 1
+        stats["pages"] = dst.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
 
-def backup_database():
-    """Create timestamped backup"""
+
+def integrity_check(path):
+    """'ok' or the problems PRAGMA integrity_check reports, joined by newlines"""
+    conn = sqlite3.connect(path)
+    rows = conn.execute("PRAGMA integrity_check").fetchall()
+    conn.close()
+    return "\n".join(row[0] for row in rows)
+
+
+def backup_database(verify=False, pages=BACKUP_PAGES, pause=BACKUP_PAUSE, full=False):
+    """Create timestamped backup while the workspace stays in use
+
+    The snapshot is written to a .part file first, so a crash never
+    leaves a torn backup behind. By default it then goes into the
+    deduplicating backup_store, which writes only chunks that changed
+    since earlier backups; with full it is kept as a plain .db copy.
+    With verify, the snapshot must pass integrity_check or it is
+    discarded. Returns the stats dict of copy_database plus name, path
+    (the .db file or store manifest), bytes, bytes_written, mb_per_s
+    and integrity (None when not verified); path is None if
+    verification failed.
+    """
     BACKUP_DIR.mkdir(exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = BACKUP_DIR / f"workspace_{timestamp}.db"
+    partial = backup_path.with_name(backup_path.name + ".part")
 
-    shutil.copy2(DB_PATH, backup_path)
-    size = backup_path.stat().st_size / 1024
-    print(f"✓ Backup created: {backup_path.name} ({size:.1f} KB)")
-    return backup_path
+    stats = copy_database(DB_PATH, partial, pages, pause)
+    stats["bytes"] = partial.stat().st_size
+    stats["mb_per_s"] = stats["bytes"] / 1048576 / stats["seconds"] if stats["seconds"] else 0.0
+    stats["integrity"] = integrity_check(partial) if verify else None
 
+    if verify and stats["integrity"] != "ok":
+        partial.unlink()
+        stats["path"] = None
+        print(f"✗ Backup failed integrity check: {stats['integrity'].splitlines()[0]}")
+        return stats
 
-def rotate_backups():
-    """Keep 7 daily, 4 weekly, 12 monthly"""
-    if not BACKUP_DIR.exists():
-        return
+    stats["name"] = backup_path.stem
+    if full:
+        partial.replace(backup_path)
+        stats["path"] = backup_path
+        stats["bytes_written"] = stats["bytes"]
+        print(f"✓ Backup created: {backup_path.name} ({stats['bytes'] / 1024:.1f} KB)")
+    else:
+        stored = backup_store.put(partial, backup_path.stem)
+        partial.unlink()
+        stats["path"] = backup_store.manifest_path(backup_path.stem)
+        stats["bytes_written"] = stored["bytes_written"]
+        print(
+            f"✓ Backup stored: {backup_path.stem} ({stats['bytes'] / 1024:.1f} KB, "
+            f"{stored['written']}/{len(stored['chunks'])} chunks new, "
+            f"{stored['bytes_written'] / 1024:.1f} KB written)"
+        )
+    print(
+        f"  {stats['pages']} pages in {stats['steps']} steps, {stats['seconds']:.2f}s "
+        f"({stats['mb_per_s']:.1f} MB/s){', integrity ok' if verify else ''}"
+    )
+    return stats
+
+
+def _backup_files():
+    """Full .db copies and backup_store manifests, oldest first"""
+    files = list(BACKUP_DIR.glob("workspace_*.db")) if BACKUP_DIR.exists() else []
+    stored = [backup_store.manifest_path(name) for name in backup_store.list_names()]
+    return sorted(files + stored, key=lambda p: p.stem)
 
-    backups = sorted(BACKUP_DIR.glob("workspace_*.db"))
-    now = datetime.now()
-
-    keep = set()
-    # Keep last 7 days
-    for i in range(7):
-        date = (now - timedelta(days=i)).strftime("%Y%m%d")
-        for b in backups:
-            if date in b.name:
-                keep.add(b)
-                break
-
-    # Keep 4 weekly (Mondays)
-    for i in range(4):
-        date = now - timedelta(weeks=i)
-        monday = date - timedelta(days=date.weekday())
-        date_str = monday.strftime("%Y%m%d")
-        for b in backups:
-            if date_str in b.name:
-                keep.add(b)
-                break
-
-    # Keep 12 monthly (1st of month)
-    for i in range(12):
-        month = now.month - i
-        year = now.year
-        while month < 1:
-            month += 12
-            year -= 1
-        date_str = f"{year}{month:02d}01"
-        for b in backups:
-            if date_str in b.name:
-                keep.add(b)
-                break
-
-    # Remove old backups
-    removed = 0
-    for backup in backups:
-        if backup not in keep:
-            backup.unlink()
-            removed += 1
-
-    print(f"✓ Rotation: kept {len(keep)}, removed {removed}")
+
+def _remove_backup(path):
+    if path.suffix == ".json":
+        backup_store.delete(path.stem)
+    else:
+        path.unlink()
+
+
+def backup_time(path):
+    """Timestamp encoded in a backup name (workspace_YYYYmmdd_HHMMSS), or None"""
+    # Sliced by hand: strptime dominates planning time over thousands of backups
+    stamp = path.stem[len("workspace_") :]
+    if len(stamp) != 15 or stamp[8] != "_" or not (stamp[:8] + stamp[9:]).isdigit():
+        return None
+    try:
+        return datetime(
+            int(stamp[:4]),
+            int(stamp[4:6]),
+            int(stamp[6:8]),
+            int(stamp[9:11]),
+            int(stamp[11:13]),
+            int(stamp[13:15]),
+        )
+    except ValueError:
+        return None
+
+
+# Grandfather-father-son bucket keys, finest first
+_BUCKETS = {
+    "hourly": lambda t: (t.year, t.month, t.day, t.hour),
+    "daily": lambda t: (t.year, t.month, t.day),
+    "weekly": lambda t: t.isocalendar()[:2],
+    "monthly": lambda t: (t.year, t.month),
+}
+
+
+def plan_rotation(backups, policy=None):
+    """Decide which backups a grandfather-father-son policy keeps
+
+    Timestamps are parsed once and walked newest first; the newest backup
+    in each of the last `policy[tier]` hourly/daily/weekly/monthly buckets
+    that contain a backup is kept, so gaps (no backup on a Monday or the
+    1st) never leave a tier empty. Backups whose names carry no timestamp
+    are always kept. Returns {"keep": {path: [tiers]}, "delete": [paths]}.
+    """
+    policy = RETENTION if policy is None else policy
+    index = []
+    keep = {}
+    for path in backups:
+        stamp = backup_time(path)
+        if stamp is None:
+            keep[path] = ["undated"]
+        else:
+            index.append((stamp, path))
+    index.sort(reverse=True)
+
+    seen = {tier: set() for tier in _BUCKETS}
+    delete = []
+    for stamp, path in index:
+        tiers = []
+        for tier, bucket in _BUCKETS.items():
+            buckets = seen[tier]
+            if len(buckets) < policy.get(tier, 0):
+                key = bucket(stamp)
+                if key not in buckets:
+                    buckets.add(key)
+                    tiers.append(tier)
+        if tiers:
+            keep[path] = tiers
+        else:
+            delete.append(path)
+    return {"keep": keep, "delete": delete}
+
+
+def rotate_backups(dry_run=False, policy=None):
+    """Apply the RETENTION policy (7 daily, 4 weekly, 12 monthly by default)
+
+    With dry_run the plan is printed and returned without deleting.
+    """
+    backups = _backup_files()
+    if not backups:
+        return None
+
+    plan = plan_rotation(backups, policy)
+    if dry_run:
+        for path, tiers in sorted(plan["keep"].items(), key=lambda item: item[0].stem):
+            print(f"  keep    {path.stem:30} {', '.join(tiers)}")
+        for path in sorted(plan["delete"], key=lambda p: p.stem):
+            print(f"  delete  {path.stem}")
+        print(f"✓ Dry run: would keep {len(plan['keep'])}, remove {len(plan['delete'])}")
+        return plan
+
+    # Delete in bulk: every file and manifest first, then one chunk collection
+    for path in plan["delete"]:
+        _remove_backup(path)
+    chunks, freed = backup_store.gc() if plan["delete"] else (0, 0)
+
+    print(f"✓ Rotation: kept {len(plan['keep'])}, removed {len(plan['delete'])}")
+    if chunks:
+        print(f"✓ Freed {chunks} unreferenced chunks ({freed / 1024:.1f} KB)")
+    return plan
 
 
 def list_backups():
     """List all backups"""
-    if not BACKUP_DIR.exists():
+    backups = _backup_files()[::-1]
+    if not backups:
         print("No backups found")
         return
 
-    backups = sorted(BACKUP_DIR.glob("workspace_*.db"), reverse=True)
     print(f"\n📦 BACKUPS ({len(backups)} total)")
     print("-" * 60)
     for b in backups[:10]:
-        size = b.stat().st_size / 1024
+        if b.suffix == ".json":
+            name, size = b.stem, backup_store.get_manifest(b.stem)["size"] / 1024
+        else:
+            name, size = b.name, b.stat().st_size / 1024
         mtime = datetime.fromtimestamp(b.stat().st_mtime)
         age = datetime.now() - mtime
-        print(f"  {b.name:30} {size:6.1f} KB  {age.days}d ago")
+        print(f"  {name:30} {size:6.1f} KB  {age.days}d ago")
     if len(backups) > 10:
         print(f"  ... and {len(backups) - 10} more")
 
 
 def restore_backup(backup_name):
-    """Restore from backup"""
+    """Restore from a full .db backup or a backup_store backup"""
     backup_path = BACKUP_DIR / backup_name
+    stored = None
     if not backup_path.exists():
-        print(f"✗ Backup not found: {backup_name}")
-        return False
+        stored = backup_store.get_manifest(Path(backup_name).stem)
+        if stored is None:
+            print(f"✗ Backup not found: {backup_name}")
+            return False
 
     # Create safety backup of current
     safety = (
         DB_PATH.parent / f"workspace_before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
     )
-    shutil.copy2(DB_PATH, safety)
+    copy_database(DB_PATH, safety)
 
-    # Restore
-    shutil.copy2(backup_path, DB_PATH)
+    # Stored backups are streamed back into a scratch file first
+    if stored:
+        backup_path = DB_PATH.parent / f".{stored['name']}.restore"
+        backup_store.restore(stored["name"], backup_path)
+
+    # Restore through the backup API too, so open connections see a consistent database
+    try:
+        copy_database(backup_path, DB_PATH, pages=-1, pause=0)
+    finally:
+        if stored:
+            backup_path.unlink()
     print(f"✓ Restored from: {backup_name}")
     print(f"✓ Safety backup: {safety.name}")
     return True
@@ -110,12 +291,11 @@ def restore_backup(backup_name):
 
 if __name__ == "__main__":
     import sys
-    from datetime import timedelta
 
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  backup_manager.py backup   - Create backup")
-        print("  backup_manager.py rotate   - Rotate old backups")
+        print("  backup_manager.py backup [--verify] [--full] - Create backup")
+        print("  backup_manager.py rotate [--dry-run] - Rotate old backups")
         print("  backup_manager.py list     - List backups")
         print("  backup_manager.py restore <name> - Restore backup")
         sys.exit(1)
@@ -123,10 +303,12 @@ def restore_backup(backup_name):
     cmd = sys.argv[1]
 
     if cmd == "backup":
-        backup_database()
+        stats = backup_database(verify="--verify" in sys.argv, full="--full" in sys.argv)
+        if stats["path"] is None:
+            sys.exit(1)
         rotate_backups()
     elif cmd == "rotate":
-        rotate_backups()
+        rotate_backups(dry_run="--dry-run" in sys.argv)
     elif cmd == "list":
         list_backups()
     elif cmd == "restore" and len(sys.argv) > 2:
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Backup Store: Content-addressed, compressed chunk storage for database backups"""
+import hashlib
+import json
+import lzma
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+STORE_DIR = Path(__file__).parent / "backups" / "store"
+
+CHUNK_PAGES = 16  # database pages per chunk (64 KB with 4 KB pages)
+CODEC = "zlib"  # or "lzma": smaller, slower
+
+# Chunk files start with one byte naming how the rest is encoded
+_CODECS = {
+    "zlib": (b"z", lambda data: zlib.compress(data, 6)),
+    "lzma": (b"x", lzma.compress),
+}
+_DECODERS = {b"z": zlib.decompress, b"x": lzma.decompress, b"r": bytes}
+
+
+def _chunks_dir():
+    return STORE_DIR / "chunks"
+
+
+def _manifests_dir():
+    return STORE_DIR / "manifests"
+
+
+def _chunk_path(digest):
+    return _chunks_dir() / digest[:2] / digest
+
+
+def manifest_path(name):
+    return _manifests_dir() / f"{name}.json"
+
+
+def page_size(path):
+    """Page size from a SQLite file header (4096 if the file is not a database)"""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    if len(header) < 18 or not header.startswith(b"SQLite format 3\0"):
+        return 4096
+    size = int.from_bytes(header[16:18], "big")
+    return 65536 if size == 1 else size
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    partial.write_bytes(data)
+    partial.replace(path)
+
+
+def _put_chunk(data, codec):
+    """Store one chunk unless it already exists; returns (digest, bytes written)"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(digest)
+    if path.exists():
+        return digest, 0
+
+    tag, compress = _CODECS[codec]
+    body = compress(data)
+    if len(body) >= len(data):
+        tag, body = b"r", data
+    _write_atomic(path, tag + body)
+    return digest, len(body) + 1
+
+
+def read_chunk(digest):
+    """Decoded bytes of a chunk, checked against its digest"""
+    raw = _chunk_path(digest).read_bytes()
+    data = _DECODERS[raw[:1]](raw[1:])
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"chunk {digest} is corrupt")
+    return data
+
+
+def put(path, name, codec=None):
+    """Store a database file as backup `name`; only chunks not yet stored are written
+
+    `path` must be a consistent snapshot (see backup_manager.copy_database).
+    The file is split into CHUNK_PAGES-page chunks named by their SHA-256,
+    so pages unchanged since any earlier backup cost nothing. Returns the
+    manifest plus "written" (new chunks) and "bytes_written".
+    """
+    codec = codec or CODEC
+    chunk_size = page_size(path) * CHUNK_PAGES
+    chunks, written, bytes_written, size = [], 0, 0, 0
+
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            digest, stored = _put_chunk(data, codec)
+            chunks.append(digest)
+            size += len(data)
+            if stored:
+                written += 1
+                bytes_written += stored
+
+    manifest = {
+        "name": name,
+        "created_at": datetime.now().isoformat(),
+        "size": size,
+        "chunk_size": chunk_size,
+        "codec": codec,
+        "chunks": chunks,
+    }
+    _write_atomic(manifest_path(name), json.dumps(manifest).encode())
+    return {**manifest, "written": written, "bytes_written": bytes_written}
+
+
+def get_manifest(name):
+    """Manifest dict for a stored backup, or None"""
+    path = manifest_path(name)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def restore(name, target):
+    """Stream backup `name` back into a file at target, one chunk at a time
+
+    Writes through a .part file renamed at the end, so target is never
+    left half-written. Returns the number of bytes restored.
+    """
+    manifest = get_manifest(name)
+    if manifest is None:
+        raise FileNotFoundError(f"backup not found: {name}")
+
+    target = Path(target)
+    partial = target.with_name(target.name + ".part")
+    with open(partial, "wb") as f:
+        for digest in manifest["chunks"]:
+            f.write(read_chunk(digest))
+    partial.replace(target)
+    return manifest["size"]
+
+
+def list_names():
+    """Names of all stored backups, oldest first, without reading manifests"""
+    if not _manifests_dir().exists():
+        return []
+    return sorted(p.stem for p in _manifests_dir().glob("*.json"))
+
+
+def list_manifests():
+    """Manifests of all stored backups, oldest first"""
+    if not _manifests_dir().exists():
+        return []
+    return [json.loads(p.read_text()) for p in sorted(_manifests_dir().glob("*.json"))]
+
+
+def delete(name):
+    """Drop a backup's manifest; its chunks go on the next gc()"""
+    path = manifest_path(name)
+    if path.exists():
+        path.unlink()
+        return True
+    return False
+
+
+def gc():
+    """Delete chunks no manifest references; returns (chunks removed, bytes freed)"""
+    if not _chunks_dir().exists():
+        return 0, 0
+    live = {digest for m in list_manifests() for digest in m["chunks"]}
+    removed, freed = 0, 0
+    for path in _chunks_dir().glob("*/*"):
+        if path.name not in live:
+            freed += path.stat().st_size
+            path.unlink()
+            removed += 1
+    return removed, freed
+
+
+def stats():
+    """Logical size of all backups vs. bytes actually stored"""
+    manifests = list_manifests()
+    chunk_files = list(_chunks_dir().glob("*/*")) if _chunks_dir().exists() else []
+    logical = sum(m["size"] for m in manifests)
+    stored = sum(p.stat().st_size for p in chunk_files)
+    return {
+        "backups": len(manifests),
+        "chunks": len(chunk_files),
+        "logical_bytes": logical,
+        "stored_bytes": stored,
+        "ratio": logical / stored if stored else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if cmd == "list":
+        for m in list_manifests():
+            print(f"  {m['name']:30} {m['size'] / 1024:8.1f} KB  {len(m['chunks'])} chunks")
+
+    elif cmd == "restore" and len(sys.argv) > 3:
+        size = restore(sys.argv[2], sys.argv[3])
+        print(f"✓ Restored {sys.argv[2]} to {sys.argv[3]} ({size / 1024:.1f} KB)")
+
+    elif cmd == "gc":
+        removed, freed = gc()
+        print(f"✓ Removed {removed} unreferenced chunks ({freed / 1024:.1f} KB)")
+
+    elif cmd == "stats":
+        s = stats()
+        print(f"\n📦 Backup store: {s['backups']} backups, {s['chunks']} chunks")
+        print(f"  Logical: {s['logical_bytes'] / 1024:.1f} KB")
+        print(f"  Stored:  {s['stored_bytes'] / 1024:.1f} KB ({s['ratio']:.1f}x)")
+
+    else:
+        print("Usage: backup_store.py [stats|list|gc|restore <name> <target>]")
@@ -4,8 +4,18 @@
 from datetime import datetime
 from pathlib import Path
 
+import audit_sink
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
+# Coalesce unread notifications per user and (type, link) into one counted row
+DIGEST = False
+
+NOTIFY_COLUMNS = "user, type, message, link, created_at, digest_key"
+# Conflict target matches idx_notifications_digest, a partial unique index
+DIGEST_UPSERT = """ON CONFLICT (user, digest_key) WHERE read=0 AND digest_key IS NOT NULL
+    DO UPDATE SET count=count + 1, message=excluded.message, created_at=excluded.created_at"""
+
 
 def init_db():
     """Initialize collaboration tables"""
@@ -78,11 +88,81 @@ def init_db():
         created_at TEXT NOT NULL
     )"""
     )
+    _migrate_notifications(c)
+    _install_counters(c)
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_comments_thread ON comments (discussion_id, reply_to, id)"
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_comments_reply_to ON comments (reply_to)")
 
     conn.commit()
     conn.close()
 
 
+def _migrate_notifications(c):
+    """Add digest columns and the indexes notification reads and digests rely on"""
+    c.execute("PRAGMA table_info(notifications)")
+    columns = {row[1] for row in c.fetchall()}
+    if "count" not in columns:
+        c.execute("ALTER TABLE notifications ADD COLUMN count INTEGER DEFAULT 1")
+    if "digest_key" not in columns:
+        c.execute("ALTER TABLE notifications ADD COLUMN digest_key TEXT")
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_notifications_user
+        ON notifications (user, read, created_at)"""
+    )
+    c.execute(
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_digest
+        ON notifications (user, digest_key) WHERE read=0 AND digest_key IS NOT NULL"""
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users (role, active)")
+
+
+def _install_counters(c):
+    """Per-user unread counters kept current by triggers on notifications
+
+    Digest bumps update a row without touching read, so they leave the
+    counter alone: it counts unread rows, which is what inboxes list.
+    """
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='notification_counters'")
+    exists = c.fetchone()
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS notification_counters (
+        user TEXT PRIMARY KEY,
+        unread INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID"""
+    )
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS notification_counters_insert
+        AFTER INSERT ON notifications WHEN NEW.read=0
+        BEGIN
+            INSERT INTO notification_counters (user, unread) VALUES (NEW.user, 1)
+            ON CONFLICT (user) DO UPDATE SET unread=unread + 1;
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS notification_counters_update
+        AFTER UPDATE OF read ON notifications WHEN (OLD.read=0) != (NEW.read=0)
+        BEGIN
+            UPDATE notification_counters
+            SET unread=unread + (CASE NEW.read WHEN 0 THEN 1 ELSE -1 END)
+            WHERE user=NEW.user;
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS notification_counters_delete
+        AFTER DELETE ON notifications WHEN OLD.read=0
+        BEGIN
+            UPDATE notification_counters SET unread=unread - 1 WHERE user=OLD.user;
+        END"""
+    )
+    if not exists:
+        c.execute(
+            """INSERT INTO notification_counters (user, unread)
+            SELECT user, COUNT(*) FROM notifications WHERE read=0 GROUP BY user"""
+        )
+
+
 # === USERS ===
 def add_user(username, role="contributor", email=None):
     """Add user/contributor"""
@@ -158,36 +238,24 @@ def add_comment(discussion_id, author, content, reply_to=None):
         (discussion_id, author, content, reply_to, now),
     )
 
+    comment_id = c.lastrowid
+
     # Update discussion timestamp
     c.execute("UPDATE discussions SET updated_at=? WHERE id=?", (now, discussion_id))
 
-    conn.commit()
-    comment_id = c.lastrowid
-
-    # Get discussion participants
-    c.execute(
-        """SELECT DISTINCT author FROM comments WHERE discussion_id=? AND author!=?""",
-        (discussion_id, author),
+    # Notify participants and the creator in the same transaction
+    fan_out(
+        c,
+        """SELECT author FROM comments WHERE discussion_id=? AND author!=?
+        UNION SELECT created_by FROM discussions WHERE id=? AND created_by!=?""",
+        (discussion_id, author, discussion_id, author),
+        "comment",
+        f"{author} commented on discussion",
+        f"discussion:{discussion_id}",
     )
-    participants = [r[0] for r in c.fetchall()]
-
-    # Get discussion creator
-    c.execute("SELECT created_by FROM discussions WHERE id=?", (discussion_id,))
-    creator = c.fetchone()[0]
-    if creator != author and creator not in participants:
-        participants.append(creator)
 
+    conn.commit()
     conn.close()
-
-    # Notify participants
-    for user in participants:
-        notify_user(
-            user,
-            "comment",
-            f"{author} commented on discussion",
-            f"discussion:{discussion_id}",
-        )
-
     return comment_id
 
 
@@ -232,22 +300,49 @@ def list_discussions(status=None, context_type=None):
     return results
 
 
-def get_discussion(discussion_id):
-    """Get discussion with comments"""
+# Comment columns, then depth and the id of the top-level comment the row hangs off
+THREAD_SQL = """WITH RECURSIVE
+    roots AS (
+        SELECT id FROM comments
+        WHERE discussion_id=? AND reply_to IS NULL AND id > ?
+        ORDER BY id LIMIT ?
+    ),
+    thread (id, discussion_id, author, content, reply_to, created_at, depth, root, path) AS (
+        SELECT id, discussion_id, author, content, reply_to, created_at, 0, id,
+               printf('%012d', id)
+        FROM comments WHERE id IN roots
+        UNION ALL
+        SELECT c.id, c.discussion_id, c.author, c.content, c.reply_to, c.created_at,
+               t.depth + 1, t.root, t.path || '/' || printf('%012d', c.id)
+        FROM comments c JOIN thread t ON c.reply_to = t.id
+    )
+SELECT id, discussion_id, author, content, reply_to, created_at, depth, root
+FROM thread ORDER BY path"""
+
+
+def get_thread(discussion_id, limit=None, after=None):
+    """Comments of a discussion as a depth-first ordered reply tree
+
+    Rows are the comment columns followed by depth and root (the id of
+    the top-level comment). Pages hold `limit` whole top-level subtrees;
+    pass the last row's root as `after` for the next page.
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
+    c.execute(THREAD_SQL, (discussion_id, after or 0, -1 if limit is None else limit))
+    results = c.fetchall()
+    conn.close()
+    return results
+
 
+def get_discussion(discussion_id, limit=None, after=None):
+    """Get discussion with its comments in thread order (see get_thread)"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
     c.execute("SELECT * FROM discussions WHERE id=?", (discussion_id,))
     discussion = c.fetchone()
-
-    c.execute(
-        "SELECT * FROM comments WHERE discussion_id=? ORDER BY created_at",
-        (discussion_id,),
-    )
-    comments = c.fetchall()
-
     conn.close()
-    return discussion, comments
+    return discussion, get_thread(discussion_id, limit, after)
 
 
 # === ASSIGNMENTS ===
@@ -262,19 +357,20 @@ def assign_item(item_type, item_id, assigned_to, assigned_by):
                  VALUES (?, ?, ?, ?, ?, ?)""",
         (item_type, item_id, assigned_to, assigned_by, now, now),
     )
-
-    conn.commit()
     assign_id = c.lastrowid
-    conn.close()
 
     # Notify assignee
-    notify_user(
-        assigned_to,
+    fan_out(
+        c,
+        "SELECT ?",
+        (assigned_to,),
         "assignment",
         f"{assigned_by} assigned you {item_type} #{item_id}",
         f"{item_type}:{item_id}",
     )
 
+    conn.commit()
+    conn.close()
     return assign_id
 
 
@@ -320,37 +416,69 @@ def list_assignments(user=None, status=None):
 
 
 # === NOTIFICATIONS ===
-def notify_user(user, type, message, link=None):
-    """Send notification to user"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    now = datetime.now().isoformat()
-    c.execute(
-        "INSERT INTO notifications (user, type, message, link, created_at) VALUES (?, ?, ?, ?, ?)",
-        (user, type, message, link, now),
+def fan_out_sql(recipients, digest=None):
+    """INSERT ... SELECT writing one notification per row of `recipients`
+
+    `recipients` is a SELECT of one username column; the statement takes
+    its parameters followed by (type, message, link, created_at,
+    digest_key). `WHERE true` keeps SQLite from reading the upsert's ON
+    as a join constraint. In digest mode an unread notification with the same
+    digest key is bumped instead of adding a row.
+    """
+    digest = DIGEST if digest is None else digest
+    sql = f"""WITH recipients (user) AS ({recipients})
+        INSERT INTO notifications ({NOTIFY_COLUMNS})
+        SELECT user, ?, ?, ?, ?, ? FROM recipients WHERE true"""
+    return f"{sql}\n    {DIGEST_UPSERT}" if digest else sql
+
+
+def _fan_out_params(params, type, message, link, digest):
+    digest = DIGEST if digest is None else digest
+    digest_key = f"{type}:{link or ''}" if digest else None
+    return (*params, type, message, link, datetime.now().isoformat(), digest_key)
+
+
+def fan_out(c, recipients, params, type, message, link=None, digest=None):
+    """Notify every user `recipients` selects inside the caller's transaction"""
+    c.execute(fan_out_sql(recipients, digest), _fan_out_params(params, type, message, link, digest))
+    return c.rowcount
+
+
+def notify_user(user, type, message, link=None, digest=None):
+    """Queue a notification for user"""
+    audit_sink.write(
+        DB_PATH,
+        fan_out_sql("SELECT ?", digest),
+        _fan_out_params((user,), type, message, link, digest),
     )
-    conn.commit()
-    conn.close()
 
 
-def notify_role(role, type, message, link=None):
-    """Send notification to all users with role"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT username FROM users WHERE role=? AND active=1", (role,))
-    users = [r[0] for r in c.fetchall()]
-    conn.close()
+def notify_role(role, type, message, link=None, digest=None):
+    """Queue one notification for every active user with role
 
-    for user in users:
-        notify_user(user, type, message, link)
+    The recipients are resolved by SQL when the queued INSERT ... SELECT
+    is written, so a broadcast costs one statement however big the role.
+    """
+    audit_sink.write(
+        DB_PATH,
+        fan_out_sql("SELECT username FROM users WHERE role=? AND active=1", digest),
+        _fan_out_params((role,), type, message, link, digest),
+    )
 
 
 def get_notifications(user, unread_only=False):
     """Get user notifications"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
     if unread_only:
+        # The counter answers the common "nothing new" case without a scan
+        c.execute("SELECT unread FROM notification_counters WHERE user=?", (user,))
+        row = c.fetchone()
+        if not row or not row[0]:
+            conn.close()
+            return []
         c.execute(
             "SELECT * FROM notifications WHERE user=? AND read=0 ORDER BY created_at DESC",
             (user,),
@@ -368,6 +496,7 @@ def get_notifications(user, unread_only=False):
 
 def mark_read(notification_id):
     """Mark notification as read"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute("UPDATE notifications SET read=1 WHERE id=?", (notification_id,))
@@ -375,6 +504,39 @@ def mark_read(notification_id):
     conn.close()
 
 
+def mark_all_read(user):
+    """Mark every unread notification of user as read"""
+    audit_sink.flush(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE notifications SET read=1 WHERE user=? AND read=0", (user,))
+    conn.commit()
+    conn.close()
+    return c.rowcount
+
+
+def unread_count(user):
+    """Unread notifications for user, read from the maintained counter"""
+    audit_sink.flush(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT unread FROM notification_counters WHERE user=?", (user,))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+
+def unread_counts():
+    """{user: unread} for every user with unread notifications"""
+    audit_sink.flush(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT user, unread FROM notification_counters WHERE unread > 0 ORDER BY user")
+    results = dict(c.fetchall())
+    conn.close()
+    return results
+
+
 if __name__ == "__main__":
     import sys
 
@@ -414,15 +576,20 @@ def mark_read(notification_id):
             print(f"Started discussion #{disc_id}")
 
         elif cmd == "comment" and len(sys.argv) >= 5:
-            comment_id = add_comment(int(sys.argv[3]), sys.argv[4], sys.argv[5])
+            reply_to = int(sys.argv[6]) if len(sys.argv) > 6 else None
+            comment_id = add_comment(int(sys.argv[3]), sys.argv[4], sys.argv[5], reply_to)
             print(f"Added comment #{comment_id}")
 
         elif cmd == "show" and len(sys.argv) >= 4:
-            disc, comments = get_discussion(int(sys.argv[3]))
+            after = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            disc, comments = get_discussion(int(sys.argv[3]), limit=20, after=after)
             print(f"\n{disc[1]} (by {disc[5]})")
             print("=" * 60)
             for c in comments:
-                print(f"\n[{c[2]}] {c[3]}")
+                indent = "  " * c[6]
+                print(f"\n{indent}#{c[0]} [{c[2]}] {c[3]}")
+            if len({c[7] for c in comments}) == 20:
+                print(f"\nNext page: discuss show {disc[0]} {comments[-1][7]}")
 
         elif cmd == "close" and len(sys.argv) >= 4:
             close_discussion(int(sys.argv[3]), sys.argv[4])
@@ -454,6 +621,7 @@ def mark_read(notification_id):
     elif module == "notify":
         if len(sys.argv) >= 3:
             notifications = get_notifications(sys.argv[2], unread_only=True)
-            print(f"\nNotifications for {sys.argv[2]} ({len(notifications)} unread):")
+            print(f"\nNotifications for {sys.argv[2]} ({unread_count(sys.argv[2])} unread):")
             for n in notifications:
-                print(f"  [{n[2]}] {n[3]}")
+                count = f" (×{n[7]})" if n[7] and n[7] > 1 else ""
+                print(f"  [{n[2]}] {n[3]}{count}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Cron Utilities: Parse cron expressions and compute next run times"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+# minute, hour, day of month, month, day of week (0 and 7 are Sunday)
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# Give up if nothing matches within this window (e.g. "0 0 31 2 *")
+SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+def is_cron(schedule):
+    """Check whether a schedule string looks like a cron expression"""
+    schedule = (schedule or "").strip()
+    return schedule in ALIASES or len(schedule.split()) == 5
+
+
+def _parse_field(field, low, high):
+    """Expand one cron field ("*/15", "1-5", "0,30") into a set of values"""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {field}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@lru_cache(maxsize=256)
+def parse_cron(expr):
+    """Parse a cron expression into (minutes, hours, days, months, weekdays, dom_any, dow_any)"""
+    expr = ALIASES.get(expr.strip(), expr.strip())
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+
+    minutes, hours, days, months, weekdays = (
+        _parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+    )
+    weekdays = frozenset(d % 7 for d in weekdays)
+    return minutes, hours, days, months, weekdays, fields[2] == "*", fields[4] == "*"
+
+
+def _day_matches(moment, days, weekdays, dom_any, dow_any):
+    """Cron day rule: when both day fields are restricted, either may match"""
+    dom_match = moment.day in days
+    dow_match = (moment.weekday() + 1) % 7 in weekdays
+    if dom_any or dow_any:
+        return dom_match and dow_match
+    return dom_match or dow_match
+
+
+def cron_next(expr, after=None):
+    """Return the first datetime strictly after `after` matching the cron expression"""
+    minutes, hours, days, months, weekdays, dom_any, dow_any = parse_cron(expr)
+    after = after or datetime.now()
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = after + SEARCH_LIMIT
+
+    while moment < limit:
+        if moment.month not in months:
+            carry, month = divmod(moment.month, 12)
+            moment = datetime(moment.year + carry, month + 1, 1)
+        elif not _day_matches(moment, days, weekdays, dom_any, dow_any):
+            moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+        elif moment.hour not in hours:
+            moment = (moment + timedelta(hours=1)).replace(minute=0)
+        elif moment.minute not in minutes:
+            moment += timedelta(minutes=1)
+        else:
+            return moment
+
+    raise ValueError(f"Cron expression never matches: {expr!r}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print('Usage: cron_utils.py "<cron expression>" [count]')
+        sys.exit(1)
+
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    moment = datetime.now()
+    for _ in range(count):
+        moment = cron_next(sys.argv[1], moment)
+        print(moment.strftime("%Y-%m-%d %H:%M (%a)"))
@@ -3,7 +3,7 @@
 
 import subprocess
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 def git_backup(project_path, reason="manual"):
@@ -78,52 +78,147 @@ def git_recover(tag_name, project_path):
         return False
 
 
+# NUL-separated so reasons and dates never need quoting
+REF_FORMAT = "%(refname)%00%(objectname)%00%(creatordate:unix)"
+BACKUP_REFS = "refs/tags/backup/"
+
+
 def list_git_backups(project_path):
-    """List git backup tags"""
+    """Backup tags as [{"tag", "date", "reason", "ref", "object"}], oldest first
+
+    One `git for-each-ref` call lists every tag, however many there are.
+    """
     project_path = Path(project_path).resolve()
 
     try:
         result = subprocess.run(
-            ["git", "-C", str(project_path), "tag", "-l", "backup/*"],
+            [
+                "git",
+                "-C",
+                str(project_path),
+                "for-each-ref",
+                f"--format={REF_FORMAT}",
+                BACKUP_REFS,
+            ],
             capture_output=True,
             text=True,
             check=True,
         )
-
-        tags = result.stdout.strip().split("\n")
-        return [t for t in tags if t]
-
     except subprocess.CalledProcessError:
         return []
 
-
-def cleanup_old_backups(project_path, keep_recent=5):
-    """Remove old backup tags"""
+    backups = []
+    for line in result.stdout.splitlines():
+        ref, obj, stamp = line.split("\0")
+        tag = ref[len("refs/tags/") :]
+        # backup/<reason>/<timestamp>; anything else under backup/ is reason-less
+        parts = tag.split("/")
+        reason = "/".join(parts[1:-1]) or None
+        backups.append(
+            {
+                "tag": tag,
+                "date": datetime.fromtimestamp(int(stamp or 0)),
+                "reason": reason,
+                "ref": ref,
+                "object": obj,
+            }
+        )
+    backups.sort(key=lambda b: (b["date"], b["tag"]))
+    return backups
+
+
+def parse_keep(specs):
+    """Parse --keep specs into (reason, count, days) rules
+
+    Each spec is `[reason=]N` (keep the N newest) or `[reason=]Nd` (keep
+    those younger than N days); without a reason the rule covers every
+    backup. "10", "30d" and "pre-release=20" are all valid.
+    """
+    rules = []
+    for spec in specs:
+        reason, _, value = spec.rpartition("=")
+        if value.endswith("d") and value[:-1].isdigit():
+            rules.append((reason or None, None, int(value[:-1])))
+        elif value.isdigit():
+            rules.append((reason or None, int(value), None))
+        else:
+            raise ValueError(f"invalid --keep spec: {spec}")
+    return rules
+
+
+def plan_cleanup(backups, rules, now=None):
+    """Split backups into (keep, remove); a backup is kept if any rule keeps it"""
+    now = now or datetime.now()
+    kept = set()
+    for reason, count, days in rules:
+        matching = [b for b in backups if reason is None or b["reason"] == reason]
+        if count:
+            kept.update(b["tag"] for b in matching[-count:])
+        if days is not None:
+            cutoff = now - timedelta(days=days)
+            kept.update(b["tag"] for b in matching if b["date"] >= cutoff)
+    keep = [b for b in backups if b["tag"] in kept]
+    remove = [b for b in backups if b["tag"] not in kept]
+    return keep, remove
+
+
+def delete_backup_tags(project_path, backups):
+    """Delete tags in one `git update-ref --stdin` transaction
+
+    Each delete is checked against the object the tag pointed to when
+    listed, so a tag re-created meanwhile aborts the whole batch instead
+    of being lost. Returns the number of tags deleted.
+    """
+    if not backups:
+        return 0
+    commands = ["start"]
+    commands += [f"delete {b['ref']} {b['object']}" for b in backups]
+    commands += ["prepare", "commit"]
+    subprocess.run(
+        ["git", "-C", str(Path(project_path).resolve()), "update-ref", "--stdin"],
+        input="\n".join(commands) + "\n",
+        text=True,
+        check=True,
+        capture_output=True,
+    )
+    return len(backups)
+
+
+def cleanup_old_backups(project_path, keep_recent=5, keep=None, dry_run=False):
+    """Remove old backup tags
+
+    Keeps the `keep_recent` newest backups, or whatever the --keep specs
+    in `keep` retain (see parse_keep) when given.
+    """
     backups = list_git_backups(project_path)
+    rules = parse_keep(keep) if keep else [(None, keep_recent, None)]
+    retained, to_remove = plan_cleanup(backups, rules)
 
-    if len(backups) <= keep_recent:
+    if not to_remove:
         print(f"✓ Only {len(backups)} backups, nothing to clean")
         return 0
 
-    to_remove = backups[:-keep_recent]
-    removed = 0
-
-    for tag in to_remove:
-        try:
-            subprocess.run(
-                ["git", "-C", str(project_path), "tag", "-d", tag],
-                check=True,
-                capture_output=True,
-            )
-            removed += 1
-            print(f"🗑️  Removed: {tag}")
-        except subprocess.CalledProcessError:
-            pass
+    if dry_run:
+        for b in to_remove:
+            print(f"  would remove {b['tag']}")
+        print(f"✓ Dry run: would remove {len(to_remove)}, keep {len(retained)}")
+        return 0
+
+    try:
+        removed = delete_backup_tags(project_path, to_remove)
+    except subprocess.CalledProcessError as e:
+        print(f"✗ Cleanup failed: {e.stderr.strip() if e.stderr else e}")
+        return 0
 
     print(f"✓ Cleaned up {removed} old backups")
     return removed
 
 
+def keep_specs(args):
+    """Values of every `--keep SPEC` pair in a command line"""
+    return [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "--keep"]
+
+
 if __name__ == "__main__":
     import sys
 
@@ -132,7 +227,10 @@ def cleanup_old_backups(project_path, keep_recent=5):
         print("  git_backup.py backup <project_path> [reason]")
         print("  git_backup.py list <project_path>")
         print("  git_backup.py recover <project_path> <tag_name>")
-        print("  git_backup.py cleanup <project_path> [keep_recent]")
+        print(
+            "  git_backup.py cleanup <project_path> [keep_recent] "
+            "[--keep [reason=]N[d] ...] [--dry-run]"
+        )
         sys.exit(1)
 
     cmd = sys.argv[1]
@@ -146,8 +244,8 @@ def cleanup_old_backups(project_path, keep_recent=5):
         path = sys.argv[2]
         backups = list_git_backups(path)
         print(f"\n📦 Git Backups ({len(backups)}):")
-        for tag in backups:
-            print(f"  {tag}")
+        for b in backups:
+            print(f"  {b['tag']:50} {b['date']:%Y-%m-%d %H:%M}  {b['reason'] or '-'}")
 
     elif cmd == "recover" and len(sys.argv) >= 4:
         path = sys.argv[2]
@@ -156,5 +254,5 @@ def cleanup_old_backups(project_path, keep_recent=5):
 
     elif cmd == "cleanup" and len(sys.argv) >= 3:
         path = sys.argv[2]
-        keep = int(sys.argv[3]) if len(sys.argv) > 3 else 5
-        cleanup_old_backups(path, keep)
+        keep = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 5
+        cleanup_old_backups(path, keep, keep_specs(sys.argv), "--dry-run" in sys.argv)
@@ -4,6 +4,9 @@
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import audit_sink
+from time_index import add_epoch_column, epoch_column, epoch_ms
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
 
@@ -18,6 +21,7 @@ def init_db():
         checked_at TEXT NOT NULL
     )"""
     )
+    add_epoch_column(c, "health_checks")
     conn.commit()
     conn.close()
 
@@ -68,15 +72,14 @@ def check_health():
             "issues": issues,
         }
     )
-    c.execute(
+    conn.close()
+    audit_sink.write(
+        DB_PATH,
         """INSERT INTO health_checks (status, data, checked_at)
         VALUES (?, ?, ?)""",
         (status, data, datetime.now().isoformat()),
     )
 
-    conn.commit()
-    conn.close()
-
     return {
         "status": status,
         "db_size": db_size,
@@ -89,13 +92,15 @@ def check_health():
 
 def get_health_history(hours=24):
     """Get health history"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
-    since = (datetime.now() - timedelta(hours=hours)).isoformat()
+    since = epoch_ms(datetime.now() - timedelta(hours=hours))
+    ts = epoch_column(c, "health_checks")
     c.execute(
-        """SELECT status, checked_at FROM health_checks 
-        WHERE checked_at > ? ORDER BY checked_at DESC""",
+        f"""SELECT status, checked_at FROM health_checks
+        WHERE {ts} > ? ORDER BY {ts} DESC""",
         (since,),
     )
 
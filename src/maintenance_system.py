@@ -2,12 +2,49 @@
 """Maintenance System: Scheduled tasks, capability tracking, complexity management"""
 import sqlite3
 import json
+import os
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from graphlib import CycleError, TopologicalSorter
 from pathlib import Path
 import subprocess
+import threading
+
+from cron_utils import cron_next, is_cron
+from time_index import add_epoch_column
 
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
+# Lower rank runs first
+PRIORITY_RANK = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+# Max concurrent tasks per resource class (0 = unbounded)
+RESOURCE_LIMITS = {"default": 0, "cpu": os.cpu_count() or 2, "io": 2, "db": 1}
+
+TASK_TIMEOUT = 300
+
+# Seconds between re-checks for tasks blocked by another batch on a shared gate
+GATE_POLL = 1.0
+
+# Stop counting missed slots after this many (the run is coalesced either way)
+MAX_MISSED_RUNS = 1000
+
+# Columns added after the original schema: {table: {column: definition}}
+TASK_COLUMNS = {
+    "maintenance_tasks": {
+        "resource_class": "TEXT DEFAULT 'default'",
+        "depends_on": "TEXT",
+        "locks": "TEXT",
+        "capability": "TEXT",
+    },
+    "task_executions": {"coalesced": "INTEGER DEFAULT 0"},
+}
+
+TASK_SELECT = """SELECT id, name, schedule, command, priority, resource_class, next_run,
+                        depends_on, locks, capability
+                 FROM maintenance_tasks"""
+
 
 def init_db():
     """Initialize maintenance tables"""
@@ -28,7 +65,11 @@ def init_db():
         next_run TEXT,
         run_count INTEGER DEFAULT 0,
         avg_duration REAL DEFAULT 0,
-        created_at TEXT NOT NULL
+        created_at TEXT NOT NULL,
+        resource_class TEXT DEFAULT 'default',
+        depends_on TEXT,
+        locks TEXT,
+        capability TEXT
     )"""
     )
 
@@ -42,9 +83,12 @@ def init_db():
         output TEXT,
         error TEXT,
         created_at TEXT NOT NULL,
+        coalesced INTEGER DEFAULT 0,
         FOREIGN KEY (task_id) REFERENCES maintenance_tasks(id)
     )"""
     )
+    _migrate_tasks(c)
+    add_epoch_column(c, "task_executions")
 
     # System capabilities
     c.execute(
@@ -89,9 +133,35 @@ def init_db():
     conn.close()
 
 
+def _migrate_tasks(c):
+    """Add scheduling columns to task tables created before they existed"""
+    for table, new_columns in TASK_COLUMNS.items():
+        c.execute(f"PRAGMA table_info({table})")
+        columns = {row[1] for row in c.fetchall()}
+        for column, definition in new_columns.items():
+            if column not in columns:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
 # === MAINTENANCE TASKS ===
-def add_task(name, schedule, command, description="", priority="normal"):
-    """Add maintenance task"""
+def add_task(
+    name,
+    schedule,
+    command,
+    description="",
+    priority="normal",
+    resource_class="default",
+    depends_on=None,
+    locks=None,
+    capability=None,
+):
+    """Add maintenance task
+
+    depends_on names tasks that must finish first: when both are due they
+    run in order, otherwise the task waits while the dependency is running
+    and is skipped if its last run failed. locks names resources the task
+    needs exclusively (e.g. "database").
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     now = datetime.now().isoformat()
@@ -101,10 +171,23 @@ def add_task(name, schedule, command, description="", priority="normal"):
 
     try:
         c.execute(
-            """INSERT INTO maintenance_tasks 
-                     (name, description, schedule, command, priority, next_run, created_at)
-                     VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (name, description, schedule, command, priority, next_run, now),
+            """INSERT INTO maintenance_tasks
+                     (name, description, schedule, command, priority, resource_class,
+                      depends_on, locks, capability, next_run, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                name,
+                description,
+                schedule,
+                command,
+                priority,
+                resource_class,
+                json.dumps(depends_on) if depends_on else None,
+                json.dumps(locks) if locks else None,
+                capability,
+                next_run,
+                now,
+            ),
         )
         conn.commit()
         task_id = c.lastrowid
@@ -115,11 +198,75 @@ def add_task(name, schedule, command, description="", priority="normal"):
     return task_id
 
 
-def calculate_next_run(schedule):
-    """Calculate next run time from schedule"""
-    now = datetime.now()
-
-    if schedule == "hourly":
+def set_task_dependencies(name, depends_on=None, locks=None):
+    """Declare which tasks must run before this one and which resources it locks"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        "UPDATE maintenance_tasks SET depends_on=?, locks=? WHERE name=?",
+        (
+            json.dumps(depends_on) if depends_on else None,
+            json.dumps(locks) if locks else None,
+            name,
+        ),
+    )
+    conn.commit()
+    updated = c.rowcount
+    conn.close()
+    return updated > 0
+
+
+def setup_default_tasks():
+    """Register the standard maintenance DAG
+
+    Backup and health check run side by side; analysis waits for the health
+    check, and the report waits for both and shares the database lock with
+    the backup so they never overlap. Retention (rollup, pruning and
+    incremental vacuum) and session archival take the same lock. Locks and
+    dependencies hold across batches only when the batches share a gate,
+    as they do under the scheduler daemon.
+    """
+    tasks = [
+        ("backup", "0 2 * * *", "python3 backup_manager.py backup", [], ["database"]),
+        ("health_check", "@hourly", "python3 health_monitor.py check", [], []),
+        (
+            "analyze",
+            "0 3 * * *",
+            "python3 improvement_analyzer.py analyze",
+            ["health_check"],
+            [],
+        ),
+        ("retention", "30 3 * * *", "python3 retention.py run", [], ["database"]),
+        (
+            "archive_sessions",
+            "15 3 * * *",
+            "python3 session_manager.py msg archive",
+            [],
+            ["database"],
+        ),
+        (
+            "report",
+            "0 4 * * *",
+            "python3 automation_manager.py report daily",
+            ["health_check", "analyze"],
+            ["database"],
+        ),
+    ]
+
+    added = []
+    for name, schedule, command, depends_on, locks in tasks:
+        if add_task(name, schedule, command, depends_on=depends_on, locks=locks):
+            added.append(name)
+    return added
+
+
+def calculate_next_run(schedule, after=None):
+    """Calculate next run time from schedule (named interval or cron expression)"""
+    now = after or datetime.now()
+
+    if is_cron(schedule):
+        next_run = cron_next(schedule, now)
+    elif schedule == "hourly":
         next_run = now + timedelta(hours=1)
     elif schedule == "daily":
         next_run = now + timedelta(days=1)
@@ -145,75 +292,293 @@ def calculate_next_run(schedule):
     return next_run.isoformat()
 
 
-def run_due_tasks():
-    """Run tasks that are due"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def _run_command(command, timeout=TASK_TIMEOUT):
+    """Run a task command, returning (status, output, error, duration)"""
+    start = datetime.now()
+    try:
+        result = subprocess.run(
+            command, shell=True, capture_output=True, text=True, timeout=timeout
+        )
+        status = "success" if result.returncode == 0 else "failed"
+        output = result.stdout[:1000]
+        error = result.stderr[:1000] if result.returncode != 0 else None
+    except subprocess.TimeoutExpired:
+        status = "timeout"
+        output = ""
+        error = f"Task timed out after {timeout}s"
+    except Exception as e:
+        status = "error"
+        output = ""
+        error = str(e)
+
+    duration = (datetime.now() - start).total_seconds()
+    return status, output, error, duration
+
+
+def count_missed_runs(schedule, next_run, now=None):
+    """Count scheduled slots between a stale next_run and now (capped)"""
+    now = now or datetime.now()
+    if isinstance(next_run, str):
+        next_run = datetime.fromisoformat(next_run)
+
+    missed = 0
+    while next_run <= now and missed < MAX_MISSED_RUNS:
+        missed += 1
+        next_run = datetime.fromisoformat(calculate_next_run(schedule, next_run))
+    return missed
+
+
+def record_execution(task, status, duration, output, error):
+    """Record one task result in a short write transaction
+
+    The next run is computed from now, so a backlog of missed slots collapses
+    into this single execution; the number of slots skipped is kept in
+    task_executions.coalesced.
+    """
     now = datetime.now().isoformat()
-
-    c.execute(
-        """SELECT * FROM maintenance_tasks 
-                 WHERE enabled=1 AND next_run <= ?
-                 ORDER BY priority DESC""",
-        (now,),
-    )
-    tasks = c.fetchall()
-
-    results = []
-
-    for task in tasks:
-        task_id = task[0]
-        name = task[1]
-        command = task[4]
-        schedule = task[3]
-
-        # Execute task
-        start = datetime.now()
-        try:
-            result = subprocess.run(
-                command, shell=True, capture_output=True, text=True, timeout=300
-            )
-            status = "success" if result.returncode == 0 else "failed"
-            output = result.stdout[:1000]
-            error = result.stderr[:1000] if result.returncode != 0 else None
-        except subprocess.TimeoutExpired:
-            status = "timeout"
-            output = ""
-            error = "Task timed out after 5 minutes"
-        except Exception as e:
-            status = "error"
-            output = ""
-            error = str(e)
-
-        duration = (datetime.now() - start).total_seconds()
-
-        # Log execution
+    coalesced = max(task.get("missed", 1) - 1, 0)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        c = conn.cursor()
         c.execute(
-            """INSERT INTO task_executions (task_id, status, duration, output, error, created_at)
-                     VALUES (?, ?, ?, ?, ?, ?)""",
-            (task_id, status, duration, output, error, datetime.now().isoformat()),
+            """INSERT INTO task_executions
+                     (task_id, status, duration, output, error, coalesced, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (task["id"], status, duration, output, error, coalesced, now),
         )
-
-        # Update task
-        next_run = calculate_next_run(schedule)
-        run_count = task[9] + 1
-        avg_duration = (task[10] * task[9] + duration) / run_count
-
         c.execute(
-            """UPDATE maintenance_tasks 
-                     SET last_run=?, next_run=?, run_count=?, avg_duration=?
+            """UPDATE maintenance_tasks
+                     SET last_run=?, next_run=?, run_count=run_count + 1,
+                         avg_duration=(avg_duration * run_count + ?) / (run_count + 1)
                      WHERE id=?""",
-            (datetime.now().isoformat(), next_run, run_count, avg_duration, task_id),
+            (now, calculate_next_run(task["schedule"]), duration, task["id"]),
         )
-
         conn.commit()
+    finally:
+        conn.close()
 
-        results.append({"task": name, "status": status, "duration": duration})
 
+def _load_due_tasks():
+    """Load enabled tasks whose next_run has passed"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    _migrate_tasks(c)
+    now = datetime.now()
+    c.execute(TASK_SELECT + " WHERE enabled=1 AND next_run <= ?", (now.isoformat(),))
+    rows = c.fetchall()
     conn.close()
+
+    tasks = [task_from_row(row) for row in rows]
+    for task in tasks:
+        task["missed"] = count_missed_runs(task["schedule"], task["next_run"], now)
+    return tasks
+
+
+def task_from_row(row):
+    """Build a task dict from a row selected with TASK_SELECT"""
+    keys = ("id", "name", "schedule", "command", "priority", "resource_class", "next_run")
+    task = dict(zip(keys, row[:7]))
+    depends_on, locks, capability = row[7:10]
+    task["depends_on"] = json.loads(depends_on) if depends_on else []
+    task["locks"] = json.loads(locks) if locks else []
+    task["capability"] = capability
+    return task
+
+
+def _task_order(task):
+    """Sort key: priority rank, then oldest deadline first"""
+    return PRIORITY_RANK.get(task["priority"], PRIORITY_RANK["normal"]), task["next_run"] or ""
+
+
+def build_task_graph(tasks):
+    """Map each task name to the names in `tasks` it must wait for
+
+    Edges come from the task's own depends_on list plus the capability
+    dependency map: a task providing capability X waits for the tasks
+    providing the capabilities X depends on. Dependencies that are not part
+    of this batch (not due) are ignored.
+    """
+    names = {task["name"] for task in tasks}
+    providers = defaultdict(set)
+    for task in tasks:
+        if task.get("capability"):
+            providers[task["capability"]].add(task["name"])
+    cap_map = get_capability_map() if providers else {}
+
+    graph = {}
+    for task in tasks:
+        deps = {d for d in task.get("depends_on") or [] if d in names}
+        for required in cap_map.get(task.get("capability"), []):
+            deps |= providers.get(required, set())
+        deps.discard(task["name"])
+        graph[task["name"]] = deps
+    return graph
+
+
+class ResourceGate:
+    """Resource-class slots, held locks and running task names
+
+    execute_tasks uses a private gate per call unless it is handed one; the
+    scheduler daemon keeps a single gate for its lifetime so tasks started
+    in different batches (the 02:00 backup and the 04:00 report) still
+    respect each other's locks, slots and dependencies.
+    """
+
+    def __init__(self):
+        self.in_use = defaultdict(int)
+        self.held_locks = set()
+        self.active = set()
+        self.version = 0  # bumped on every release
+        self.changed = threading.Condition()
+
+    def acquire(self, task, after=()):
+        """Take the task's slot and locks if they are free and nothing in `after` runs"""
+        resource = task.get("resource_class") or "default"
+        limit = RESOURCE_LIMITS.get(resource, RESOURCE_LIMITS["default"])
+        locks = task.get("locks") or []
+        with self.changed:
+            if limit and self.in_use[resource] >= limit:
+                return False
+            if self.held_locks.intersection(locks) or self.active.intersection(after):
+                return False
+            self.in_use[resource] += 1
+            self.held_locks.update(locks)
+            self.active.add(task["name"])
+            return True
+
+    def release(self, task):
+        with self.changed:
+            self.in_use[task.get("resource_class") or "default"] -= 1
+            self.held_locks.difference_update(task.get("locks") or [])
+            self.active.discard(task["name"])
+            self.version += 1
+            self.changed.notify_all()
+
+    def wait(self, version, timeout=None):
+        """Block until something is released after `version` was read"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+
+
+def failed_dependencies(names):
+    """Those of `names` whose most recent recorded run did not succeed"""
+    if not names:
+        return []
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        rows = conn.execute(
+            f"""SELECT t.name, (SELECT status FROM task_executions e WHERE e.task_id = t.id
+                                ORDER BY e.id DESC LIMIT 1)
+                FROM maintenance_tasks t WHERE t.name IN ({",".join("?" * len(names))})""",
+            list(names),
+        ).fetchall()
+    finally:
+        conn.close()
+    return sorted(name for name, status in rows if status not in (None, "success"))
+
+
+def execute_tasks(tasks, max_workers=None, timeout=TASK_TIMEOUT, record=None, gate=None):
+    """Run tasks as a dependency DAG on a worker pool
+
+    A task starts once everything it depends on has finished, its resource
+    class has a free slot (see RESOURCE_LIMITS) and none of its locks are
+    held by a running task. Among ready tasks, higher priority goes first.
+    If a dependency fails, its dependents are recorded as skipped.
+    Dependencies outside this batch are resolved against their last run:
+    the task waits while one is running on the same gate and is skipped if
+    its last recorded run failed. Each result is recorded in its own short
+    write transaction as soon as it finishes, so no connection is held
+    open while commands run. `record` overrides how results are stored
+    (defaults to record_execution); `gate` shares slots and locks with
+    other batches (see ResourceGate).
+    """
+    record = record or record_execution
+    gate = gate or ResourceGate()
+    by_name = {task["name"]: task for task in tasks}
+    graph = build_task_graph(tasks)
+    sorter = TopologicalSorter(graph)
+    try:
+        sorter.prepare()
+    except CycleError as e:
+        raise ValueError(f"Dependency cycle between tasks: {' -> '.join(e.args[1])}") from e
+
+    # depends_on entries that are not part of this batch
+    external = {
+        task["name"]: [d for d in task.get("depends_on") or [] if d not in by_name]
+        for task in tasks
+    }
+    max_workers = max_workers or max(len(tasks), 1)
+    ready = []
+    failed = set()
+    running = {}
+    results = []
+
+    def finish(task, status, duration, output, error):
+        sorter.done(task["name"])
+        if status != "success":
+            failed.add(task["name"])
+        record(task, status, duration, output, error)
+        results.append({"task": task["name"], "status": status, "duration": duration})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while sorter.is_active():
+            newly_ready = sorter.get_ready()
+            for name in newly_ready:
+                task = by_name[name]
+                blocked_by = sorted(graph[name] & failed)
+                if blocked_by:
+                    finish(task, "skipped", 0.0, "", f"Dependency failed: {', '.join(blocked_by)}")
+                else:
+                    ready.append(task)
+            ready.sort(key=_task_order)
+
+            version = gate.version
+            skipped = False
+            for task in list(ready):
+                if len(running) >= max_workers:
+                    break
+                after = external[task["name"]]
+                if not gate.acquire(task, after):
+                    continue
+                ready.remove(task)
+                blocked_by = failed_dependencies(after)
+                if blocked_by:
+                    gate.release(task)
+                    finish(task, "skipped", 0.0, "", f"Last run failed: {', '.join(blocked_by)}")
+                    skipped = True
+                    continue
+                running[pool.submit(_run_command, task["command"], timeout)] = task
+
+            if not running:
+                # Skipped tasks may have released dependents
+                if newly_ready or skipped:
+                    continue
+                if not ready:
+                    break
+                # Everything left waits on another batch sharing the gate
+                gate.wait(version)
+                continue
+
+            done, _ = wait(
+                running, timeout=GATE_POLL if ready else None, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                task = running.pop(future)
+                gate.release(task)
+                status, output, error, duration = future.result()
+                finish(task, status, duration, output, error)
+
     return results
 
 
+def run_due_tasks(max_workers=None, timeout=TASK_TIMEOUT):
+    """Run tasks that are due"""
+    tasks = _load_due_tasks()
+    if not tasks:
+        return []
+    return execute_tasks(tasks, max_workers, timeout)
+
+
 def list_tasks(enabled_only=True):
     """List maintenance tasks"""
     conn = sqlite3.connect(DB_PATH)
@@ -336,6 +701,12 @@ def get_complexity_score():
 
     conn.close()
 
+    return complexity_from_counts(cap_count, total_complexity, total_deps, tool_count, session_count)
+
+
+def complexity_from_counts(cap_count, total_complexity, total_deps, tool_count, session_count):
+    """Complexity score and level from pre-computed counts"""
+    total_complexity = total_complexity or 0
     # Calculate score (higher = more complex)
     score = (cap_count * 2) + total_complexity + (total_deps * 3) + tool_count + session_count
 
@@ -451,7 +822,8 @@ def get_utilization_summary():
 
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  Task:       python maintenance_system.py task <add|list|run> ...")
+        print("  Task:       python maintenance_system.py task <add|list|run [workers]> ...")
+        print("              python maintenance_system.py task <setup|depend <name> <deps> [locks]>")
         print("  Capability: python maintenance_system.py cap <register|list|map> ...")
         print("  Complexity: python maintenance_system.py complexity <score|suggest> ...")
         print("  Util:       python maintenance_system.py util <record|summary> ...")
@@ -474,8 +846,21 @@ def get_utilization_summary():
                 next_run = t[8][:16] if t[8] else "Not scheduled"
                 print(f"  [{t[5]}] {t[1]} - {t[3]} (next: {next_run})")
 
+        elif subcmd == "setup":
+            added = setup_default_tasks()
+            print(f"Added {len(added)} default tasks: {', '.join(added) or 'none'}")
+
+        elif subcmd == "depend" and len(sys.argv) >= 5:
+            deps = [d for d in sys.argv[4].split(",") if d]
+            locks = [lk for lk in sys.argv[5].split(",") if lk] if len(sys.argv) > 5 else None
+            if set_task_dependencies(sys.argv[3], deps, locks):
+                print(f"{sys.argv[3]} → {', '.join(deps) or 'no dependencies'}")
+            else:
+                print(f"Task not found: {sys.argv[3]}")
+
         elif subcmd == "run":
-            results = run_due_tasks()
+            workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+            results = run_due_tasks(max_workers=workers)
             if results:
                 print(f"\nRan {len(results)} tasks:")
                 for r in results:
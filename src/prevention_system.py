@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """Prevention System: Lightweight proactive measures to avoid issues"""
 import sqlite3
+import atexit
 import json
+import re
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import audit_sink
+from time_index import add_epoch_column, epoch_column, epoch_ms
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
+PERSIST_INTERVAL = 5.0  # seconds between rate limiter reconciles and violation writes
+VIOLATION_BATCH = 100  # buffered guardrail violations that force a write
+
 
 def init_db():
     """Initialize prevention tables"""
@@ -38,6 +48,7 @@ def init_db():
         FOREIGN KEY (rule_id) REFERENCES prevention_rules(id)
     )"""
     )
+    add_epoch_column(c, "prevention_events")
 
     # Guardrails (boundaries that can't be crossed)
     c.execute(
@@ -65,10 +76,52 @@ def init_db():
     )"""
     )
 
+    _install_rule_state(c)
+
     conn.commit()
     conn.close()
 
 
+def _install_rule_state(c):
+    """Rule version counter (bumped by triggers) and shared rate limiter buckets"""
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS prevention_state (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )"""
+    )
+    c.execute("INSERT OR IGNORE INTO prevention_state (key, value) VALUES ('rules_version', 0)")
+    for event in ("INSERT", "DELETE", "UPDATE"):
+        c.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS prevention_rules_{event.lower()}_version
+            AFTER {event} ON prevention_rules
+            BEGIN
+                UPDATE prevention_state SET value = value + 1 WHERE key = 'rules_version';
+            END"""
+        )
+
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS rate_limit_state (
+        component TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated REAL NOT NULL
+    )"""
+    )
+
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS guardrail_violations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guardrail_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        value REAL NOT NULL,
+        limit_value REAL NOT NULL,
+        enforcement TEXT,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (guardrail_id) REFERENCES guardrails(id)
+    )"""
+    )
+
+
 # === PREVENTION RULES ===
 def add_prevention_rule(name, type, condition, action, overhead="low"):
     """Add prevention rule"""
@@ -91,79 +144,372 @@ def add_prevention_rule(name, type, condition, action, overhead="low"):
     return rule_id
 
 
-def check_prevention_rules(context):
-    """Check all prevention rules (lightweight)"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+class TokenBucket:
+    """Rate limiter: holds up to capacity tokens, refilled continuously at rate per second"""
 
-    c.execute("SELECT * FROM prevention_rules WHERE enabled=1")
-    rules = c.fetchall()
+    __slots__ = ("capacity", "rate", "tokens", "updated")
 
-    prevented = []
+    def __init__(self, capacity, rate, tokens=None, updated=None):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity if tokens is None else min(tokens, capacity)
+        self.updated = time.time() if updated is None else updated
 
-    for rule in rules:
-        rule_id, name, type, condition, action, enabled, overhead, created_at = rule
+    def available(self, now=None):
+        now = time.time() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
 
-        # Quick checks only (low overhead)
-        should_prevent = False
-        details = {}
+    def record(self, n=1, now=None):
+        """Count n events; tokens go negative while the limit is exceeded"""
+        self.tokens = self.available(now) - n
 
-        if type == "size_limit":
-            cond = json.loads(condition)
-            if context.get("size", 0) > cond.get("max_size", float("inf")):
-                should_prevent = True
-                details = {"size": context["size"], "limit": cond["max_size"]}
 
-        elif type == "rate_limit":
-            cond = json.loads(condition)
-            component = cond.get("component")
-            max_rate = cond.get("max_per_minute")
+def compile_rule(rule_id, name, type, condition, action):
+    """Compile one rule row into a check(context, limiters) -> details-or-None function
 
-            # Check recent events
-            cutoff = (datetime.now() - timedelta(minutes=1)).isoformat()
-            c.execute(
-                """SELECT COUNT(*) FROM tool_executions 
-                        WHERE created_at > ? AND tool_id IN 
-                        (SELECT id FROM tools WHERE name=?)""",
-                (cutoff, component),
-            )
-            count = c.fetchone()[0]
+    Raises ValueError, KeyError, TypeError or re.error for a malformed condition.
+    """
+    cond = json.loads(condition)
+
+    if type == "size_limit":
+        max_size = cond.get("max_size", float("inf"))
+
+        def check(context, limiters):
+            if context.get("size", 0) > max_size:
+                return {"size": context["size"], "limit": max_size}
+
+    elif type == "rate_limit":
+        component = cond["component"]
+        max_rate = cond["max_per_minute"]
+        if not isinstance(max_rate, (int, float)) or max_rate <= 0:
+            raise TypeError(f"max_per_minute must be a positive number, not {max_rate!r}")
 
-            if count >= max_rate:
-                should_prevent = True
-                details = {"rate": count, "limit": max_rate}
+        def check(context, limiters):
+            bucket = limiters.get(component)
+            if bucket is not None and bucket.available() < 1:
+                return {"rate": round(max_rate - bucket.tokens), "limit": max_rate}
 
-        elif type == "dependency_check":
-            cond = json.loads(condition)
-            required = cond.get("requires")
+        return {
+            "id": rule_id,
+            "name": name,
+            "action": action,
+            "check": check,
+            "limit": (component, max_rate),
+        }
+
+    elif type == "dependency_check":
+        required = cond.get("requires")
+
+        def check(context, limiters):
             if required and not context.get(required):
-                should_prevent = True
-                details = {"missing": required}
-
-        elif type == "validation":
-            cond = json.loads(condition)
-            field = cond.get("field")
-            pattern = cond.get("pattern")
-            if field in context:
-                import re
-
-                if not re.match(pattern, str(context[field])):
-                    should_prevent = True
-                    details = {"field": field, "value": context[field]}
-
-        if should_prevent:
-            # Log prevention
+                return {"missing": required}
+
+    elif type == "validation":
+        field = cond.get("field")
+        pattern = re.compile(cond["pattern"])
+
+        def check(context, limiters):
+            if field in context and not pattern.match(str(context[field])):
+                return {"field": field, "value": context[field]}
+
+    else:
+        return None
+
+    return {"id": rule_id, "name": name, "action": action, "check": check}
+
+
+# Refill and apply one process's spends since its last reconcile as a single delta
+RECONCILE_SQL = """UPDATE rate_limit_state
+    SET tokens = MAX(0, MIN(:capacity, tokens + (:now - updated) * :rate) - :spent),
+        updated = :now
+    WHERE component = :component
+    RETURNING tokens, updated"""
+
+
+class RuleEvaluator:
+    """Compiled prevention rules, guardrails and rate limiters for one database
+
+    Nothing is re-read until PRAGMA data_version reports a commit from
+    another connection. Then the (small) guardrails table is reloaded,
+    and rules are recompiled only if the trigger-maintained rules_version
+    moved. Rate limits are in-process token buckets that note_execution()
+    spends from; every PERSIST_INTERVAL seconds (and at exit) the spends
+    are applied to the shared rate_limit_state rows as one atomic delta
+    per component, so processes see each other's executions without
+    overwriting them. Guardrail violations are buffered the same way.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.rules = []
+        self.limits = {}  # component -> max_per_minute
+        self.limiters = {}  # component -> TokenBucket (stored state minus unreconciled spends)
+        self.spent = {}  # component -> tokens spent since the last reconcile
+        self.guardrails = {}
+        self.violations = []
+        self._data_version = None
+        self._rules_version = None
+        self._persisted = time.time()
+
+        c = self.conn.cursor()
+        _install_rule_state(c)
+        self.conn.commit()
+
+    def _refresh(self):
+        c = self.conn.cursor()
+        data_version = c.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        self._load_guardrails(c)
+
+        row = c.execute("SELECT value FROM prevention_state WHERE key='rules_version'").fetchone()
+        version = row[0] if row else None
+        if version == self._rules_version:
+            self._load_limiters(c)
+            return
+        self._rules_version = version
+        self._compile(c)
+
+    def _compile(self, c):
+        c.execute(
+            "SELECT id, name, type, condition, action FROM prevention_rules WHERE enabled=1"
+        )
+        rules = []
+        for row in c.fetchall():
+            # A malformed rule is skipped so it cannot break checks for every other rule
+            try:
+                rule = compile_rule(*row)
+            except (ValueError, KeyError, TypeError, re.error) as e:
+                print(f"⚠️  Skipping prevention rule #{row[0]} ({row[1]}): {e}")
+                continue
+            if rule:
+                rules.append(rule)
+        self.rules = rules
+
+        # Buckets no process has created yet are seeded from the last minute of executions
+        self.limits = dict(rule["limit"] for rule in self.rules if "limit" in rule)
+        stored = {row[0] for row in c.execute("SELECT component FROM rate_limit_state")}
+        for component, max_rate in self.limits.items():
+            if component not in stored:
+                c.execute(
+                    """INSERT OR IGNORE INTO rate_limit_state (component, tokens, updated)
+                             VALUES (?, ?, ?)""",
+                    (component, max_rate - self._recent_executions(c, component), time.time()),
+                )
+        self.conn.commit()
+        self._load_limiters(c)
+
+    def _load_limiters(self, c):
+        limiters = {}
+        if self.limits:
+            c.execute("SELECT component, tokens, updated FROM rate_limit_state")
+            for component, tokens, updated in c.fetchall():
+                max_rate = self.limits.get(component)
+                if max_rate is not None:
+                    limiters[component] = self._bucket(component, max_rate, tokens, updated)
+        self.limiters = limiters
+
+    def _bucket(self, component, max_rate, tokens, updated):
+        bucket = TokenBucket(max_rate, max_rate / 60.0, tokens, updated)
+        bucket.record(self.spent.get(component, 0), now=updated)
+        return bucket
+
+    def _load_guardrails(self, c):
+        guardrails = {}
+        c.execute("SELECT id, name, type, limit_value, enforcement FROM guardrails WHERE enabled=1")
+        for guardrail_id, name, type, limit_value, enforcement in c.fetchall():
+            limit = json.loads(limit_value)
+            guardrails.setdefault(type, []).append(
+                (guardrail_id, name, limit.get("min"), limit.get("max"), enforcement)
+            )
+        self.guardrails = guardrails
+
+    def _recent_executions(self, c, component):
+        """Executions in the last minute, used once to seed a new bucket"""
+        cutoff = epoch_ms(datetime.now() - timedelta(minutes=1))
+        try:
+            ts = epoch_column(c, "tool_executions")
             c.execute(
-                """INSERT INTO prevention_events (rule_id, prevented, details, created_at)
-                        VALUES (?, ?, ?, ?)""",
-                (rule_id, action, json.dumps(details), datetime.now().isoformat()),
+                f"""SELECT COUNT(*) FROM tool_executions
+                         WHERE {ts} > ? AND tool_id IN
+                         (SELECT id FROM tools WHERE name=?)""",
+                (cutoff, component),
             )
-            conn.commit()
+        except sqlite3.OperationalError:
+            return 0
+        return c.fetchone()[0]
+
+    def check(self, context):
+        """Evaluate every enabled rule; returns the list of prevented actions"""
+        with self.lock:
+            self._refresh()
+            prevented = []
+            for rule in self.rules:
+                details = rule["check"](context, self.limiters)
+                if details is not None:
+                    prevented.append({"rule": rule, "details": details})
+            self._maybe_persist()
+            return prevented
+
+    def check_guardrails(self, pairs):
+        """Violations for each (type, value) pair, in input order"""
+        with self.lock:
+            self._refresh()
+            now = datetime.now().isoformat()
+            results = []
+            for type, value in pairs:
+                violations = []
+                for guardrail_id, name, low, high, enforcement in self.guardrails.get(type, ()):
+                    for kind, limit, broken in (
+                        ("max_exceeded", high, high is not None and value > high),
+                        ("min_violated", low, low is not None and value < low),
+                    ):
+                        if broken:
+                            violations.append(
+                                {
+                                    "guardrail": name,
+                                    "type": kind,
+                                    "value": value,
+                                    "limit": limit,
+                                    "enforcement": enforcement,
+                                }
+                            )
+                            self.violations.append(
+                                (guardrail_id, kind, value, limit, enforcement, now)
+                            )
+                results.append(violations)
+
+            if len(self.violations) >= VIOLATION_BATCH:
+                self._write_violations()
+            self._maybe_persist()
+            return results
+
+    def _write_violations(self):
+        self.conn.executemany(
+            """INSERT INTO guardrail_violations
+                     (guardrail_id, type, value, limit_value, enforcement, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?)""",
+            self.violations,
+        )
+        self.conn.commit()
+        self.violations = []
+
+    def note_execution(self, component):
+        """Spend one token of the component's rate limit (if it has one)
+
+        Returns False when the bucket was already empty, i.e. the execution
+        went over the limit. The spend is in memory only until the next
+        reconcile.
+        """
+        with self.lock:
+            self._refresh()
+            bucket = self.limiters.get(component)
+            if bucket is None:
+                return True
+            allowed = bucket.available() >= 1
+            bucket.record()
+            self.spent[component] = self.spent.get(component, 0) + 1
+            self._maybe_persist()
+            return allowed
+
+    def _reconcile(self):
+        """Apply spends since the last reconcile and reload just those buckets"""
+        c = self.conn.cursor()
+        now = time.time()
+        stored = {}
+        try:
+            for component, spent in self.spent.items():
+                max_rate = self.limits.get(component)
+                if max_rate is None:
+                    continue
+                row = c.execute(
+                    RECONCILE_SQL,
+                    {
+                        "component": component,
+                        "capacity": max_rate,
+                        "rate": max_rate / 60.0,
+                        "spent": spent,
+                        "now": now,
+                    },
+                ).fetchone()
+                if row is not None:
+                    stored[component] = (max_rate, *row)
+            self.conn.commit()
+        except sqlite3.OperationalError:
+            # Busy database: keep the spends and retry on the next interval
+            self.conn.rollback()
+            return
+        self.spent = {}
+        for component, (max_rate, tokens, updated) in stored.items():
+            self.limiters[component] = self._bucket(component, max_rate, tokens, updated)
+
+    def _maybe_persist(self, force=False):
+        now = time.time()
+        if not force and now - self._persisted < PERSIST_INTERVAL:
+            return
+        self._persisted = now
+        if self.spent:
+            self._reconcile()
+        if self.violations:
+            self._write_violations()
+
+    def flush(self):
+        with self.lock:
+            try:
+                self._maybe_persist(force=True)
+            except sqlite3.Error:
+                pass
+
+
+# database path -> RuleEvaluator
+_EVALUATORS = {}
+
+
+def get_evaluator():
+    """Evaluator for the current DB_PATH, created on first use"""
+    key = str(DB_PATH)
+    if key not in _EVALUATORS:
+        _EVALUATORS[key] = RuleEvaluator(DB_PATH)
+    return _EVALUATORS[key]
+
+
+@atexit.register
+def _flush_evaluators():
+    for evaluator in _EVALUATORS.values():
+        evaluator.flush()
+
+
+def note_execution(component):
+    """Record a tool execution against its shared rate limit; False if over the limit"""
+    return get_evaluator().note_execution(component)
 
-            prevented.append({"rule": name, "action": action, "details": details})
 
-    conn.close()
-    return prevented
+def check_prevention_rules(context):
+    """Check all prevention rules (lightweight)"""
+    evaluator = get_evaluator()
+    hits = evaluator.check(context)
+    if not hits:
+        return []
+
+    # Log preventions
+    now = datetime.now().isoformat()
+    for h in hits:
+        audit_sink.write(
+            DB_PATH,
+            """INSERT INTO prevention_events (rule_id, prevented, details, created_at)
+                    VALUES (?, ?, ?, ?)""",
+            (h["rule"]["id"], h["rule"]["action"], json.dumps(h["details"]), now),
+        )
+
+    return [
+        {"rule": h["rule"]["name"], "action": h["rule"]["action"], "details": h["details"]}
+        for h in hits
+    ]
 
 
 # === GUARDRAILS ===
@@ -190,40 +536,12 @@ def add_guardrail(name, type, limit_value, enforcement="hard"):
 
 def check_guardrails(type, value):
     """Check if value violates guardrails"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    return get_evaluator().check_guardrails([(type, value)])[0]
 
-    c.execute("SELECT * FROM guardrails WHERE type=? AND enabled=1", (type,))
-    guardrails = c.fetchall()
-    conn.close()
 
-    violations = []
-    for g in guardrails:
-        limit = json.loads(g[3])
-
-        if "max" in limit and value > limit["max"]:
-            violations.append(
-                {
-                    "guardrail": g[1],
-                    "type": "max_exceeded",
-                    "value": value,
-                    "limit": limit["max"],
-                    "enforcement": g[4],
-                }
-            )
-
-        if "min" in limit and value < limit["min"]:
-            violations.append(
-                {
-                    "guardrail": g[1],
-                    "type": "min_violated",
-                    "value": value,
-                    "limit": limit["min"],
-                    "enforcement": g[4],
-                }
-            )
-
-    return violations
+def check_guardrails_batch(pairs):
+    """Check many (type, value) pairs at once; returns one violation list per pair"""
+    return get_evaluator().check_guardrails(pairs)
 
 
 # === EARLY WARNINGS ===
@@ -373,6 +691,7 @@ def proactive_check():
 # === PREVENTION STATS ===
 def get_prevention_stats():
     """Get prevention statistics"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
@@ -381,8 +700,9 @@ def get_prevention_stats():
     total_prevented = c.fetchone()[0]
 
     # Recent preventions
-    cutoff = (datetime.now() - timedelta(days=7)).isoformat()
-    c.execute("SELECT COUNT(*) FROM prevention_events WHERE created_at > ?", (cutoff,))
+    cutoff = epoch_ms(datetime.now() - timedelta(days=7))
+    ts = epoch_column(c, "prevention_events")
+    c.execute(f"SELECT COUNT(*) FROM prevention_events WHERE {ts} > ?", (cutoff,))
     recent_prevented = c.fetchone()[0]
 
     # Active rules
@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
 """Quality Gate: Assessments and gates to prevent system degradation"""
 import sqlite3
+import csv
 import json
+import itertools
+import math
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import audit_sink
+from time_index import add_epoch_column, epoch_column, epoch_ms
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
+# Rolling metric statistics
+EWMA_ALPHA = 0.3  # weight of the newest sample in the moving average
+TREND_WINDOW = 10  # recent samples kept per (component, metric)
+Z_THRESHOLD = 2.0  # standard deviations below the mean that count as degradation
+MIN_SAMPLES = 5  # samples needed before z-scores are trusted
+
+# Bulk ingestion
+INGEST_CHUNK = 1000  # samples per transaction
+
 
 def init_db():
     """Initialize quality gate tables"""
@@ -38,6 +53,10 @@ def init_db():
     )"""
     )
 
+    _migrate_gates(c)
+    _install_latest_metrics(c)
+    _install_metric_stats(c)
+
     # Gate executions
     c.execute(
         """CREATE TABLE IF NOT EXISTS gate_executions (
@@ -52,6 +71,8 @@ def init_db():
         FOREIGN KEY (gate_id) REFERENCES quality_gates(id)
     )"""
     )
+    add_epoch_column(c, "quality_metrics")
+    add_epoch_column(c, "gate_executions")
 
     # Assessments
     c.execute(
@@ -85,10 +106,133 @@ def init_db():
     conn.close()
 
 
+def _migrate_gates(c):
+    """Add the plan version column and the trigger that bumps it"""
+    c.execute("PRAGMA table_info(quality_gates)")
+    if "version" not in {row[1] for row in c.fetchall()}:
+        c.execute("ALTER TABLE quality_gates ADD COLUMN version INTEGER DEFAULT 0")
+    c.execute(
+        """CREATE TRIGGER IF NOT EXISTS quality_gates_version
+        AFTER UPDATE OF type, rules, enabled ON quality_gates
+        BEGIN
+            UPDATE quality_gates SET version = version + 1 WHERE id = NEW.id;
+        END"""
+    )
+
+
+def _install_latest_metrics(c):
+    """Create the latest-value-per-(component, metric) table and its triggers
+
+    Backfills from quality_metrics the first time it is created.
+    """
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_quality_metrics_lookup
+        ON quality_metrics (component, metric_name, created_at)"""
+    )
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='quality_metrics_latest'")
+    if c.fetchone():
+        return
+
+    c.execute(
+        """CREATE TABLE quality_metrics_latest (
+        component TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        metric_id INTEGER NOT NULL,
+        value REAL NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (component, metric_name)
+    ) WITHOUT ROWID"""
+    )
+    c.execute(
+        """CREATE TRIGGER quality_metrics_latest_insert AFTER INSERT ON quality_metrics
+        BEGIN
+            INSERT INTO quality_metrics_latest (component, metric_name, metric_id, value, created_at)
+            VALUES (NEW.component, NEW.metric_name, NEW.id, NEW.value, NEW.created_at)
+            ON CONFLICT (component, metric_name) DO UPDATE SET
+                metric_id = excluded.metric_id,
+                value = excluded.value,
+                created_at = excluded.created_at
+            WHERE excluded.created_at >= quality_metrics_latest.created_at;
+        END"""
+    )
+    # Deleting the current latest row promotes the next newest one
+    c.execute(
+        """CREATE TRIGGER quality_metrics_latest_delete AFTER DELETE ON quality_metrics
+        WHEN EXISTS (SELECT 1 FROM quality_metrics_latest WHERE metric_id = OLD.id)
+        BEGIN
+            DELETE FROM quality_metrics_latest WHERE metric_id = OLD.id;
+            INSERT INTO quality_metrics_latest (component, metric_name, metric_id, value, created_at)
+            SELECT component, metric_name, id, value, created_at FROM quality_metrics
+            WHERE component = OLD.component AND metric_name = OLD.metric_name
+            ORDER BY created_at DESC, id DESC LIMIT 1;
+        END"""
+    )
+    c.execute(
+        """INSERT INTO quality_metrics_latest (component, metric_name, metric_id, value, created_at)
+        SELECT component, metric_name, id, value, created_at FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY component, metric_name ORDER BY created_at DESC, id DESC
+            ) AS rank
+            FROM quality_metrics
+        ) WHERE rank = 1"""
+    )
+
+
+def _install_metric_stats(c):
+    """Create the rolling statistics table, folding in existing samples once"""
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='metric_stats'")
+    if c.fetchone():
+        return
+
+    c.execute(
+        """CREATE TABLE metric_stats (
+        component TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        mean REAL NOT NULL,
+        m2 REAL NOT NULL,
+        ewma REAL NOT NULL,
+        recent TEXT NOT NULL,
+        last_z REAL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (component, metric_name)
+    ) WITHOUT ROWID"""
+    )
+
+    states = {}
+    c.execute(
+        """SELECT component, metric_name, value, created_at FROM quality_metrics
+                 ORDER BY component, metric_name, created_at, id"""
+    )
+    for component, metric_name, value, created_at in c.fetchall():
+        key = (component, metric_name)
+        states[key] = dict(fold_metric(states.get(key), value)[0], updated_at=created_at)
+    for (component, metric_name), state in states.items():
+        _save_stats(c, component, metric_name, state)
+
+
+# Databases whose derived metric tables have been checked by this process
+_SCHEMA_READY = set()
+
+
+def _ensure_schema(conn):
+    """Install the derived metric tables once per database per process"""
+    if str(DB_PATH) in _SCHEMA_READY:
+        return
+    c = conn.cursor()
+    _migrate_gates(c)
+    _install_latest_metrics(c)
+    _install_metric_stats(c)
+    add_epoch_column(c, "quality_metrics")
+    conn.commit()
+    _SCHEMA_READY.add(str(DB_PATH))
+
+
 # === QUALITY METRICS ===
 def record_metric(component, metric_name, value, threshold):
     """Record quality metric"""
     conn = sqlite3.connect(DB_PATH)
+    _ensure_schema(conn)
     c = conn.cursor()
     now = datetime.now().isoformat()
 
@@ -99,28 +243,248 @@ def record_metric(component, metric_name, value, threshold):
                  VALUES (?, ?, ?, ?, ?, ?)""",
         (component, metric_name, value, threshold, status, now),
     )
+    metric_id = c.lastrowid
+    stats = update_metric_stats(c, component, metric_name, value, now)
 
     conn.commit()
-    metric_id = c.lastrowid
     conn.close()
 
     # Check for degradation
     if status == "fail":
-        check_degradation(component, metric_name, value, threshold)
+        check_degradation(component, metric_name, value, threshold, stats)
 
     return metric_id
 
 
+# === ROLLING STATISTICS ===
+def fold_metric(state, value):
+    """Fold one sample into rolling state; returns (new state, z-score of the sample)
+
+    The z-score compares the sample with the state *before* it was added
+    (Welford mean/variance), and is None until MIN_SAMPLES have been seen.
+    """
+    if state is None:
+        state = {"count": 0, "mean": 0.0, "m2": 0.0, "ewma": value, "recent": []}
+
+    count = state["count"]
+    z = None
+    if count >= MIN_SAMPLES:
+        std = math.sqrt(state["m2"] / (count - 1))
+        if std > 0:
+            z = (value - state["mean"]) / std
+
+    # Welford's online mean and sum of squared deviations
+    count += 1
+    delta = value - state["mean"]
+    mean = state["mean"] + delta / count
+    m2 = state["m2"] + delta * (value - mean)
+
+    return {
+        "count": count,
+        "mean": mean,
+        "m2": m2,
+        "ewma": EWMA_ALPHA * value + (1 - EWMA_ALPHA) * state["ewma"],
+        "recent": (state["recent"] + [value])[-TREND_WINDOW:],
+        "last_z": z,
+    }, z
+
+
+def _load_stats(c, component, metric_name):
+    c.execute(
+        """SELECT count, mean, m2, ewma, recent, last_z, updated_at FROM metric_stats
+                 WHERE component=? AND metric_name=?""",
+        (component, metric_name),
+    )
+    row = c.fetchone()
+    if not row:
+        return None
+    count, mean, m2, ewma, recent, last_z, updated_at = row
+    return {
+        "count": count,
+        "mean": mean,
+        "m2": m2,
+        "ewma": ewma,
+        "recent": json.loads(recent),
+        "last_z": last_z,
+        "updated_at": updated_at,
+    }
+
+
+def _save_stats(c, component, metric_name, state):
+    c.execute(
+        """INSERT OR REPLACE INTO metric_stats
+                 (component, metric_name, count, mean, m2, ewma, recent, last_z, updated_at)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            component,
+            metric_name,
+            state["count"],
+            state["mean"],
+            state["m2"],
+            state["ewma"],
+            json.dumps(state["recent"]),
+            state.get("last_z"),
+            state["updated_at"],
+        ),
+    )
+
+
+def update_metric_stats(c, component, metric_name, value, now):
+    """Fold a new sample into metric_stats using an open cursor; returns the new state"""
+    state, _ = fold_metric(_load_stats(c, component, metric_name), value)
+    state["updated_at"] = now
+    _save_stats(c, component, metric_name, state)
+    return state
+
+
+def window_trend(recent):
+    """Compare the newer and older halves of the recent window (±10%)"""
+    if len(recent) < 2:
+        return "stable"
+
+    half = len(recent) // 2
+    older_avg = sum(recent[:half]) / half
+    recent_avg = sum(recent[-half:]) / half
+
+    if recent_avg > older_avg * 1.1:
+        return "improving"
+    elif recent_avg < older_avg * 0.9:
+        return "degrading"
+    else:
+        return "stable"
+
+
+def get_metric_stats(component, metric_name):
+    """Rolling statistics for a metric, or None if it was never recorded"""
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_schema(conn)
+    state = _load_stats(conn.cursor(), component, metric_name)
+    conn.close()
+    if state:
+        count = state["count"]
+        state["std"] = math.sqrt(state["m2"] / (count - 1)) if count > 1 else 0.0
+        state["trend"] = window_trend(state["recent"])
+    return state
+
+
+# === BULK INGESTION ===
+def parse_metric_lines(lines, fmt=None):
+    """Yield metric samples (dicts) from JSONL or CSV lines
+
+    The format is detected from the first non-blank line when not given:
+    '{' means JSONL, anything else is a CSV header row.
+    """
+    lines = iter(line for line in lines if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return
+
+    fmt = fmt or ("jsonl" if first.lstrip().startswith("{") else "csv")
+    rows = itertools.chain([first], lines)
+    if fmt == "csv":
+        yield from csv.DictReader(rows, skipinitialspace=True)
+    else:
+        for line in rows:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield {}
+
+
+def _normalize_sample(sample, now):
+    """(component, metric, value, threshold, created_at) or None if malformed"""
+    try:
+        metric = sample.get("metric") or sample.get("metric_name")
+        component = sample["component"]
+        value = float(sample["value"])
+        threshold = float(sample.get("threshold") or 0)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    if not component or not metric:
+        return None
+    return component, metric, value, threshold, sample.get("created_at") or now
+
+
+def record_metrics(samples, chunk_size=INGEST_CHUNK):
+    """Bulk-record metric samples in chunked transactions
+
+    Rolling statistics are folded in memory and written once per series
+    per chunk. Degradation checks run once per affected series at the
+    end, against that series' worst failing sample. Returns counts of
+    inserted, skipped (malformed) samples, series touched and alerts raised.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_schema(conn)
+    c = conn.cursor()
+    now = datetime.now().isoformat()
+
+    states = {}
+    worst = {}  # series -> (z, value, threshold) of its lowest failing sample
+    inserted = skipped = 0
+
+    def flush(rows, dirty):
+        c.executemany(
+            """INSERT INTO quality_metrics (component, metric_name, value, threshold, status, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        for key in dirty:
+            _save_stats(c, key[0], key[1], states[key])
+        conn.commit()
+
+    rows, dirty = [], set()
+    for sample in samples:
+        parsed = _normalize_sample(sample, now)
+        if parsed is None:
+            skipped += 1
+            continue
+
+        component, metric, value, threshold, created_at = parsed
+        status = "pass" if value >= threshold else "fail"
+        rows.append((component, metric, value, threshold, status, created_at))
+
+        key = (component, metric)
+        if key not in states:
+            states[key] = _load_stats(c, component, metric)
+        states[key], z = fold_metric(states[key], value)
+        states[key]["updated_at"] = created_at
+        dirty.add(key)
+
+        if status == "fail":
+            rank = z if z is not None else math.inf
+            if key not in worst or rank <= worst[key][0]:
+                worst[key] = (rank, value, threshold, z)
+
+        if len(rows) >= chunk_size:
+            flush(rows, dirty)
+            inserted += len(rows)
+            rows, dirty = [], set()
+
+    if rows:
+        flush(rows, dirty)
+        inserted += len(rows)
+    conn.close()
+
+    alerts = 0
+    for key, (_, value, threshold, z) in worst.items():
+        stats = dict(states[key], last_z=z)
+        alerts += check_degradation(key[0], key[1], value, threshold, stats)
+
+    return {"inserted": inserted, "skipped": skipped, "series": len(states), "alerts": alerts}
+
+
 def get_metrics(component, hours=24):
     """Get recent metrics for component"""
     conn = sqlite3.connect(DB_PATH)
+    _ensure_schema(conn)
     c = conn.cursor()
 
-    cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+    cutoff = epoch_ms(datetime.now() - timedelta(hours=hours))
+    ts = epoch_column(c, "quality_metrics")
     c.execute(
-        """SELECT * FROM quality_metrics 
-                 WHERE component=? AND created_at > ?
-                 ORDER BY created_at DESC""",
+        f"""SELECT * FROM quality_metrics
+                 WHERE component=? AND {ts} > ?
+                 ORDER BY {ts} DESC""",
         (component, cutoff),
     )
 
@@ -131,21 +495,11 @@ def get_metrics(component, hours=24):
 
 def get_metric_trend(component, metric_name, hours=24):
     """Get metric trend"""
-    metrics = get_metrics(component, hours)
-    relevant = [m for m in metrics if m[2] == metric_name]
-
-    if len(relevant) < 2:
-        return "stable"
-
-    recent_avg = sum(m[3] for m in relevant[:5]) / min(5, len(relevant))
-    older_avg = sum(m[3] for m in relevant[-5:]) / min(5, len(relevant))
-
-    if recent_avg > older_avg * 1.1:
-        return "improving"
-    elif recent_avg < older_avg * 0.9:
-        return "degrading"
-    else:
+    stats = get_metric_stats(component, metric_name)
+    cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+    if not stats or stats["updated_at"] <= cutoff:
         return "stable"
+    return stats["trend"]
 
 
 # === QUALITY GATES ===
@@ -169,97 +523,115 @@ def create_gate(name, type, rules):
     return gate_id
 
 
+# (database, gate name) -> (gate id, version, compiled plan); reused until the gate row changes
+_GATE_PLANS = {}
+
+LATEST_METRICS_SQL = """SELECT component, metric_name, value FROM quality_metrics_latest
+    WHERE (component, metric_name) IN (
+        SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+    )"""
+
+TOOL_RATES_SQL = """SELECT name, success_count, failure_count FROM tools
+    WHERE name IN (SELECT value FROM json_each(?))"""
+
+
+def compile_gate(rules):
+    """Compile a gate's rule list into an execution plan
+
+    The plan groups rules by type and pre-encodes the lookup keys, so one
+    query answers every metric rule and one answers every tool rule.
+    """
+    metric_keys = sorted(
+        {(r["component"], r["metric"]) for r in rules if r.get("type") == "metric"}
+    )
+    tools = sorted({r["tool"] for r in rules if r.get("type") == "tool_success_rate"})
+    return {
+        "rules": rules,
+        "metric_keys": json.dumps(metric_keys) if metric_keys else None,
+        "tools": json.dumps(tools) if tools else None,
+        "review_score": any(r.get("type") == "review_score" for r in rules),
+    }
+
+
+def _gate_plan(c, gate_name):
+    """Cached plan for an enabled gate as (gate_id, plan), or None"""
+    c.execute("SELECT id, version FROM quality_gates WHERE name=? AND enabled=1", (gate_name,))
+    row = c.fetchone()
+    if not row:
+        return None
+
+    gate_id, version = row
+    key = (str(DB_PATH), gate_name)
+    cached = _GATE_PLANS.get(key)
+    if cached and cached[:2] == (gate_id, version):
+        return gate_id, cached[2]
+
+    c.execute("SELECT rules FROM quality_gates WHERE id=?", (gate_id,))
+    plan = compile_gate(json.loads(c.fetchone()[0]))
+    _GATE_PLANS[key] = (gate_id, version, plan)
+    return gate_id, plan
+
+
+def _evaluate(rule, value, threshold, key):
+    """Pass/fail detail for a rule given its looked-up value (None = no data)"""
+    if value is None:
+        return {"rule": rule, "status": "no_data"}
+    return {"rule": rule, "status": "pass" if value >= threshold else "fail", key: value}
+
+
 def execute_gate(gate_name, context=None):
     """Execute quality gate"""
     conn = sqlite3.connect(DB_PATH)
+    _ensure_schema(conn)
     c = conn.cursor()
 
-    c.execute("SELECT * FROM quality_gates WHERE name=? AND enabled=1", (gate_name,))
-    gate = c.fetchone()
-
-    if not gate:
+    found = _gate_plan(c, gate_name)
+    if not found:
         conn.close()
         return None
+    gate_id, plan = found
+
+    # One batched lookup per rule type
+    latest = {}
+    if plan["metric_keys"]:
+        c.execute(LATEST_METRICS_SQL, (plan["metric_keys"],))
+        latest = {(comp, metric): value for comp, metric, value in c.fetchall()}
+
+    rates = {}
+    if plan["tools"]:
+        c.execute(TOOL_RATES_SQL, (plan["tools"],))
+        rates = {
+            name: success / (success + failure) * 100
+            for name, success, failure in c.fetchall()
+            if (success + failure) > 0
+        }
+
+    avg_score = None
+    if plan["review_score"]:
+        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+        c.execute("SELECT AVG(score) FROM code_reviews WHERE created_at > ?", (week_ago,))
+        avg_score = c.fetchone()[0]
 
-    gate_id = gate[0]
-    rules = json.loads(gate[3])
-
-    passed = 0
-    failed = 0
     details = []
-
-    # Execute each rule
-    for rule in rules:
+    for rule in plan["rules"]:
         rule_type = rule.get("type")
-
         if rule_type == "metric":
-            component = rule["component"]
-            metric = rule["metric"]
-            threshold = rule["threshold"]
-
-            # Get latest metric
-            c.execute(
-                """SELECT value FROM quality_metrics 
-                        WHERE component=? AND metric_name=?
-                        ORDER BY created_at DESC LIMIT 1""",
-                (component, metric),
-            )
-            result = c.fetchone()
-
-            if result:
-                value = result[0]
-                if value >= threshold:
-                    passed += 1
-                    details.append({"rule": rule, "status": "pass", "value": value})
-                else:
-                    failed += 1
-                    details.append({"rule": rule, "status": "fail", "value": value})
-            else:
-                failed += 1
-                details.append({"rule": rule, "status": "no_data"})
-
+            value = latest.get((rule["component"], rule["metric"]))
+            details.append(_evaluate(rule, value, rule["threshold"], "value"))
         elif rule_type == "tool_success_rate":
-            tool_name = rule["tool"]
-            min_rate = rule["min_rate"]
-
-            c.execute(
-                "SELECT success_count, failure_count FROM tools WHERE name=?",
-                (tool_name,),
-            )
-            result = c.fetchone()
-
-            if result and (result[0] + result[1]) > 0:
-                rate = result[0] / (result[0] + result[1]) * 100
-                if rate >= min_rate:
-                    passed += 1
-                    details.append({"rule": rule, "status": "pass", "rate": rate})
-                else:
-                    failed += 1
-                    details.append({"rule": rule, "status": "fail", "rate": rate})
-            else:
-                failed += 1
-                details.append({"rule": rule, "status": "no_data"})
-
-        elif rule_type == "review_score":
-            min_score = rule["min_score"]
-
-            c.execute(
-                'SELECT AVG(score) FROM code_reviews WHERE created_at > datetime("now", "-7 days")'
-            )
-            result = c.fetchone()
+            rate = rates.get(rule["tool"])
+            details.append(_evaluate(rule, rate, rule["min_rate"], "rate"))
+        elif rule_type == "review_score" and avg_score:
+            details.append(_evaluate(rule, avg_score, rule["min_score"], "score"))
 
-            if result and result[0]:
-                avg_score = result[0]
-                if avg_score >= min_score:
-                    passed += 1
-                    details.append({"rule": rule, "status": "pass", "score": avg_score})
-                else:
-                    failed += 1
-                    details.append({"rule": rule, "status": "fail", "score": avg_score})
+    passed = sum(1 for d in details if d["status"] == "pass")
+    failed = len(details) - passed
 
     # Record execution
     status = "pass" if failed == 0 else "fail"
-    c.execute(
+    conn.close()
+    audit_sink.write(
+        DB_PATH,
         """INSERT INTO gate_executions (gate_id, context, status, passed, failed, details, created_at)
                  VALUES (?, ?, ?, ?, ?, ?, ?)""",
         (
@@ -273,10 +645,6 @@ def execute_gate(gate_name, context=None):
         ),
     )
 
-    conn.commit()
-    exec_id = c.lastrowid
-    conn.close()
-
     return {
         "gate": gate_name,
         "status": status,
@@ -297,6 +665,72 @@ def list_gates():
 
 
 # === ASSESSMENTS ===
+def assess_system(tool_count, avg_success, review_count, pending_proposals, unresolved):
+    """Score system health from pre-computed counts; returns (score, findings, recommendations)"""
+    findings = []
+    recommendations = []
+    score = 100
+
+    # Tool health
+    if tool_count > 0:
+        success_pct = (avg_success or 0) * 100
+        if success_pct < 80:
+            score -= 15
+            findings.append(f"Tool success rate low: {success_pct:.1f}%")
+            recommendations.append("Review and fix failing tools")
+
+    # Recent reviews
+    if review_count == 0:
+        score -= 10
+        findings.append("No code reviews in last 7 days")
+        recommendations.append("Implement regular code reviews")
+
+    # Proposals
+    if pending_proposals > 10:
+        score -= 5
+        findings.append(f"{pending_proposals} pending proposals")
+        recommendations.append("Review and process proposals")
+
+    # Degradation alerts
+    if unresolved > 0:
+        score -= unresolved * 5
+        findings.append(f"{unresolved} unresolved degradation alerts")
+        recommendations.append("Address degradation alerts")
+
+    return score, findings, recommendations
+
+
+def grade_for(score):
+    """Letter grade for an assessment score"""
+    if score >= 90:
+        return "A"
+    elif score >= 80:
+        return "B"
+    elif score >= 70:
+        return "C"
+    elif score >= 60:
+        return "D"
+    return "F"
+
+
+def save_assessment(c, type, target, score, grade, findings, recommendations):
+    """Insert an assessment row using an open cursor; returns its id"""
+    c.execute(
+        """INSERT INTO assessments (type, target, score, grade, findings, recommendations, created_at)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (
+            type,
+            target,
+            score,
+            grade,
+            json.dumps(findings),
+            json.dumps(recommendations),
+            datetime.now().isoformat(),
+        ),
+    )
+    return c.lastrowid
+
+
 def run_assessment(type, target):
     """Run comprehensive assessment"""
     conn = sqlite3.connect(DB_PATH)
@@ -307,41 +741,22 @@ def run_assessment(type, target):
     score = 100
 
     if type == "system":
-        # Check tool health
         c.execute(
-            'SELECT COUNT(*), AVG(success_count * 1.0 / NULLIF(usage_count, 0)) FROM tools WHERE status="active"'
+            """SELECT COUNT(*), AVG(success_count * 1.0 / NULLIF(usage_count, 0))
+                     FROM tools WHERE status='active'"""
         )
-        tool_stats = c.fetchone()
-        if tool_stats[0] > 0:
-            avg_success = (tool_stats[1] or 0) * 100
-            if avg_success < 80:
-                score -= 15
-                findings.append(f"Tool success rate low: {avg_success:.1f}%")
-                recommendations.append("Review and fix failing tools")
-
-        # Check recent reviews
-        c.execute('SELECT COUNT(*) FROM code_reviews WHERE created_at > datetime("now", "-7 days")')
+        tool_count, avg_success = c.fetchone()
+        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+        c.execute("SELECT COUNT(*) FROM code_reviews WHERE created_at > ?", (week_ago,))
         review_count = c.fetchone()[0]
-        if review_count == 0:
-            score -= 10
-            findings.append("No code reviews in last 7 days")
-            recommendations.append("Implement regular code reviews")
-
-        # Check proposals
         c.execute('SELECT COUNT(*) FROM proposals WHERE status="submitted"')
         pending_proposals = c.fetchone()[0]
-        if pending_proposals > 10:
-            score -= 5
-            findings.append(f"{pending_proposals} pending proposals")
-            recommendations.append("Review and process proposals")
-
-        # Check degradation alerts
         c.execute("SELECT COUNT(*) FROM degradation_alerts WHERE resolved=0")
         unresolved = c.fetchone()[0]
-        if unresolved > 0:
-            score -= unresolved * 5
-            findings.append(f"{unresolved} unresolved degradation alerts")
-            recommendations.append("Address degradation alerts")
+
+        score, findings, recommendations = assess_system(
+            tool_count, avg_success, review_count, pending_proposals, unresolved
+        )
 
     elif type == "tool":
         # Assess specific tool
@@ -362,35 +777,10 @@ def run_assessment(type, target):
                 findings.append(f"Slow execution: {tool[11]:.2f}s")
                 recommendations.append("Optimize performance")
 
-    # Determine grade
-    if score >= 90:
-        grade = "A"
-    elif score >= 80:
-        grade = "B"
-    elif score >= 70:
-        grade = "C"
-    elif score >= 60:
-        grade = "D"
-    else:
-        grade = "F"
-
-    # Save assessment
-    c.execute(
-        """INSERT INTO assessments (type, target, score, grade, findings, recommendations, created_at)
-                 VALUES (?, ?, ?, ?, ?, ?, ?)""",
-        (
-            type,
-            target,
-            score,
-            grade,
-            json.dumps(findings),
-            json.dumps(recommendations),
-            datetime.now().isoformat(),
-        ),
-    )
+    grade = grade_for(score)
+    assessment_id = save_assessment(c, type, target, score, grade, findings, recommendations)
 
     conn.commit()
-    assessment_id = c.lastrowid
     conn.close()
 
     return {
@@ -405,18 +795,40 @@ def run_assessment(type, target):
 
 
 # === DEGRADATION DETECTION ===
-def check_degradation(component, metric_name, value, threshold):
-    """Check for degradation and alert"""
-    trend = get_metric_trend(component, metric_name)
+def check_degradation(component, metric_name, value, threshold, stats=None):
+    """Check for degradation and alert
+
+    A sample more than Z_THRESHOLD standard deviations below the rolling
+    mean is degrading; until MIN_SAMPLES exist the recent-window trend is
+    used instead. Returns True if an alert was raised.
+    """
+    stats = stats or get_metric_stats(component, metric_name)
+    if not stats:
+        return False
+
+    z = stats.get("last_z")
+    if z is not None:
+        degrading = z <= -Z_THRESHOLD
+    else:
+        degrading = window_trend(stats["recent"]) == "degrading"
 
-    if trend == "degrading":
+    if degrading:
         severity = "critical" if value < threshold * 0.5 else "warning"
 
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
 
         message = f"{component}.{metric_name} degrading: {value} (threshold: {threshold})"
-        metric_data = json.dumps({"value": value, "threshold": threshold, "trend": trend})
+        metric_data = json.dumps(
+            {
+                "value": value,
+                "threshold": threshold,
+                "trend": "degrading",
+                "z_score": z,
+                "mean": stats["mean"],
+                "ewma": stats["ewma"],
+            }
+        )
 
         c.execute(
             """INSERT INTO degradation_alerts (component, severity, message, metric_data, created_at)
@@ -427,6 +839,8 @@ def check_degradation(component, metric_name, value, threshold):
         conn.commit()
         conn.close()
 
+    return degrading
+
 
 def get_alerts(resolved=False):
     """Get degradation alerts"""
@@ -461,6 +875,8 @@ def resolve_alert(alert_id):
     if len(sys.argv) < 2:
         print("Usage:")
         print("  Metric:  python quality_gate.py metric <component> <name> <value> <threshold>")
+        print("  Stats:   python quality_gate.py stats <component> <name>")
+        print("  Push:    python quality_gate.py push [jsonl|csv] < metrics  (bulk from stdin)")
         print("  Gate:    python quality_gate.py gate <create|execute|list> ...")
         print("  Assess:  python quality_gate.py assess <type> <target>")
         print("  Alerts:  python quality_gate.py alerts [resolved]")
@@ -475,6 +891,28 @@ def resolve_alert(alert_id):
         trend = get_metric_trend(sys.argv[2], sys.argv[3])
         print(f"Trend: {trend}")
 
+    elif cmd == "push":
+        fmt = sys.argv[2] if len(sys.argv) > 2 else None
+        result = record_metrics(parse_metric_lines(sys.stdin, fmt))
+        print(
+            f"✓ Recorded {result['inserted']} metrics across {result['series']} series "
+            f"({result['skipped']} skipped, {result['alerts']} alerts)"
+        )
+
+    elif cmd == "stats" and len(sys.argv) >= 4:
+        stats = get_metric_stats(sys.argv[2], sys.argv[3])
+        if stats:
+            print(f"\n{sys.argv[2]}.{sys.argv[3]} ({stats['count']} samples)")
+            print(
+                f"  Mean: {stats['mean']:.2f}  Std: {stats['std']:.2f}  "
+                f"EWMA: {stats['ewma']:.2f}"
+            )
+            if stats["last_z"] is not None:
+                print(f"  Last z-score: {stats['last_z']:+.2f}")
+            print(f"  Trend: {stats['trend']}")
+        else:
+            print("No samples recorded")
+
     elif cmd == "gate":
         subcmd = sys.argv[2] if len(sys.argv) > 2 else None
 
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""Retention: Roll audit rows up into hourly/daily aggregates, prune in batches, vacuum"""
+import sqlite3
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import audit_sink
+from time_index import (
+    PARTITION_KEEP,
+    add_epoch_column,
+    epoch_ms,
+    from_epoch_ms,
+    list_partitions,
+    refresh_view,
+)
+
+DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
+
+BATCH_SIZE = 500  # raw rows rolled up and deleted per write transaction
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+# table -> (series expression, numeric value expression, histogram category expression)
+ROLLUP_SOURCES = {
+    "tool_executions": ("'tool#' || tool_id", "runtime", "status"),
+    "health_checks": ("'system'", "NULL", "status"),
+    "quality_metrics": ("component || '.' || metric_name", "value", "status"),
+    "gate_executions": ("'gate#' || gate_id", "failed", "status"),
+    "prevention_events": ("'rule#' || rule_id", "NULL", "prevented"),
+    "session_messages": ("'session#' || session_id", "length(content)", "role"),
+}
+
+# table -> (days kept raw, days kept as hourly rollups, days kept as daily rollups or None)
+DEFAULT_POLICIES = {
+    "tool_executions": (30, 90, None),
+    "health_checks": (14, 90, None),
+    "quality_metrics": (90, 180, None),
+    "gate_executions": (30, 90, None),
+    "prevention_events": (90, 180, None),
+    "session_messages": (365, 730, None),
+}
+
+
+def init_db():
+    """Initialize retention policy and rollup tables"""
+    conn = sqlite3.connect(DB_PATH)
+    _install(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def _install(c):
+    # Retention policies (one per audit table)
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS retention_policies (
+        table_name TEXT PRIMARY KEY,
+        raw_days INTEGER NOT NULL,
+        hourly_days INTEGER NOT NULL,
+        daily_days INTEGER,
+        enabled INTEGER DEFAULT 1,
+        last_run TEXT
+    )"""
+    )
+    c.executemany(
+        """INSERT OR IGNORE INTO retention_policies (table_name, raw_days, hourly_days, daily_days)
+                 VALUES (?, ?, ?, ?)""",
+        [(table, *policy) for table, policy in DEFAULT_POLICIES.items()],
+    )
+
+    # Aggregates of pruned rows per series and time bucket
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS metric_rollups (
+        table_name TEXT NOT NULL,
+        series TEXT NOT NULL,
+        resolution TEXT NOT NULL,
+        bucket_start INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        sum REAL,
+        min REAL,
+        max REAL,
+        PRIMARY KEY (table_name, series, resolution, bucket_start)
+    ) WITHOUT ROWID"""
+    )
+
+    # Category counts (status, role, ...) per rollup bucket
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS metric_rollup_histograms (
+        table_name TEXT NOT NULL,
+        series TEXT NOT NULL,
+        resolution TEXT NOT NULL,
+        bucket_start INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (table_name, series, resolution, bucket_start, category)
+    ) WITHOUT ROWID"""
+    )
+
+
+# === POLICIES ===
+def set_policy(table, raw_days, hourly_days=None, daily_days=None, enabled=True):
+    """Create or replace the retention policy for an audit table"""
+    if table not in ROLLUP_SOURCES:
+        raise ValueError(f"No rollup definition for {table}")
+    hourly_days = max(hourly_days or raw_days, raw_days)
+    if daily_days is not None:
+        daily_days = max(daily_days, hourly_days)
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        """INSERT INTO retention_policies (table_name, raw_days, hourly_days, daily_days, enabled)
+                 VALUES (?, ?, ?, ?, ?)
+                 ON CONFLICT (table_name) DO UPDATE SET
+                     raw_days = excluded.raw_days,
+                     hourly_days = excluded.hourly_days,
+                     daily_days = excluded.daily_days,
+                     enabled = excluded.enabled""",
+        (table, raw_days, hourly_days, daily_days, int(enabled)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_policies(enabled_only=True):
+    """{table: {"raw_days", "hourly_days", "daily_days", "last_run"}}"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    query = "SELECT table_name, raw_days, hourly_days, daily_days, last_run FROM retention_policies"
+    if enabled_only:
+        query += " WHERE enabled=1"
+    c.execute(query)
+    policies = {
+        table: {"raw_days": raw, "hourly_days": hourly, "daily_days": daily, "last_run": last}
+        for table, raw, hourly, daily, last in c.fetchall()
+    }
+    conn.close()
+    return policies
+
+
+# === ROLLUP ===
+# Merging two partial aggregates; scalar min()/max() return NULL on any NULL
+_MERGE = """ON CONFLICT (table_name, series, resolution, bucket_start) DO UPDATE SET
+    count = count + excluded.count,
+    sum = CASE WHEN sum IS NULL THEN excluded.sum
+               WHEN excluded.sum IS NULL THEN sum ELSE sum + excluded.sum END,
+    min = min(COALESCE(min, excluded.min), COALESCE(excluded.min, min)),
+    max = max(COALESCE(max, excluded.max), COALESCE(excluded.max, max))"""
+
+_MERGE_HISTOGRAM = """ON CONFLICT (table_name, series, resolution, bucket_start, category)
+    DO UPDATE SET count = count + excluded.count"""
+
+
+def _roll_up_batch(c, table, source, cutoff_ms, keep, batch_size):
+    """Fold the oldest expired rows of one source into hourly buckets, then delete them
+
+    Returns the number of raw rows removed (0 once the source is clean).
+    """
+    series, value, category = ROLLUP_SOURCES[table]
+    c.execute("DELETE FROM retention_batch")
+    c.execute(
+        f"""INSERT INTO retention_batch (id)
+            SELECT id FROM {source} WHERE ts_ms < ? {keep} ORDER BY ts_ms LIMIT ?""",
+        (cutoff_ms, batch_size),
+    )
+    if c.rowcount <= 0:
+        return 0
+
+    rows = f"""SELECT {series} AS series, {value} AS value, {category} AS category,
+                      (ts_ms / {HOUR_MS}) * {HOUR_MS} AS bucket
+               FROM {source} WHERE id IN (SELECT id FROM retention_batch)"""
+    c.execute(
+        f"""INSERT INTO metric_rollups
+            (table_name, series, resolution, bucket_start, count, sum, min, max)
+            SELECT ?, series, 'hour', bucket, COUNT(*), SUM(value), MIN(value), MAX(value)
+            FROM ({rows}) WHERE true GROUP BY series, bucket
+            {_MERGE}""",
+        (table,),
+    )
+    c.execute(
+        f"""INSERT INTO metric_rollup_histograms
+            (table_name, series, resolution, bucket_start, category, count)
+            SELECT ?, series, 'hour', bucket, COALESCE(category, ''), COUNT(*)
+            FROM ({rows}) WHERE true GROUP BY series, bucket, COALESCE(category, '')
+            {_MERGE_HISTOGRAM}""",
+        (table,),
+    )
+    c.execute(f"DELETE FROM {source} WHERE id IN (SELECT id FROM retention_batch)")
+    return c.rowcount
+
+
+def _coarsen(c, table, cutoff_ms):
+    """Fold hourly rollups older than cutoff into daily ones in one statement pair"""
+    day = f"(bucket_start / {DAY_MS}) * {DAY_MS}"
+    c.execute(
+        f"""INSERT INTO metric_rollups
+            (table_name, series, resolution, bucket_start, count, sum, min, max)
+            SELECT table_name, series, 'day', {day}, SUM(count), SUM(sum), MIN(min), MAX(max)
+            FROM metric_rollups
+            WHERE table_name=? AND resolution='hour' AND bucket_start < ?
+            GROUP BY series, {day}
+            {_MERGE}""",
+        (table, cutoff_ms),
+    )
+    c.execute(
+        f"""INSERT INTO metric_rollup_histograms
+            (table_name, series, resolution, bucket_start, category, count)
+            SELECT table_name, series, 'day', {day}, category, SUM(count)
+            FROM metric_rollup_histograms
+            WHERE table_name=? AND resolution='hour' AND bucket_start < ?
+            GROUP BY series, {day}, category
+            {_MERGE_HISTOGRAM}""",
+        (table, cutoff_ms),
+    )
+    merged = 0
+    for rollup_table in ("metric_rollups", "metric_rollup_histograms"):
+        c.execute(
+            f"""DELETE FROM {rollup_table}
+                WHERE table_name=? AND resolution='hour' AND bucket_start < ?""",
+            (table, cutoff_ms),
+        )
+        merged = merged or c.rowcount
+    return merged
+
+
+def _expire(c, table, cutoff_ms):
+    """Drop daily rollups past the end of their retention"""
+    for rollup_table in ("metric_rollups", "metric_rollup_histograms"):
+        c.execute(
+            f"""DELETE FROM {rollup_table}
+                WHERE table_name=? AND resolution='day' AND bucket_start < ?""",
+            (table, cutoff_ms),
+        )
+
+
+def apply_policy(conn, table, policy, now=None, batch_size=BATCH_SIZE):
+    """Roll up and prune one table; each batch commits on its own
+
+    Raw rows older than raw_days become hourly buckets, hourly buckets older
+    than hourly_days become daily ones, and daily ones older than daily_days
+    (if set) are dropped. Partitions made by time_index are pruned the same
+    way and dropped once empty. Returns counts of what changed.
+    """
+    now = now or datetime.now()
+    c = conn.cursor()
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    if not c.fetchone():
+        return {"table": table, "rolled_up": 0, "hourly_merged": 0, "partitions_dropped": 0}
+
+    _install(c)
+    add_epoch_column(c, table)
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS retention_batch (id INTEGER PRIMARY KEY)")
+    conn.commit()
+
+    keep = ""
+    if table in PARTITION_KEEP:
+        derived, condition = PARTITION_KEEP[table]
+        c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (derived,))
+        if c.fetchone():
+            keep = f"AND {condition}"
+
+    raw_cutoff = epoch_ms(now - timedelta(days=policy["raw_days"]))
+    partitions = [p for p in list_partitions(c, table) if p[2] < raw_cutoff]
+    rolled_up = 0
+    for source in [table] + [p[0] for p in partitions]:
+        while True:
+            removed = _roll_up_batch(c, table, source, raw_cutoff, keep, batch_size)
+            conn.commit()
+            if not removed:
+                break
+            rolled_up += removed
+
+    dropped = 0
+    for name, _, _, end in partitions:
+        c.execute(f"SELECT EXISTS (SELECT 1 FROM {name})")
+        if end <= raw_cutoff and not c.fetchone()[0]:
+            c.execute(f"DROP TABLE {name}")
+            dropped += 1
+    if dropped:
+        refresh_view(c, table)
+
+    merged = _coarsen(c, table, epoch_ms(now - timedelta(days=policy["hourly_days"])))
+    if policy.get("daily_days"):
+        _expire(c, table, epoch_ms(now - timedelta(days=policy["daily_days"])))
+    c.execute(
+        "UPDATE retention_policies SET last_run=? WHERE table_name=?", (now.isoformat(), table)
+    )
+    conn.commit()
+    return {
+        "table": table,
+        "rolled_up": rolled_up,
+        "hourly_merged": merged,
+        "partitions_dropped": dropped,
+    }
+
+
+# === VACUUM ===
+def enable_incremental_vacuum():
+    """Switch the database to incremental auto-vacuum (one full VACUUM, run once)"""
+    conn = sqlite3.connect(DB_PATH)
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    conn.close()
+    return mode != 2
+
+
+def incremental_vacuum(conn, pages=None):
+    """Return free pages to the filesystem; returns pages freed (None if not enabled)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return None
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if pages:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    else:
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+    return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def run_retention(now=None, batch_size=BATCH_SIZE, tables=None):
+    """Apply every enabled policy, then reclaim the freed pages"""
+    audit_sink.flush(DB_PATH)
+    policies = get_policies()
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        results = [
+            apply_policy(conn, table, policy, now, batch_size)
+            for table, policy in policies.items()
+            if table in ROLLUP_SOURCES and (tables is None or table in tables)
+        ]
+        freed = incremental_vacuum(conn)
+    finally:
+        conn.close()
+    return {"tables": results, "pages_freed": freed}
+
+
+# === ROLLUP QUERIES ===
+def get_rollups(table, series=None, resolution=None, since=None):
+    """Aggregated history for a table, oldest bucket first
+
+    Each entry has count/sum/min/max, the mean and a {category: count}
+    histogram.
+    """
+    query = """SELECT r.series, r.resolution, r.bucket_start, r.count, r.sum, r.min, r.max,
+                      (SELECT json_group_object(h.category, h.count) FROM metric_rollup_histograms h
+                       WHERE h.table_name = r.table_name AND h.series = r.series
+                         AND h.resolution = r.resolution AND h.bucket_start = r.bucket_start)
+               FROM metric_rollups r WHERE r.table_name=?"""
+    params = [table]
+    if series:
+        query += " AND r.series=?"
+        params.append(series)
+    if resolution:
+        query += " AND r.resolution=?"
+        params.append(resolution)
+    if since:
+        query += " AND r.bucket_start >= ?"
+        params.append(since if isinstance(since, int) else epoch_ms(since))
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(query + " ORDER BY r.bucket_start, r.series", params)
+    rollups = [
+        {
+            "series": series,
+            "resolution": resolution,
+            "bucket": from_epoch_ms(bucket).isoformat(),
+            "count": count,
+            "sum": total,
+            "min": low,
+            "max": high,
+            "mean": total / count if total is not None and count else None,
+            "histogram": json.loads(histogram) if histogram else {},
+        }
+        for series, resolution, bucket, count, total, low, high, histogram in c.fetchall()
+    ]
+    conn.close()
+    return rollups
+
+
+if __name__ == "__main__":
+    import sys
+
+    init_db()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if cmd == "run":
+        result = run_retention(tables=sys.argv[2:] or None)
+        for r in result["tables"]:
+            print(
+                f"✓ {r['table']}: rolled up {r['rolled_up']} rows, "
+                f"merged {r['hourly_merged']} hourly buckets, "
+                f"dropped {r['partitions_dropped']} partitions"
+            )
+        if result["pages_freed"] is None:
+            print("ℹ️  Incremental vacuum not enabled (retention.py enable-vacuum)")
+        else:
+            print(f"✓ Vacuum freed {result['pages_freed']} pages")
+
+    elif cmd == "set" and len(sys.argv) >= 4:
+        hourly = int(sys.argv[4]) if len(sys.argv) > 4 else None
+        daily = int(sys.argv[5]) if len(sys.argv) > 5 else None
+        set_policy(sys.argv[2], int(sys.argv[3]), hourly, daily)
+        print(f"✓ Policy set for {sys.argv[2]}")
+
+    elif cmd == "enable-vacuum":
+        if enable_incremental_vacuum():
+            print("✓ Incremental vacuum enabled")
+        else:
+            print("ℹ️  Incremental vacuum already enabled")
+
+    elif cmd == "status":
+        print("\n🗄️  Retention policies (raw / hourly / daily days):")
+        for table, p in get_policies(enabled_only=False).items():
+            daily = p["daily_days"] or "∞"
+            last = p["last_run"][:16] if p["last_run"] else "never"
+            print(
+                f"  {table:20} {p['raw_days']:>4} / {p['hourly_days']:>4} / {daily:>4}"
+                f"  (last run: {last})"
+            )
+
+    else:
+        print("Usage: retention.py [status|run [table...]|set <table> <raw> [hourly] [daily]")
+        print("                     |enable-vacuum]")
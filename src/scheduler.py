@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Scheduler: Long-running daemon that runs maintenance and automated tasks on time"""
+import heapq
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import maintenance_system
+import task_automator
+from maintenance_system import (
+    TASK_SELECT,
+    ResourceGate,
+    calculate_next_run,
+    count_missed_runs,
+    execute_tasks,
+    task_from_row,
+)
+
+DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
+
+# Longest single sleep, so edits to the task tables are picked up promptly
+POLL_INTERVAL = 5.0
+
+# Task tables and the columns whose changes require a reload
+WATCHED_TABLES = {
+    "maintenance_tasks": "schedule, command, enabled, priority, resource_class, next_run",
+    "auto_tasks": "schedule, command, enabled",
+}
+
+
+def init_db():
+    """Initialize task tables plus the change counter the daemon watches"""
+    maintenance_system.init_db()
+    task_automator.init_db()
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS scheduler_state (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )"""
+    )
+    c.execute("INSERT OR IGNORE INTO scheduler_state (key, value) VALUES ('tasks_version', 0)")
+
+    for table, columns in WATCHED_TABLES.items():
+        for event in ("INSERT", "DELETE", f"UPDATE OF {columns}"):
+            trigger = f"{table}_{event.split()[0].lower()}_version"
+            c.execute(
+                f"""CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE scheduler_state SET value = value + 1 WHERE key = 'tasks_version';
+                END"""
+            )
+
+    conn.commit()
+    conn.close()
+
+
+def _next_due(schedule, after):
+    """Next deadline for a schedule as a datetime"""
+    return datetime.fromisoformat(calculate_next_run(schedule, after))
+
+
+def _record(task, status, duration, output, error):
+    """Store a result in the table the task came from"""
+    if task["source"] == "maintenance":
+        maintenance_system.record_execution(task, status, duration, output, error)
+        return
+
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        conn.execute(
+            "UPDATE auto_tasks SET last_run = ?, run_count = run_count + 1 WHERE id = ?",
+            (datetime.now().isoformat(), task["id"]),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class Scheduler:
+    """Keeps task deadlines in a min-heap and sleeps until the next one
+
+    Tasks are loaded once. The daemon reloads only when PRAGMA data_version
+    reports a commit from another connection *and* the trigger-maintained
+    tasks_version counter moved, so unrelated writes cost one pragma call.
+    Every batch shares one ResourceGate, so locks, resource slots and
+    running dependencies apply across ticks, not just within a batch.
+    """
+
+    def __init__(self, max_workers=None, poll_interval=POLL_INTERVAL):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.heap = []
+        self.running = set()
+        self.gate = ResourceGate()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._conn = None
+        self._data_version = None
+        self._tasks_version = None
+        self._loaded = False
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(DB_PATH)
+        return self._conn.cursor()
+
+    def tasks_changed(self):
+        """Cheap check whether the task tables changed since the last load"""
+        c = self._connect()
+        data_version = c.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+
+        row = c.execute("SELECT value FROM scheduler_state WHERE key = 'tasks_version'").fetchone()
+        version = row[0] if row else None
+        if version == self._tasks_version:
+            return False
+        self._tasks_version = version
+        return True
+
+    def load(self):
+        """Rebuild the deadline heap from the task tables"""
+        c = self._connect()
+        now = datetime.now()
+        entries = []
+
+        c.execute(TASK_SELECT + " WHERE enabled = 1")
+        for row in c.fetchall():
+            task = dict(task_from_row(row), source="maintenance")
+            due = datetime.fromisoformat(task["next_run"]) if task["next_run"] else now
+            entries.append((due, "maintenance", task["id"], task))
+
+        c.execute(
+            """SELECT id, name, schedule, command, last_run, created_at
+                     FROM auto_tasks WHERE enabled = 1 AND schedule IS NOT NULL"""
+        )
+        for task_id, name, schedule, command, last_run, created_at in c.fetchall():
+            try:
+                due = _next_due(schedule, datetime.fromisoformat(last_run or created_at))
+            except ValueError as e:
+                print(f"⚠️  Skipping auto task #{task_id} ({name}): {e}")
+                continue
+            task = {
+                "id": task_id,
+                "name": name,
+                "schedule": schedule,
+                "command": command,
+                "priority": "normal",
+                "resource_class": "default",
+                "next_run": None,
+                "source": "auto",
+            }
+            entries.append((due, "auto", task_id, task))
+
+        heapq.heapify(entries)
+        self.heap = entries
+        self._loaded = True
+        return len(entries)
+
+    def tick(self, now=None):
+        """Dispatch every task whose deadline has passed; returns the tasks started"""
+        if self.tasks_changed() or not self._loaded:
+            self.load()
+
+        now = now or datetime.now()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, source, task_id, task = heapq.heappop(self.heap)
+            with self._lock:
+                busy = (source, task_id) in self.running
+            if not busy:
+                # One run covers every slot missed while the daemon was down
+                due.append(dict(task, missed=count_missed_runs(task["schedule"], deadline, now)))
+            next_due = _next_due(task["schedule"], now)
+            heapq.heappush(self.heap, (next_due, source, task_id, task))
+
+        if due:
+            self._dispatch(due)
+        return due
+
+    def _dispatch(self, tasks):
+        """Run due tasks in the background so later deadlines are not delayed
+
+        Each source table is its own batch: maintenance tasks run as a
+        dependency DAG, automated tasks have no dependencies. Batches wait
+        for each other through the shared gate.
+        """
+        batches = defaultdict(list)
+        for task in tasks:
+            batches[task["source"]].append(task)
+
+        for batch in batches.values():
+            keys = {(t["source"], t["id"]) for t in batch}
+            with self._lock:
+                self.running |= keys
+            thread = threading.Thread(
+                target=self._run_batch, args=(batch, keys), name="scheduler-batch", daemon=True
+            )
+            self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+            thread.start()
+
+    def _run_batch(self, batch, keys):
+        try:
+            execute_tasks(batch, self.max_workers, record=_record, gate=self.gate)
+        except ValueError as e:
+            print(f"✗ Scheduler batch failed: {e}")
+        finally:
+            with self._lock:
+                self.running -= keys
+
+    def seconds_until_next(self):
+        """Time to sleep: until the next deadline, capped by the poll interval"""
+        if not self.heap:
+            return self.poll_interval
+        delta = (self.heap[0][0] - datetime.now()).total_seconds()
+        return max(0.0, min(delta, self.poll_interval))
+
+    def upcoming(self, limit=10):
+        """Next deadlines as (due, source, name)"""
+        entries = heapq.nsmallest(limit, self.heap)
+        return [(due, source, task["name"]) for due, source, _, task in entries]
+
+    def join(self):
+        """Wait for dispatched batches to finish"""
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run(self):
+        """Run until stop() is called"""
+        try:
+            while not self._stop.is_set():
+                self.tick()
+                self._stop.wait(self.seconds_until_next())
+        finally:
+            self.join()
+            self.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def run_scheduler(max_workers=None):
+    """Run the scheduler daemon in the foreground (Ctrl+C or SIGTERM to stop)"""
+    import signal
+
+    init_db()
+    scheduler = Scheduler(max_workers=max_workers)
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+
+    scheduler.load()
+    print(f"⏰ Scheduler started ({len(scheduler.heap)} tasks)")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+        scheduler.join()
+    print("⏰ Scheduler stopped")
+
+
+def run_once(max_workers=None):
+    """Dispatch whatever is due right now and wait for it (cron-style fallback)"""
+    init_db()
+    scheduler = Scheduler(max_workers=max_workers)
+    started = scheduler.tick()
+    scheduler.join()
+    scheduler.close()
+    return started
+
+
+def list_upcoming(limit=10):
+    """Next task deadlines as (due, source, name)"""
+    init_db()
+    scheduler = Scheduler()
+    scheduler.load()
+    upcoming = scheduler.upcoming(limit)
+    scheduler.close()
+    return upcoming
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "run"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    if cmd == "run":
+        run_scheduler(workers)
+
+    elif cmd == "once":
+        started = run_once(workers)
+        print(f"✓ Dispatched {len(started)} due tasks")
+        for task in started:
+            print(f"  • {task['name']}")
+
+    elif cmd == "next":
+        print("\n⏰ Upcoming tasks:")
+        for due, source, name in list_upcoming():
+            print(f"  {due.strftime('%Y-%m-%d %H:%M')}  [{source}] {name}")
+
+    else:
+        print("Usage: scheduler.py [run|once|next] [workers]")
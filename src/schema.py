@@ -3,6 +3,8 @@
 import sqlite3
 from pathlib import Path
 
+from time_index import EPOCH_TABLES, add_epoch_column
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
 TABLES = {
@@ -130,6 +132,8 @@ def init_all():
 
     for name, sql in TABLES.items():
         c.execute(sql)
+        if name in EPOCH_TABLES:
+            add_epoch_column(c, name)
 
     conn.commit()
     conn.close()
@@ -2,11 +2,23 @@
 """Session Manager: Track context, conversations, and state between sessions"""
 import sqlite3
 import json
-from datetime import datetime
+import time
+import zlib
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from time_index import add_epoch_column
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
+STATE_FLUSH_INTERVAL = 2.0  # seconds a SessionState keeps dirty keys before writing
+COMPRESS_MIN_BYTES = 1024  # message bodies at least this large are stored zlib-compressed
+ARCHIVE_AFTER_DAYS = 30  # ended sessions older than this move to cold storage
+ARCHIVE_PATH = None  # separate database file for archived sessions (None: main database)
+
+MESSAGE_COLUMNS = "id, session_id, role, content, metadata, created_at, encoding"
+SEARCH_LIMIT = 20  # ranked hits returned by search_history
+
 
 def init_db():
     """Initialize session tables"""
@@ -38,6 +50,8 @@ def init_db():
         FOREIGN KEY (session_id) REFERENCES sessions(id)
     )"""
     )
+    add_epoch_column(c, "session_messages")
+    _migrate_messages(c)
 
     # Session state (key-value store per session)
     c.execute(
@@ -51,6 +65,7 @@ def init_db():
         UNIQUE(session_id, key)
     )"""
     )
+    _migrate_state(c)
 
     # Session bookmarks (important moments)
     c.execute(
@@ -65,11 +80,115 @@ def init_db():
         FOREIGN KEY (message_id) REFERENCES session_messages(id)
     )"""
     )
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_session_bookmarks_session
+        ON session_bookmarks (session_id, message_id)"""
+    )
+
+    _migrate_sessions(c)
+    _install_search(c)
+    _create_archive_table(c, _attach_archive(conn))
 
     conn.commit()
     conn.close()
 
 
+def _migrate_sessions(c):
+    """Add archived_at, set when a session's messages move to cold storage"""
+    c.execute("PRAGMA table_info(sessions)")
+    if "archived_at" not in {row[1] for row in c.fetchall()}:
+        c.execute("ALTER TABLE sessions ADD COLUMN archived_at TEXT")
+
+
+def _install_search(c):
+    """Create the FTS5 message index, its triggers and a one-off backfill
+
+    The index keeps its own plain-text copy so compressed bodies are
+    searchable and snippets work. Triggers index plain rows; add_message
+    indexes compressed ones itself, since SQL can't inflate them. Rows
+    removed by archival stay indexed, so archived sessions remain
+    searchable. Skipped when SQLite lacks FTS5.
+    """
+    c.execute("SELECT 1 FROM sqlite_master WHERE name='session_messages_fts'")
+    if c.fetchone():
+        return
+    try:
+        c.execute(
+            """CREATE VIRTUAL TABLE session_messages_fts USING fts5(
+            content, user UNINDEXED, session_id UNINDEXED, role UNINDEXED,
+            created_at UNINDEXED,
+            tokenize = 'porter unicode61'
+        )"""
+        )
+    except sqlite3.OperationalError:
+        return
+
+    c.execute(
+        """CREATE TRIGGER session_messages_fts_insert AFTER INSERT ON session_messages
+        WHEN NEW.encoding IS NULL
+        BEGIN
+            INSERT INTO session_messages_fts (rowid, content, user, session_id, role, created_at)
+            VALUES (NEW.id, NEW.content,
+                    (SELECT user FROM sessions WHERE id = NEW.session_id),
+                    NEW.session_id, NEW.role, NEW.created_at);
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER session_messages_fts_delete AFTER DELETE ON session_messages
+        WHEN (SELECT archived_at FROM sessions WHERE id = OLD.session_id) IS NULL
+        BEGIN
+            DELETE FROM session_messages_fts WHERE rowid = OLD.id;
+        END"""
+    )
+    c.execute(
+        """CREATE TRIGGER session_messages_fts_update AFTER UPDATE OF content ON session_messages
+        WHEN NEW.encoding IS NULL
+        BEGIN
+            DELETE FROM session_messages_fts WHERE rowid = OLD.id;
+            INSERT INTO session_messages_fts (rowid, content, user, session_id, role, created_at)
+            VALUES (NEW.id, NEW.content,
+                    (SELECT user FROM sessions WHERE id = NEW.session_id),
+                    NEW.session_id, NEW.role, NEW.created_at);
+        END"""
+    )
+
+    c.execute(
+        """INSERT INTO session_messages_fts (rowid, content, user, session_id, role, created_at)
+        SELECT m.id, m.content, s.user, m.session_id, m.role, m.created_at
+        FROM session_messages m LEFT JOIN sessions s ON s.id = m.session_id
+        WHERE m.encoding IS NULL"""
+    )
+    c.execute(
+        """SELECT m.id, m.content, s.user, m.session_id, m.role, m.created_at
+        FROM session_messages m LEFT JOIN sessions s ON s.id = m.session_id
+        WHERE m.encoding = 'zlib'"""
+    )
+    compressed = [(row[0], decode_content(row[1], "zlib"), *row[2:]) for row in c.fetchall()]
+    c.executemany(
+        """INSERT INTO session_messages_fts (rowid, content, user, session_id, role, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        compressed,
+    )
+
+
+def _migrate_messages(c):
+    """Add the body encoding column and the (session_id, id) pagination index"""
+    c.execute("PRAGMA table_info(session_messages)")
+    if "encoding" not in {row[1] for row in c.fetchall()}:
+        c.execute("ALTER TABLE session_messages ADD COLUMN encoding TEXT")
+    c.execute(
+        """CREATE INDEX IF NOT EXISTS idx_session_messages_session
+        ON session_messages (session_id, id)"""
+    )
+
+
+def _migrate_state(c):
+    """Add the per-key version used for optimistic concurrency checks"""
+    c.execute("PRAGMA table_info(session_state)")
+    if "version" not in {row[1] for row in c.fetchall()}:
+        c.execute("ALTER TABLE session_state ADD COLUMN version INTEGER DEFAULT 0")
+
+
 # === SESSIONS ===
 def start_session(user, title=None, context=None):
     """Start new session"""
@@ -144,55 +263,475 @@ def update_session_context(session_id, context):
 
 
 # === MESSAGES ===
+def encode_content(content):
+    """(stored value, encoding) for a message body; large bodies are zlib-compressed"""
+    raw = content.encode()
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            return packed, "zlib"
+    return content, None
+
+
+def decode_content(stored, encoding):
+    return zlib.decompress(stored).decode() if encoding == "zlib" else stored
+
+
+def _decode_row(row):
+    """Message tuple (id, session_id, role, content, metadata, created_at) with plain content"""
+    return (*row[:3], decode_content(row[3], row[6]), *row[4:6])
+
+
 def add_message(session_id, role, content, metadata=None):
     """Add message to session"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     now = datetime.now().isoformat()
     metadata_json = json.dumps(metadata) if metadata else None
+    stored, encoding = encode_content(content)
 
     c.execute(
-        """INSERT INTO session_messages (session_id, role, content, metadata, created_at)
-                 VALUES (?, ?, ?, ?, ?)""",
-        (session_id, role, content, metadata_json, now),
+        """INSERT INTO session_messages (session_id, role, content, metadata, created_at, encoding)
+                 VALUES (?, ?, ?, ?, ?, ?)""",
+        (session_id, role, stored, metadata_json, now, encoding),
     )
+    msg_id = c.lastrowid
+
+    # The insert trigger only sees the compressed blob, so index the text here
+    if encoding is not None and _has_search(c):
+        c.execute(
+            """INSERT INTO session_messages_fts
+                     (rowid, content, user, session_id, role, created_at)
+                     VALUES (?, ?, (SELECT user FROM sessions WHERE id = ?), ?, ?, ?)""",
+            (msg_id, content, session_id, session_id, role, now),
+        )
 
     conn.commit()
-    msg_id = c.lastrowid
     conn.close()
     return msg_id
 
 
-def get_messages(session_id, limit=50):
-    """Get session messages"""
+def get_messages(session_id, limit=50, before_id=None):
+    """Page of session messages, oldest first, ending just before `before_id`
+
+    Keyset pagination over (session_id, id): pass the first id of a page
+    as before_id to fetch the page before it. Archived sessions are read
+    from cold storage transparently.
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute(
-        "SELECT * FROM session_messages WHERE session_id=? ORDER BY created_at DESC LIMIT ?",
-        (session_id, limit),
+        f"""SELECT {MESSAGE_COLUMNS} FROM session_messages
+                 WHERE session_id=? AND id < ? ORDER BY id DESC LIMIT ?""",
+        (session_id, before_id if before_id is not None else 2**63 - 1, limit),
     )
-    results = c.fetchall()
+    results = [_decode_row(row) for row in c.fetchall()]
+
+    if len(results) < limit:
+        archived = _archived_messages(conn, session_id)
+        if archived:
+            cutoff = results[-1][0] if results else before_id
+            older = [m for m in archived if cutoff is None or m[0] < cutoff]
+            results.extend(reversed(older[-(limit - len(results)) :]))
     conn.close()
     return list(reversed(results))
 
 
+def iter_messages(session_id, page_size=500):
+    """Every message of a session, oldest first, fetched page by page"""
+    after_id = 0
+    while True:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute(
+            f"""SELECT {MESSAGE_COLUMNS} FROM session_messages
+                     WHERE session_id=? AND id > ? ORDER BY id LIMIT ?""",
+            (session_id, after_id, page_size),
+        )
+        page = [_decode_row(row) for row in c.fetchall()]
+        archived = _archived_messages(conn, session_id) if after_id == 0 else []
+        conn.close()
+
+        for message in archived:
+            yield message
+        for message in page:
+            yield message
+        if len(page) < page_size:
+            return
+        after_id = page[-1][0]
+
+
+# === SEARCH ===
+def _has_search(c):
+    c.execute("SELECT 1 FROM sqlite_master WHERE name='session_messages_fts'")
+    return c.fetchone() is not None
+
+
+def fts_query(text):
+    """Quote each word so user input can't break MATCH syntax; a trailing * keeps prefix search"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_history(user, query, session_id=None, limit=SEARCH_LIMIT):
+    """Ranked full-text hits over a user's messages, including archived sessions
+
+    Each hit has a highlighted snippet, its bm25 score (lower is better)
+    and the nearest bookmark at or before it, to jump back into context.
+    """
+    match = fts_query(query)
+    if not match:
+        return []
+    sql = """SELECT f.rowid, f.session_id, s.title, f.role, f.created_at,
+                    snippet(session_messages_fts, 0, '[', ']', '…', 12),
+                    bm25(session_messages_fts) AS score,
+                    b.id, b.title, b.message_id
+             FROM session_messages_fts f
+             JOIN sessions s ON s.id = f.session_id
+             LEFT JOIN session_bookmarks b ON b.id = (
+                 SELECT id FROM session_bookmarks
+                 WHERE session_id = f.session_id AND message_id <= f.rowid
+                 ORDER BY message_id DESC LIMIT 1)
+             WHERE session_messages_fts MATCH ? AND f.user = ?"""
+    params = [match, user]
+    if session_id is not None:
+        sql += " AND f.session_id = ?"
+        params.append(session_id)
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(sql + " ORDER BY score LIMIT ?", (*params, limit))
+    hits = [_search_hit(row) for row in c.fetchall()]
+    conn.close()
+    return hits
+
+
+def _search_hit(row):
+    message_id, session_id, title, role, created_at, snippet, score, *bookmark = row
+    return {
+        "message_id": message_id,
+        "session_id": session_id,
+        "title": title,
+        "role": role,
+        "created_at": created_at,
+        "snippet": snippet,
+        "score": score,
+        "bookmark": (
+            dict(zip(("id", "title", "message_id"), bookmark)) if bookmark[0] is not None else None
+        ),
+    }
+
+
+def get_message_context(session_id, message_id, before=2, after=2):
+    """A message with its neighbours, for jumping from a search hit into the conversation"""
+    earlier = get_messages(session_id, limit=before + 1, before_id=message_id + 1)
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        f"""SELECT {MESSAGE_COLUMNS} FROM session_messages
+                 WHERE session_id=? AND id > ? ORDER BY id LIMIT ?""",
+        (session_id, message_id, after),
+    )
+    later = [_decode_row(row) for row in c.fetchall()]
+    if len(later) < after:
+        archived = [m for m in _archived_messages(conn, session_id) if m[0] > message_id]
+        later = sorted(later + archived)[:after]
+    conn.close()
+    return earlier + later
+
+
 def search_messages(user, query):
-    """Search messages across sessions"""
+    """Search messages across sessions (ranked full-text search when available)
+
+    Returns (id, session_id, role, content, metadata, created_at, title)
+    tuples with the full decoded content; search_history has snippets.
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
+    if _has_search(c):
+        hits = search_history(user, query, limit=50)
+        ids = [h["message_id"] for h in hits]
+        c.execute(
+            f"""SELECT {MESSAGE_COLUMNS} FROM session_messages
+                     WHERE id IN ({",".join("?" * len(ids))})""",
+            ids,
+        )
+        messages = {row[0]: _decode_row(row) for row in c.fetchall()}
+        # Hits in archived sessions are read back from cold storage
+        for session_id in {h["session_id"] for h in hits if h["message_id"] not in messages}:
+            messages.update((m[0], m) for m in _archived_messages(conn, session_id))
+        conn.close()
+        return [
+            (*messages[h["message_id"]], h["title"]) for h in hits if h["message_id"] in messages
+        ]
+
+    # Compressed bodies can't be matched with LIKE; they are decoded and checked here
     c.execute(
-        """SELECT sm.*, s.title FROM session_messages sm
+        """SELECT sm.id, sm.session_id, sm.role, sm.content, sm.metadata, sm.created_at,
+                        sm.encoding, s.title
+                 FROM session_messages sm
                  JOIN sessions s ON sm.session_id = s.id
-                 WHERE s.user=? AND sm.content LIKE ?
-                 ORDER BY sm.created_at DESC LIMIT 50""",
+                 WHERE s.user=? AND (sm.content LIKE ? OR sm.encoding IS NOT NULL)
+                 ORDER BY sm.id DESC""",
         (user, f"%{query}%"),
     )
-    results = c.fetchall()
+    results = []
+    needle = query.lower()
+    for row in c:
+        message = _decode_row(row)
+        if row[6] is None or needle in message[3].lower():
+            results.append((*message, row[7]))
+            if len(results) == 50:
+                break
     conn.close()
     return results
 
 
+# === ARCHIVE ===
+def _attach_archive(conn):
+    """Schema name holding session_archives, attaching ARCHIVE_PATH when set"""
+    if ARCHIVE_PATH is None:
+        return "main"
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if "archive" not in attached:
+        conn.execute("ATTACH DATABASE ? AS archive", (str(ARCHIVE_PATH),))
+    return "archive"
+
+
+def _create_archive_table(c, schema):
+    c.execute(
+        f"""CREATE TABLE IF NOT EXISTS {schema}.session_archives (
+        session_id INTEGER PRIMARY KEY,
+        message_count INTEGER NOT NULL,
+        first_message_id INTEGER,
+        last_message_id INTEGER,
+        raw_bytes INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        archived_at TEXT NOT NULL
+    )"""
+    )
+
+
+def _is_archived(c, session_id):
+    """Whether archive_sessions has moved this session's messages to cold storage"""
+    try:
+        row = c.execute("SELECT archived_at FROM sessions WHERE id=?", (session_id,)).fetchone()
+    except sqlite3.OperationalError:
+        return False  # no archived_at column yet: nothing was ever archived
+    return row is not None and row[0] is not None
+
+
+def _archived_messages(conn, session_id):
+    """Decoded messages of an archived session (empty if it was never archived)
+
+    Live sessions cost one primary-key lookup; the archive is only attached
+    and decompressed for sessions marked archived_at.
+    """
+    if not _is_archived(conn.cursor(), session_id):
+        return []
+    schema = _attach_archive(conn)
+    row = conn.execute(
+        f"SELECT data FROM {schema}.session_archives WHERE session_id=?", (session_id,)
+    ).fetchone()
+    return [tuple(m) for m in json.loads(zlib.decompress(row[0]))] if row else []
+
+
+def archive_sessions(days=ARCHIVE_AFTER_DAYS):
+    """Move messages of sessions ended more than `days` ago into compressed cold storage
+
+    Each session becomes one zlib-compressed JSON blob in session_archives
+    (inside ARCHIVE_PATH when set), written in the same transaction that
+    removes its hot rows. Returns {"sessions": n, "messages": n, "bytes": n}.
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    schema = _attach_archive(conn)
+    c = conn.cursor()
+    _create_archive_table(c, schema)
+    c.execute(
+        """SELECT id FROM sessions WHERE status='ended' AND ended_at < ?
+                 AND EXISTS (SELECT 1 FROM session_messages WHERE session_id = sessions.id)""",
+        (cutoff,),
+    )
+    session_ids = [row[0] for row in c.fetchall()]
+
+    totals = {"sessions": 0, "messages": 0, "bytes": 0}
+    for session_id in session_ids:
+        messages = _archived_messages(conn, session_id)
+        c.execute(
+            f"SELECT {MESSAGE_COLUMNS} FROM session_messages WHERE session_id=? ORDER BY id",
+            (session_id,),
+        )
+        messages += [_decode_row(row) for row in c.fetchall()]
+        raw = json.dumps(messages).encode()
+        data = zlib.compress(raw, 9)
+        now = datetime.now().isoformat()
+        c.execute(
+            f"""INSERT OR REPLACE INTO {schema}.session_archives
+                (session_id, message_count, first_message_id, last_message_id,
+                 raw_bytes, data, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (session_id, len(messages), messages[0][0], messages[-1][0], len(raw), data, now),
+        )
+        # Marked first so the delete trigger leaves the search index alone
+        c.execute("UPDATE sessions SET archived_at=? WHERE id=?", (now, session_id))
+        c.execute("DELETE FROM session_messages WHERE session_id=?", (session_id,))
+        conn.commit()
+        totals["sessions"] += 1
+        totals["messages"] += len(messages)
+        totals["bytes"] += len(data)
+
+    conn.close()
+    return totals
+
+
 # === STATE ===
+# Last-writer-wins upsert; every write bumps the key's version
+STATE_UPSERT_SQL = """INSERT INTO session_state (session_id, key, value, updated_at, version)
+    VALUES (?, ?, ?, ?, 1)
+    ON CONFLICT (session_id, key) DO UPDATE SET
+        value = excluded.value,
+        updated_at = excluded.updated_at,
+        version = session_state.version + 1"""
+
+class StateConflict(RuntimeError):
+    """Session state keys were changed by another writer since they were loaded"""
+
+    def __init__(self, session_id, keys):
+        super().__init__(
+            f"Session #{session_id} state changed concurrently: {', '.join(sorted(keys))}"
+        )
+        self.session_id = session_id
+        self.keys = keys
+
+
+class SessionState:
+    """In-memory view of one session's state with batched, version-checked writes
+
+    All keys are loaded once; reads never touch the database. set() and
+    delete() only mark keys dirty, and commit() writes them in one
+    transaction, refusing (StateConflict) if any dirty key's version moved
+    since it was loaded. Dirty keys are also committed by set() once
+    `interval` seconds have passed since the last write. Use as a context
+    manager to commit on exit; call set() again after mutating a value in
+    place.
+    """
+
+    def __init__(self, session_id, interval=STATE_FLUSH_INTERVAL):
+        self.session_id = session_id
+        self.interval = interval
+        self.values = {}
+        self.versions = {}
+        self.dirty = {}  # key -> version it was loaded at (None if new)
+        self._committed = time.monotonic()
+        self.reload()
+
+    def reload(self):
+        """Discard pending changes and load every key"""
+        conn = sqlite3.connect(DB_PATH)
+        rows = conn.execute(
+            "SELECT key, value, version FROM session_state WHERE session_id=?",
+            (self.session_id,),
+        ).fetchall()
+        conn.close()
+        self.values = {key: json.loads(value) for key, value, _ in rows}
+        self.versions = {key: version or 0 for key, _, version in rows}
+        self.dirty = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def items(self):
+        return dict(self.values).items()
+
+    def set(self, key, value):
+        """Change a key in memory; written on commit or after the flush interval"""
+        self.values[key] = value
+        self.dirty.setdefault(key, self.versions.get(key))
+        self._maybe_commit()
+
+    def delete(self, key):
+        if key in self.values:
+            del self.values[key]
+            self.dirty.setdefault(key, self.versions.get(key))
+            self._maybe_commit()
+
+    def _maybe_commit(self):
+        if self.interval is not None and time.monotonic() - self._committed >= self.interval:
+            self.commit()
+
+    def commit(self):
+        """Write dirty keys in one transaction; returns the number written
+
+        Raises StateConflict (writing nothing) when another writer changed
+        or created any of the dirty keys since they were loaded.
+        """
+        self._committed = time.monotonic()
+        if not self.dirty:
+            return 0
+
+        conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            c = conn.execute(
+                """SELECT key, version FROM session_state
+                   WHERE session_id=? AND key IN (SELECT value FROM json_each(?))""",
+                (self.session_id, json.dumps(list(self.dirty))),
+            )
+            current = {key: version or 0 for key, version in c.fetchall()}
+            conflicts = [key for key, loaded in self.dirty.items() if current.get(key) != loaded]
+            if conflicts:
+                conn.execute("ROLLBACK")
+                raise StateConflict(self.session_id, conflicts)
+
+            now = datetime.now().isoformat()
+            upserts = [key for key in self.dirty if key in self.values]
+            deletes = [key for key in self.dirty if key not in self.values]
+            conn.executemany(
+                STATE_UPSERT_SQL,
+                [(self.session_id, key, json.dumps(self.values[key]), now) for key in upserts],
+            )
+            conn.executemany(
+                "DELETE FROM session_state WHERE session_id=? AND key=?",
+                [(self.session_id, key) for key in deletes],
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        for key in upserts:
+            self.versions[key] = (self.dirty[key] or 0) + 1
+        for key in deletes:
+            self.versions.pop(key, None)
+        written = len(self.dirty)
+        self.dirty = {}
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+
+
+def open_state(session_id, interval=STATE_FLUSH_INTERVAL):
+    """Load a session's state for cached reads and batched writes"""
+    return SessionState(session_id, interval)
+
+
 def set_state(session_id, key, value):
     """Set session state"""
     conn = sqlite3.connect(DB_PATH)
@@ -200,11 +739,7 @@ def set_state(session_id, key, value):
     now = datetime.now().isoformat()
     value_json = json.dumps(value)
 
-    c.execute(
-        """INSERT OR REPLACE INTO session_state (session_id, key, value, updated_at)
-                 VALUES (?, ?, ?, ?)""",
-        (session_id, key, value_json, now),
-    )
+    c.execute(STATE_UPSERT_SQL, (session_id, key, value_json, now))
 
     conn.commit()
     conn.close()
@@ -275,9 +810,17 @@ def get_session_summary(session_id):
     c.execute("SELECT * FROM sessions WHERE id=?", (session_id,))
     session = c.fetchone()
 
-    # Message count
+    # Message count (hot rows plus any archived ones)
     c.execute("SELECT COUNT(*) FROM session_messages WHERE session_id=?", (session_id,))
     msg_count = c.fetchone()[0]
+    if _is_archived(c, session_id):
+        schema = _attach_archive(conn)
+        c.execute(
+            f"SELECT message_count FROM {schema}.session_archives WHERE session_id=?",
+            (session_id,),
+        )
+        archived = c.fetchone()
+        msg_count += archived[0] if archived else 0
 
     # Bookmarks
     c.execute("SELECT COUNT(*) FROM session_bookmarks WHERE session_id=?", (session_id,))
@@ -315,7 +858,7 @@ def resume_session(user):
     if len(sys.argv) < 2:
         print("Usage:")
         print("  Session:  python session_manager.py session <start|end|list|resume|summary> ...")
-        print("  Message:  python session_manager.py msg <add|list|search> ...")
+        print("  Message:  python session_manager.py msg <add|list|search|context|archive> ...")
         print("  State:    python session_manager.py state <set|get|list> ...")
         print("  Bookmark: python session_manager.py bookmark <add|list> ...")
         sys.exit(1)
@@ -366,17 +909,36 @@ def resume_session(user):
             print(f"Added message #{msg_id}")
 
         elif cmd == "list" and len(sys.argv) >= 4:
-            messages = get_messages(int(sys.argv[3]))
+            before = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            messages = get_messages(int(sys.argv[3]), before_id=before)
             print(f"\nMessages ({len(messages)}):")
             for m in messages:
-                print(f"  [{m[2]}] {m[3][:80]}")
+                print(f"  #{m[0]} [{m[2]}] {m[3][:80]}")
+            if messages:
+                print(f"\n  Older: session_manager.py msg list {sys.argv[3]} {messages[0][0]}")
 
         elif cmd == "search" and len(sys.argv) >= 5:
-            results = search_messages(sys.argv[3], sys.argv[4])
-            print(f"\nSearch results ({len(results)}):")
-            for r in results:
-                print(f"  Session: {r[6]}")
-                print(f"  [{r[2]}] {r[3][:100]}\n")
+            hits = search_history(sys.argv[3], " ".join(sys.argv[4:]))
+            print(f"\nSearch results ({len(hits)}):")
+            for h in hits:
+                print(f"  Session #{h['session_id']}: {h['title']}  (message #{h['message_id']})")
+                print(f"  [{h['role']}] {h['snippet']}")
+                if h["bookmark"]:
+                    print(f"  🔖 {h['bookmark']['title']} (#{h['bookmark']['message_id']})")
+                print()
+
+        elif cmd == "context" and len(sys.argv) >= 5:
+            for m in get_message_context(int(sys.argv[3]), int(sys.argv[4])):
+                marker = "▶" if m[0] == int(sys.argv[4]) else " "
+                print(f" {marker} #{m[0]} [{m[2]}] {m[3][:100]}")
+
+        elif cmd == "archive":
+            days = int(sys.argv[3]) if len(sys.argv) > 3 else ARCHIVE_AFTER_DAYS
+            totals = archive_sessions(days)
+            print(
+                f"✓ Archived {totals['messages']} messages from {totals['sessions']} sessions "
+                f"({totals['bytes'] / 1024:.1f} KB compressed)"
+            )
 
     # === STATE COMMANDS ===
     elif module == "state":
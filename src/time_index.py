@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Time Index: Epoch-millisecond columns and monthly partitions for audit tables"""
+import sqlite3
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
+
+EPOCH_COLUMN = "ts_ms"
+
+# Append-only audit table -> ISO timestamp columns its epoch column may derive from
+# (health_checks is created as either schema by health_monitor or tools_manager)
+AUDIT_TABLES = {
+    "tool_executions": ("created_at",),
+    "quality_metrics": ("created_at",),
+    "health_checks": ("checked_at", "created_at"),
+    "prevention_events": ("created_at",),
+    "task_executions": ("created_at",),
+    "gate_executions": ("created_at",),
+}
+
+# Every table with an epoch column: the audit tables plus conversation state,
+# which gets ts_ms for range reads but is never partitioned (archival covers it)
+EPOCH_TABLES = {
+    **AUDIT_TABLES,
+    "session_messages": ("created_at",),
+}
+
+# Rows a derived table still points at stay in the live table when partitioning
+PARTITION_KEEP = {
+    "quality_metrics": (
+        "quality_metrics_latest",
+        "id NOT IN (SELECT metric_id FROM quality_metrics_latest)",
+    ),
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_ms(dt=None):
+    """Milliseconds since the epoch for a datetime or ISO string (default: now)
+
+    Naive timestamps are treated as UTC, exactly as SQLite's julianday()
+    reads the naive isoformat() text stored in the tables, so cutoffs built
+    here line up with the generated ts_ms columns.
+    """
+    if dt is None:
+        dt = datetime.now()
+    elif isinstance(dt, str):
+        dt = datetime.fromisoformat(dt)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return round((dt - _EPOCH).total_seconds() * 1000)
+
+
+def from_epoch_ms(ms):
+    """Naive datetime for an epoch-ms value (inverse of epoch_ms)"""
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+def _epoch_expr(column):
+    return f"CAST(round((julianday({column}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+def add_epoch_column(c, table):
+    """Add the indexed ts_ms column to an audit table if it is missing
+
+    ts_ms is a VIRTUAL generated column computed from the ISO text, so
+    existing rows and every writer get it for free and only the index is
+    stored. Returns True when the column was added.
+    """
+    columns = set(_columns(c, table))
+    candidates = [col for col in EPOCH_TABLES[table] if col in columns]
+    if not candidates or EPOCH_COLUMN in columns:
+        return False
+    column = candidates[0]
+
+    c.execute(
+        f"""ALTER TABLE {table} ADD COLUMN {EPOCH_COLUMN} INTEGER
+        GENERATED ALWAYS AS ({_epoch_expr(column)}) VIRTUAL"""
+    )
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{EPOCH_COLUMN} ON {table} ({EPOCH_COLUMN})")
+    return True
+
+
+# (database file, table) pairs known to have the epoch column in this process
+_EPOCH_READY = set()
+
+
+def epoch_column(c, table):
+    """Expression readers filter on for a table's epoch-ms time
+
+    Databases no module's init_db has migrated yet get ts_ms added here, on
+    first read. If the table cannot be altered right now (read-only, busy)
+    the same value is computed from the ISO text instead, without the index.
+    """
+    key = (c.execute("PRAGMA database_list").fetchone()[2], table)
+    if key in _EPOCH_READY:
+        return EPOCH_COLUMN
+    try:
+        if add_epoch_column(c, table) and c.connection.in_transaction:
+            c.connection.commit()
+    except sqlite3.OperationalError:
+        pass
+    columns = _columns(c, table)
+    if EPOCH_COLUMN in columns:
+        _EPOCH_READY.add(key)
+        return EPOCH_COLUMN
+    candidates = [col for col in EPOCH_TABLES[table] if col in columns]
+    return _epoch_expr(candidates[0]) if candidates else EPOCH_COLUMN
+
+
+def init_db():
+    """Add epoch columns to every audit table that exists"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    for table in EPOCH_TABLES:
+        add_epoch_column(c, table)
+    conn.commit()
+    conn.close()
+
+
+# === PARTITIONS ===
+def month_bounds(month):
+    """(start_ms, end_ms) of a 'YYYYMM' month"""
+    year, number = int(month[:4]), int(month[4:])
+    start = datetime(year, number, 1)
+    end = datetime(year + number // 12, number % 12 + 1, 1)
+    return epoch_ms(start), epoch_ms(end)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month}"
+
+
+def list_partitions(c, table):
+    """[(name, month, start_ms, end_ms)] for a table's partitions, oldest first"""
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{6}})$")
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ?", (f"{table}_p%",))
+    partitions = []
+    for (name,) in c.fetchall():
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, match.group(1), *month_bounds(match.group(1))))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _columns(c, table):
+    # table_xinfo (unlike table_info) lists generated columns too
+    c.execute(f"PRAGMA table_xinfo({table})")
+    return [row[1] for row in c.fetchall()]
+
+
+def _create_partition(c, table, month):
+    """Plain copy of the live table's columns (ts_ms stored) plus its index"""
+    name = partition_name(table, month)
+    c.execute(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM {table} WHERE 0")
+    c.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{EPOCH_COLUMN} ON {name} ({EPOCH_COLUMN})")
+    return name
+
+
+def _select_from(c, source, columns):
+    """SELECT of the live table's columns, padding ones a partition predates"""
+    present = set(_columns(c, source))
+    exprs = [col if col in present else f"NULL AS {col}" for col in columns]
+    return f"SELECT {', '.join(exprs)} FROM {source}"
+
+
+def refresh_view(c, table):
+    """(Re)create <table>_all as a UNION ALL of the live table and its partitions"""
+    columns = _columns(c, table)
+    sources = [table] + [p[0] for p in list_partitions(c, table)]
+    c.execute(f"DROP VIEW IF EXISTS {table}_all")
+    union = "\nUNION ALL ".join(_select_from(c, source, columns) for source in sources)
+    c.execute(f"CREATE VIEW {table}_all AS {union}")
+
+
+def partition_table(table, before=None):
+    """Move rows older than `before`'s month into monthly partition tables
+
+    `before` defaults to now, so the live table keeps only the current
+    month and writers are untouched. Returns {month: rows moved}. Only
+    append-only AUDIT_TABLES can be partitioned.
+    """
+    if table not in AUDIT_TABLES:
+        raise ValueError(f"{table} is not an append-only audit table")
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    if not _columns(c, table):
+        conn.close()
+        return {}
+    add_epoch_column(c, table)
+    cutoff = month_bounds((before or datetime.now()).strftime("%Y%m"))[0]
+
+    keep = ""
+    if table in PARTITION_KEEP:
+        derived, condition = PARTITION_KEEP[table]
+        c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (derived,))
+        if c.fetchone():
+            keep = f"AND {condition}"
+
+    c.execute(
+        f"""SELECT DISTINCT strftime('%Y%m', {EPOCH_COLUMN} / 1000, 'unixepoch') FROM {table}
+            WHERE {EPOCH_COLUMN} < ? {keep}""",
+        (cutoff,),
+    )
+    months = sorted(row[0] for row in c.fetchall())
+
+    moved = {}
+    columns = _columns(c, table)
+    for month in months:
+        start, end = month_bounds(month)
+        name = _create_partition(c, table, month)
+        present = [col for col in columns if col in set(_columns(c, name))]
+        where = f"WHERE {EPOCH_COLUMN} >= ? AND {EPOCH_COLUMN} < ? {keep}"
+        c.execute(
+            f"""INSERT INTO {name} ({', '.join(present)})
+                SELECT {', '.join(present)} FROM {table} {where}""",
+            (start, end),
+        )
+        moved[month] = c.rowcount
+        c.execute(f"DELETE FROM {table} {where}", (start, end))
+
+    refresh_view(c, table)
+    conn.commit()
+    conn.close()
+    return moved
+
+
+def window_source(c, table, start_ms, end_ms=None):
+    """FROM-clause source covering [start_ms, end_ms) over only the overlapping partitions
+
+    Falls back to the bare live table when no partition overlaps, so
+    callers pay for the union only when history is actually requested.
+    """
+    partitions = [
+        name
+        for name, _, p_start, p_end in list_partitions(c, table)
+        if p_end > start_ms and (end_ms is None or p_start < end_ms)
+    ]
+    if not partitions:
+        return table
+    columns = _columns(c, table)
+    union = " UNION ALL ".join(_select_from(c, source, columns) for source in [table] + partitions)
+    return f"({union})"
+
+
+def query_window(table, start, end=None, columns="*", where="", params=()):
+    """Rows of an audit table (live + partitions) with start <= ts < end"""
+    start_ms = start if isinstance(start, int) else epoch_ms(start)
+    end_ms = end if end is None or isinstance(end, int) else epoch_ms(end)
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    source = window_source(c, table, start_ms, end_ms)
+    sql = f"SELECT {columns} FROM {source} WHERE {EPOCH_COLUMN} >= ?"
+    args = [start_ms]
+    if end_ms is not None:
+        sql += f" AND {EPOCH_COLUMN} < ?"
+        args.append(end_ms)
+    if where:
+        sql += f" AND ({where})"
+    c.execute(sql + f" ORDER BY {EPOCH_COLUMN}", (*args, *params))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def purge_before(table, cutoff):
+    """Delete audit rows older than cutoff; whole partitions are dropped, not scanned
+
+    Returns {"dropped": [partition names], "deleted": rows deleted row by row}.
+    """
+    cutoff_ms = cutoff if isinstance(cutoff, int) else epoch_ms(cutoff)
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+
+    dropped, deleted = [], 0
+    partitions = list_partitions(c, table)
+    for name, _, start, end in partitions:
+        if end <= cutoff_ms:
+            c.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+        elif start < cutoff_ms:
+            c.execute(f"DELETE FROM {name} WHERE {EPOCH_COLUMN} < ?", (cutoff_ms,))
+            deleted += c.rowcount
+    c.execute(f"DELETE FROM {table} WHERE {EPOCH_COLUMN} < ?", (cutoff_ms,))
+    deleted += c.rowcount
+
+    if partitions:
+        refresh_view(c, table)
+    conn.commit()
+    conn.close()
+    return {"dropped": dropped, "deleted": deleted}
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "status"
+    init_db()
+
+    if cmd == "partition":
+        tables = sys.argv[2:] or list(AUDIT_TABLES)
+        for table in tables:
+            try:
+                moved = partition_table(table)
+            except ValueError as e:
+                print(f"✗ {e}")
+                continue
+            total = sum(moved.values())
+            print(f"✓ {table}: moved {total} rows into {len(moved)} partitions")
+
+    elif cmd == "purge" and len(sys.argv) > 3:
+        result = purge_before(sys.argv[2], sys.argv[3])
+        print(f"✓ Dropped {len(result['dropped'])} partitions, deleted {result['deleted']} rows")
+
+    elif cmd == "status":
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        for table in AUDIT_TABLES:
+            partitions = list_partitions(c, table)
+            months = ", ".join(p[1] for p in partitions) or "none"
+            print(f"  {table:20} partitions: {months}")
+        conn.close()
+
+    else:
+        print("Usage: time_index.py [status|partition [table...]|purge <table> <iso-cutoff>]")
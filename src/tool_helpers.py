@@ -4,6 +4,8 @@
 from datetime import datetime
 from pathlib import Path
 
+import retention
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
 
@@ -209,16 +211,15 @@ def get_review_summary():
 
 
 def cleanup_old_executions(days=30):
-    """Clean up old tool execution logs"""
+    """Roll up and prune tool execution logs older than `days`"""
+    hourly_days = max(days, retention.DEFAULT_POLICIES["tool_executions"][1])
+    policy = {"raw_days": days, "hourly_days": hourly_days, "daily_days": None}
     conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    cutoff = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    cutoff = cutoff.replace(day=cutoff.day - days)
-    c.execute("DELETE FROM tool_executions WHERE created_at < ?", (cutoff.isoformat(),))
-    deleted = c.rowcount
-    conn.commit()
-    conn.close()
-    return deleted
+    try:
+        result = retention.apply_policy(conn, "tool_executions", policy)
+    finally:
+        conn.close()
+    return result["rolled_up"]
 
 
 if __name__ == "__main__":
@@ -6,6 +6,9 @@
 from datetime import datetime
 from pathlib import Path
 
+import audit_sink
+from time_index import add_epoch_column
+
 DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
 
 
@@ -30,9 +33,12 @@ def init_db():
         failure_count INTEGER DEFAULT 0,
         avg_runtime REAL DEFAULT 0,
         created_at TEXT NOT NULL,
-        updated_at TEXT NOT NULL
+        updated_at TEXT NOT NULL,
+        source_path TEXT,
+        source_mtime REAL
     )"""
     )
+    _migrate_tools(c)
 
     # Tool executions (audit log)
     c.execute(
@@ -49,6 +55,7 @@ def init_db():
         FOREIGN KEY (tool_id) REFERENCES tools(id)
     )"""
     )
+    add_epoch_column(c, "tool_executions")
 
     # Tool improvements
     c.execute(
@@ -76,11 +83,22 @@ def init_db():
         created_at TEXT NOT NULL
     )"""
     )
+    add_epoch_column(c, "health_checks")
 
     conn.commit()
     conn.close()
 
 
+def _migrate_tools(c):
+    """Add discovery columns to tools tables created before they existed"""
+    c.execute("PRAGMA table_info(tools)")
+    columns = {row[1] for row in c.fetchall()}
+    if "source_path" not in columns:
+        c.execute("ALTER TABLE tools ADD COLUMN source_path TEXT")
+    if "source_mtime" not in columns:
+        c.execute("ALTER TABLE tools ADD COLUMN source_mtime REAL")
+
+
 # === TOOL REGISTRY ===
 def register_tool(name, type, command, description="", category="general", version="1.0"):
     """Register a tool"""
@@ -105,6 +123,7 @@ def register_tool(name, type, command, description="", category="general", versi
 
 def list_tools(category=None, status="active"):
     """List tools"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
@@ -131,38 +150,28 @@ def get_tool(name):
     return result
 
 
-def update_tool_stats(tool_id, success, runtime):
-    """Update tool statistics"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute(
-        "SELECT usage_count, success_count, failure_count, avg_runtime FROM tools WHERE id=?",
-        (tool_id,),
-    )
-    stats = c.fetchone()
+# Audit writes buffered through audit_sink; the stats update only adds to
+# counters (SET expressions see the old row), so batches apply in any order
+EXECUTION_SQL = """INSERT INTO tool_executions
+    (tool_id, user, args, result, status, runtime, error, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+TOOL_STATS_SQL = """UPDATE tools SET
+    avg_runtime = (avg_runtime * usage_count + ?) / (usage_count + 1),
+    usage_count = usage_count + 1,
+    success_count = success_count + ?,
+    failure_count = failure_count + ?,
+    updated_at = ?
+    WHERE id=?"""
 
-    usage = stats[0] + 1
-    success_count = stats[1] + (1 if success else 0)
-    failure_count = stats[2] + (0 if success else 1)
-    avg_runtime = (stats[3] * stats[0] + runtime) / usage
 
-    c.execute(
-        """UPDATE tools SET usage_count=?, success_count=?, failure_count=?, avg_runtime=?, updated_at=?
-                 WHERE id=?""",
-        (
-            usage,
-            success_count,
-            failure_count,
-            avg_runtime,
-            datetime.now().isoformat(),
-            tool_id,
-        ),
+def update_tool_stats(tool_id, success, runtime):
+    """Queue a tool statistics update"""
+    audit_sink.write(
+        DB_PATH,
+        TOOL_STATS_SQL,
+        (runtime, int(success), int(not success), datetime.now().isoformat(), tool_id),
     )
 
-    conn.commit()
-    conn.close()
-
 
 # === TOOL EXECUTION ===
 def execute_tool(name, args=None, user=None):
@@ -201,11 +210,9 @@ def execute_tool(name, args=None, user=None):
     runtime = (datetime.now() - start).total_seconds()
 
     # Log execution
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """INSERT INTO tool_executions (tool_id, user, args, result, status, runtime, error, created_at)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+    audit_sink.write(
+        DB_PATH,
+        EXECUTION_SQL,
         (
             tool_id,
             user,
@@ -217,17 +224,24 @@ def execute_tool(name, args=None, user=None):
             datetime.now().isoformat(),
         ),
     )
-    conn.commit()
-    conn.close()
 
     # Update stats
     update_tool_stats(tool_id, success, runtime)
 
+    # Spend from the shared rate limiters
+    try:
+        from prevention_system import note_execution
+
+        note_execution(name)
+    except (ImportError, sqlite3.Error):
+        pass
+
     return {"success": success, "output": output, "error": error, "runtime": runtime}
 
 
 def get_tool_stats(name):
     """Get tool statistics"""
+    audit_sink.flush(DB_PATH)
     tool = get_tool(name)
     if not tool:
         return None
@@ -312,21 +326,19 @@ def run_health_check(component, check_func):
         message = str(e)
         details = "{}"
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
+    audit_sink.write(
+        DB_PATH,
         """INSERT INTO health_checks (component, status, message, details, created_at)
                  VALUES (?, ?, ?, ?, ?)""",
         (component, status, message, details, datetime.now().isoformat()),
     )
-    conn.commit()
-    conn.close()
 
     return {"component": component, "status": status, "message": message}
 
 
 def get_health_status():
     """Get overall health status"""
+    audit_sink.flush(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
@@ -355,41 +367,95 @@ def get_health_status():
 
 
 # === AUTO-DISCOVERY ===
-def discover_tools():
-    """Auto-discover tools in workspace"""
-    workspace = Path(__file__).parent
-    discovered = []
-
-    # Python scripts
-    for py_file in workspace.glob("*.py"):
-        if py_file.name not in ["tools_manager.py", "__init__.py"]:
-            name = py_file.stem
-            if not get_tool(name):
-                tool_id = register_tool(
-                    name=name,
-                    type="python",
-                    command=f"python3 {py_file}",
-                    description=f"Auto-discovered: {name}",
-                    category="auto-discovered",
-                )
-                if tool_id:
-                    discovered.append(name)
+DISCOVERY_CATEGORY = "auto-discovered"
+DISCOVERY_SKIP = {"tools_manager.py", "__init__.py"}
+
+
+def _scan_workspace(workspace):
+    """Scan workspace for scripts: {name: (type, command, path, mtime)}"""
+    found = {}
+    for pattern, type, runner in (("*.py", "python", "python3"), ("*.sh", "shell", "bash")):
+        for script in sorted(workspace.glob(pattern)):
+            if script.name in DISCOVERY_SKIP or script.stem in found:
+                continue
+            try:
+                mtime = script.stat().st_mtime
+            except OSError:
+                continue
+            found[script.stem] = (type, f"{runner} {script}", str(script), mtime)
+    return found
+
+
+def sync_tools(workspace=None):
+    """Diff the tool registry against a directory scan and apply it in one transaction
+
+    New scripts are registered, scripts whose mtime or path changed are updated,
+    and auto-discovered tools whose script disappeared are retired. Manually
+    registered tools are never touched.
+    """
+    workspace = Path(workspace) if workspace else Path(__file__).parent
+    scanned = _scan_workspace(workspace)
+    changes = {"added": [], "updated": [], "retired": []}
 
-    # Shell scripts
-    for sh_file in workspace.glob("*.sh"):
-        name = sh_file.stem
-        if not get_tool(name):
-            tool_id = register_tool(
-                name=name,
-                type="shell",
-                command=f"bash {sh_file}",
-                description=f"Auto-discovered: {name}",
-                category="auto-discovered",
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    try:
+        _migrate_tools(c)
+        c.execute("SELECT id, name, category, status, source_path, source_mtime FROM tools")
+        registry = {row[1]: row for row in c.fetchall()}
+
+        now = datetime.now().isoformat()
+        inserts, updates, retirements = [], [], []
+
+        for name, (type, command, path, mtime) in scanned.items():
+            existing = registry.get(name)
+            if existing is None:
+                description = f"Auto-discovered: {name}"
+                inserts.append(
+                    (name, type, description, command, DISCOVERY_CATEGORY, now, now, path, mtime)
+                )
+                changes["added"].append(name)
+            elif existing[2] == DISCOVERY_CATEGORY and (
+                existing[4] != path or existing[5] != mtime or existing[3] == "retired"
+            ):
+                status = "active" if existing[3] == "retired" else existing[3]
+                updates.append((type, command, status, now, path, mtime, existing[0]))
+                changes["updated"].append(name)
+
+        for name, (tool_id, _, category, status, _, _) in registry.items():
+            if category == DISCOVERY_CATEGORY and status != "retired" and name not in scanned:
+                retirements.append((now, tool_id))
+                changes["retired"].append(name)
+
+        if inserts or updates or retirements:
+            c.executemany(
+                """INSERT INTO tools (name, type, description, command, category, version,
+                                      created_at, updated_at, source_path, source_mtime)
+                   VALUES (?, ?, ?, ?, ?, '1.0', ?, ?, ?, ?)""",
+                inserts,
+            )
+            c.executemany(
+                """UPDATE tools SET type=?, command=?, status=?, updated_at=?,
+                                    source_path=?, source_mtime=?
+                   WHERE id=?""",
+                updates,
             )
-            if tool_id:
-                discovered.append(name)
+            c.executemany(
+                "UPDATE tools SET status='retired', updated_at=? WHERE id=?", retirements
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return changes
 
-    return discovered
+
+def discover_tools(workspace=None):
+    """Auto-discover tools in workspace"""
+    return sync_tools(workspace)["added"]
 
 
 if __name__ == "__main__":
@@ -476,7 +542,11 @@ def discover_tools():
 
     # === DISCOVERY ===
     elif module == "discover":
-        discovered = discover_tools()
-        print(f"Discovered {len(discovered)} tools:")
-        for name in discovered:
-            print(f"  + {name}")
+        changes = sync_tools()
+        print(
+            f"Discovered {len(changes['added'])} tools, updated {len(changes['updated'])}, "
+            f"retired {len(changes['retired'])}:"
+        )
+        for symbol, key in (("+", "added"), ("~", "updated"), ("-", "retired")):
+            for name in changes[key]:
+                print(f"  {symbol} {name}")
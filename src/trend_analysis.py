@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Trend Analysis: Vectorized slope, z-score and change-point scan over every metric series"""
+import sqlite3
+import json
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from quality_gate import MIN_SAMPLES, Z_THRESHOLD
+from time_index import AUDIT_TABLES
+
+DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
+
+MAX_POINTS = 200  # newest samples per series loaded for analysis
+Z_WINDOW = 20  # samples before the newest one used for its rolling z-score
+SLOPE_THRESHOLD = 0.02  # relative change per sample that counts as a trend
+CHANGE_THRESHOLD = 3.0  # mean-shift statistic that counts as a change point
+MIN_SEGMENT = 3  # samples required on each side of a change point
+
+# source -> (tables needed, query returning component, series, value, timestamp; direction)
+# direction is +1 when higher values are better and -1 when lower is better.
+# {stamp} and {component} are filled from the first table's actual columns,
+# since health_checks is created by both health_monitor and tools_manager.
+SERIES_SOURCES = {
+    "quality": (
+        ("quality_metrics",),
+        """SELECT component, metric_name, value, created_at FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY component, metric_name ORDER BY created_at DESC, id DESC
+            ) AS rank FROM quality_metrics
+        ) WHERE rank <= :limit ORDER BY component, metric_name, created_at, id""",
+        1,
+    ),
+    "runtime": (
+        ("tool_executions", "tools"),
+        """SELECT tool, 'runtime', runtime, created_at FROM (
+            SELECT COALESCE(t.name, 'tool#' || e.tool_id) AS tool, e.runtime, e.created_at,
+                   e.id, ROW_NUMBER() OVER (
+                       PARTITION BY e.tool_id ORDER BY e.created_at DESC, e.id DESC
+                   ) AS rank
+            FROM tool_executions e LEFT JOIN tools t ON t.id = e.tool_id
+            WHERE e.runtime IS NOT NULL
+        ) WHERE rank <= :limit ORDER BY tool, created_at, id""",
+        -1,
+    ),
+    "health": (
+        ("health_checks",),
+        """SELECT component, 'health',
+                  CASE UPPER(status) WHEN 'HEALTHY' THEN 2 WHEN 'WARNING' THEN 1 ELSE 0 END,
+                  stamp
+           FROM (
+               SELECT {component} AS component, status, {stamp} AS stamp, id,
+                      ROW_NUMBER() OVER (
+                          PARTITION BY {component} ORDER BY {stamp} DESC, id DESC
+                      ) AS rank
+               FROM health_checks
+           ) WHERE rank <= :limit ORDER BY component, stamp, id""",
+        1,
+    ),
+}
+
+
+def _source_sql(c, needed, sql):
+    """Source query with its columns filled in, or None if the schema lacks them"""
+    columns = {row[1] for row in c.execute(f"PRAGMA table_info({needed[0]})")}
+    stamps = [col for col in AUDIT_TABLES.get(needed[0], ("created_at",)) if col in columns]
+    if not stamps:
+        return None
+    component = "component" if "component" in columns else "'system'"
+    return sql.format(stamp=stamps[0], component=component)
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("trend analysis needs numpy (pip install numpy)")
+
+
+# === LOADING ===
+def load_series(conn, limit=MAX_POINTS):
+    """Load every series into one right-aligned NaN-padded matrix
+
+    Returns (keys, values, stamps, directions): keys[i] is (source,
+    component, series), values is an (n_series, n_points) float array with
+    the newest sample in the last column, stamps holds the matching ISO
+    timestamps and directions is +1/-1 per series.
+    """
+    require_numpy()
+    c = conn.cursor()
+    c.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in c.fetchall()}
+
+    keys, directions, codes, samples, stamps = [], [], [], [], []
+    index = {}
+    for source, (needed, sql, direction) in SERIES_SOURCES.items():
+        if not tables.issuperset(needed):
+            continue
+        sql = _source_sql(c, needed, sql)
+        if sql is None:
+            continue
+        try:
+            rows = c.execute(sql, {"limit": limit}).fetchall()
+        except sqlite3.OperationalError:
+            continue  # a column the query needs is missing from this schema
+        for component, series, value, stamp in rows:
+            key = (source, str(component), str(series))
+            if key not in index:
+                index[key] = len(keys)
+                keys.append(key)
+                directions.append(direction)
+            codes.append(index[key])
+            samples.append(value)
+            stamps.append(stamp)
+
+    if not keys:
+        empty = np.empty((0, 0))
+        return [], empty, np.empty((0, 0), dtype=object), np.empty(0)
+
+    # Rows arrive grouped by series in time order, so each sample's column
+    # is its offset within the group shifted right by the group's padding
+    codes = np.asarray(codes)
+    counts = np.bincount(codes, minlength=len(keys))
+    width = counts.max()
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    columns = np.arange(len(codes)) - starts[codes] + (width - counts[codes])
+
+    values = np.full((len(keys), width), np.nan)
+    values[codes, columns] = np.asarray(samples, dtype=float)
+    stamp_grid = np.full((len(keys), width), None, dtype=object)
+    stamp_grid[codes, columns] = stamps
+    return keys, values, stamp_grid, np.asarray(directions, dtype=float)
+
+
+# === ANALYSIS ===
+def slopes(values):
+    """Least-squares slope per series (per sample), ignoring NaN padding"""
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=1)
+    x = np.broadcast_to(np.arange(values.shape[1], dtype=float), values.shape)
+    x_mean = np.where(mask, x, 0).sum(axis=1) / n
+    y_mean = np.nanmean(values, axis=1)
+    dx = np.where(mask, x - x_mean[:, None], 0)
+    dy = np.where(mask, values - y_mean[:, None], 0)
+    return (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+
+def rolling_zscores(values, window=Z_WINDOW):
+    """z-score of each series' newest sample against the window before it"""
+    prior = values[:, -window - 1 : -1]
+    count = (~np.isnan(prior)).sum(axis=1)
+    mean = np.nanmean(prior, axis=1)
+    std = np.nanstd(prior, axis=1, ddof=1)
+    z = (values[:, -1] - mean) / std
+    z[(count < MIN_SAMPLES) | ~np.isfinite(z)] = np.nan
+    return z
+
+
+def change_points(values, min_segment=MIN_SEGMENT):
+    """Strongest mean shift per series; returns (column, statistic, shift)
+
+    For every split the statistic is |mean_after - mean_before| scaled by
+    sqrt(n_before * n_after / n) / std, computed for all splits of all
+    series at once from cumulative sums.
+    """
+    if values.shape[1] < 2:
+        nothing = np.full(values.shape[0], np.nan)
+        return np.full(values.shape[0], -1), nothing, nothing
+
+    mask = ~np.isnan(values)
+    filled = np.where(mask, values, 0.0)
+    left_n = np.cumsum(mask, axis=1)[:, :-1].astype(float)
+    left_sum = np.cumsum(filled, axis=1)[:, :-1]
+    total_n = left_n[:, -1:] + mask[:, -1:]
+    total_sum = left_sum[:, -1:] + filled[:, -1:]
+    right_n = total_n - left_n
+    right_sum = total_sum - left_sum
+
+    shift = right_sum / right_n - left_sum / left_n
+    std = np.nanstd(values, axis=1, ddof=1)[:, None]
+    stat = np.abs(shift) * np.sqrt(left_n * right_n / total_n) / std
+    stat[(left_n < min_segment) | (right_n < min_segment) | ~np.isfinite(stat)] = -np.inf
+
+    best = stat.argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    best_stat = stat[rows, best]
+    found = np.isfinite(best_stat)
+    column = np.where(found, best + 1, -1)
+    return column, np.where(found, best_stat, np.nan), np.where(found, shift[rows, best], np.nan)
+
+
+def analyze_series(conn=None, limit=MAX_POINTS):
+    """Slope, rolling z-score and change point for every series at once
+
+    Returns one dict per series with a "degrading" flag and the reasons
+    behind it. Directions are applied so "degrading" always means worse.
+    """
+    require_numpy()
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
+    try:
+        keys, values, stamps, directions = load_series(conn, limit)
+    finally:
+        if own_conn:
+            conn.close()
+    if not keys:
+        return []
+
+    # Short or constant series produce NaN/inf, which the thresholds below ignore
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        counts = (~np.isnan(values)).sum(axis=1)
+        means = np.nanmean(values, axis=1)
+        relative_slope = slopes(values) / np.abs(means)
+        z = rolling_zscores(values)
+        column, stat, shift = change_points(values)
+
+        # Flip signs so negative always means "getting worse"
+        worse_slope = directions * relative_slope <= -SLOPE_THRESHOLD
+        worse_z = directions * z <= -Z_THRESHOLD
+        worse_shift = (stat >= CHANGE_THRESHOLD) & (directions * shift < 0)
+        enough = counts >= MIN_SAMPLES
+
+    results = []
+    for i, (source, component, series) in enumerate(keys):
+        reasons = []
+        if enough[i] and worse_slope[i]:
+            reasons.append(f"slope {relative_slope[i]:+.1%}/sample")
+        if worse_z[i]:
+            reasons.append(f"z-score {z[i]:+.2f}")
+        if enough[i] and worse_shift[i]:
+            reasons.append(f"shift {shift[i]:+.3g} since {stamps[i, column[i]]}")
+        results.append(
+            {
+                "source": source,
+                "component": component,
+                "series": series,
+                "count": int(counts[i]),
+                "last": float(values[i, -1]),
+                "mean": float(means[i]),
+                "slope": _number(relative_slope[i]),
+                "z_score": _number(z[i]),
+                "change_at": stamps[i, column[i]] if column[i] >= 0 else None,
+                "change_stat": _number(stat[i]),
+                "degrading": bool(reasons),
+                "reasons": reasons,
+            }
+        )
+    return results
+
+
+def _number(value):
+    return float(value) if np.isfinite(value) else None
+
+
+# === ALERTS ===
+def write_alerts(results):
+    """Insert one degradation alert per degrading series in a single transaction
+
+    Series that already have an unresolved alert from this analysis are
+    skipped. Returns the number of alerts written.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        """SELECT component, json_extract(metric_data, '$.series') FROM degradation_alerts
+                 WHERE resolved=0 AND json_valid(metric_data)"""
+    )
+    open_alerts = set(c.fetchall())
+
+    now = datetime.now().isoformat()
+    rows = []
+    for r in results:
+        label = f"{r['source']}:{r['series']}"
+        if not r["degrading"] or (r["component"], label) in open_alerts:
+            continue
+        z = r["z_score"]
+        severity = "critical" if z is not None and abs(z) >= 2 * Z_THRESHOLD else "warning"
+        message = f"{r['component']}.{r['series']} degrading: {', '.join(r['reasons'])}"
+        metric_data = json.dumps(dict(r, series=label, trend="degrading"))
+        rows.append((r["component"], severity, message, metric_data, now))
+
+    c.executemany(
+        """INSERT INTO degradation_alerts (component, severity, message, metric_data, created_at)
+                 VALUES (?, ?, ?, ?, ?)""",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def print_scan(results):
+    """Print the degrading series from an analysis"""
+    degrading = [r for r in results if r["degrading"]]
+    print(f"\n📉 {len(degrading)} of {len(results)} series degrading")
+    for r in degrading:
+        reasons = ", ".join(r["reasons"])
+        print(f"  • [{r['source']}] {r['component']}.{r['series']}: {reasons}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "scan"
+    if np is None:
+        print("✗ Trend analysis needs numpy: pip install numpy")
+        sys.exit(1)
+
+    if cmd in ("scan", "alert"):
+        results = analyze_series()
+        print_scan(results)
+        if cmd == "alert":
+            print(f"\n✓ Wrote {write_alerts(results)} alerts")
+
+    else:
+        print("Usage: trend_analysis.py [scan|alert]")
@@ -2,78 +2,20 @@
 """Workspace CLI: Unified interface for all systems"""
 import sys
 
-# Import all systems
-try:
-    from kb_manager import add_entry, search as kb_search
-    from workspace_manager import (
-        wiki_create,
-        todo_add,
-        todo_list,
-        progress_add,
-        progress_list,
-    )
-    from proposal_system import (
-        submit_proposal,
-        auto_validate,
-        convert_to_todo,
-        list_proposals,
-    )
-    from collab_system import (
-        add_user,
-        start_discussion,
-        add_comment,
-        assign_item,
-        get_notifications,
-    )
-    from session_manager import (
-        resume_session,
-        add_message,
-        set_state,
-        get_all_state,
-        add_bookmark,
-    )
-    from tools_manager import discover_tools, execute_tool, get_tool_stats, list_tools
-    from review_tools import auto_review_code, review_proposal_quality
-    from quality_gate import execute_gate, run_assessment, get_alerts
-    from prevention_system import (
-        check_prevention_rules,
-        check_guardrails,
-        proactive_check,
-    )
-    from maintenance_system import (
-        run_due_tasks,
-        get_complexity_score,
-        get_utilization_summary,
-    )
-    from project_manager import (
-        list_projects,
-        get_project,
-        analyze_project,
-        project_summary,
-    )
-    from git_backup import (
-        git_backup,
-        git_recover,
-        list_git_backups,
-        cleanup_old_backups,
-    )
-    from smart_cleanup import (
-        analyze_project as analyze_cleanup,
-        auto_cleanup,
-    )
-    from tool_helpers import (
-        add_discussion,
-        get_discussions,
-        resolve_discussion,
-        admin_disable_tool,
-        admin_enable_tool,
-        admin_reset_tool_stats,
-        get_admin_logs,
-        get_tool_health_summary,
-        get_review_summary,
-    )
-except ImportError as e:
-    print(f"Warning: Some modules not available: {e}")
+# Command name -> (handler, minimum len(sys.argv)), filled in by @command.
+# Handlers import what they use themselves, so `ws help` loads no system
+# modules and every other command loads only its own.
+COMMANDS = {}
+
+
+def command(name, min_args=2):
+    """Register the decorated function as the handler for `ws <name>`"""
+
+    def register(handler):
+        COMMANDS[name] = (handler, min_args)
+        return handler
+
+    return register
 
 
 def show_help():
@@ -91,13 +33,17 @@ def show_help():
   ws check               - Run all checks (quality, prevention, proactive)
   ws maintain            - Run maintenance tasks
   ws search <query>      - Search everything
+  ws bench-startup [runs] - Time start-up of help, status and search
   
 NEW AUTOMATION:
-  ws backup              - Create database backup
+  ws backup              - Create database backup (online, deduplicated)
   ws health              - Check system health
   ws tasks               - List automated tasks
   ws improve             - Analyze what needs improvement
   ws optimize            - Find duplications & alternatives
+  ws scheduler [once|next] - Run task scheduler daemon (replaces cron entries)
+  ws metrics push [jsonl|csv] - Bulk-record quality metrics from stdin
+  ws trends [--alert]    - Scan every metric series for degradation (needs numpy)
 
 PROJECT MANAGEMENT:
   ws projects            - List all projects
@@ -108,7 +54,7 @@ def show_help():
   ws backup <path> [reason] - Git backup (tag + stash)
   ws backups <path>      - List git backup tags
   ws recover <path> <tag> - Recover from git tag
-  ws cleanup-backups <path> - Remove old backup tags
+  ws cleanup-backups <path> [keep] [--keep [reason=]N[d]] - Remove old backup tags
 
 SMART CLEANUP:
   ws analyze-cleanup <path> - Find duplicates, dead code, etc.
@@ -139,46 +85,53 @@ def status_dashboard():
 
     # Complexity
     try:
+        from maintenance_system import get_complexity_score
+
         complexity = get_complexity_score()
         print(f"\n📊 Complexity: {complexity['score']} ({complexity['level'].upper()})")
         print(f"   Capabilities: {complexity['capabilities']}, Tools: {complexity['tools']}")
     except:
         print("\n📊 Complexity: N/A")
 
-    # Todos by priority
+    # Todos, proposals, alerts and tools come from the materialized summary
     try:
-        todos = todo_list()
-        urgent = sum(1 for t in todos if t[4] == "urgent")
-        high = sum(1 for t in todos if t[4] == "high")
-        print(f"\n✓ Todos: {len(todos)} total ({urgent} urgent, {high} high)")
-    except:
+        from workspace_summary import get_summary
+
+        summary = get_summary()
+    except Exception:
+        summary = None
+
+    if summary:
+        todos = summary["todos"]
+        print(
+            f"\n✓ Todos: {todos['total']} total ({todos['priority'].get('urgent', 0)} urgent, "
+            f"{todos['priority'].get('high', 0)} high)"
+        )
+        proposals = summary["proposals"]
+        submitted = proposals["status"].get("submitted", 0)
+        print(f"\n📝 Proposals: {proposals['total']} total ({submitted} pending review)")
+        unresolved = summary["degradation_alerts"]["status"].get("unresolved", 0)
+        print(f"\n⚠️  Alerts: {unresolved} unresolved")
+        print(f"\n🔧 Tools: {summary['tools']['status'].get('active', 0)} active")
+    else:
         print("\n✓ Todos: N/A")
-
-    # Proposals
-    try:
-        proposals = list_proposals()
-        submitted = sum(1 for p in proposals if p[7] == "submitted")
-        print(f"\n📝 Proposals: {len(proposals)} total ({submitted} pending review)")
-    except:
         print("\n📝 Proposals: N/A")
-
-    # Alerts
-    try:
-        alerts = get_alerts()
-        print(f"\n⚠️  Alerts: {len(alerts)} unresolved")
-    except:
         print("\n⚠️  Alerts: N/A")
+        print("\n🔧 Tools: N/A")
 
-    # Tools
+    # Notifications (maintained counters, no scan)
     try:
-        tools = list_tools()
-        active = sum(1 for t in tools if t[7] == "active")
-        print(f"\n🔧 Tools: {active} active")
-    except:
-        print("\n🔧 Tools: N/A")
+        from collab_system import unread_counts
+
+        unread = unread_counts()
+        print(f"\n🔔 Notifications: {sum(unread.values())} unread for {len(unread)} users")
+    except Exception:
+        print("\n🔔 Notifications: N/A")
 
     # Utilization
     try:
+        from maintenance_system import get_utilization_summary
+
         util = get_utilization_summary()
         if util:
             high_util = [u for u in util if u["percent"] > 80]
@@ -192,6 +145,10 @@ def status_dashboard():
 
 def init_workspace(user):
     """Initialize workspace for user"""
+    from collab_system import add_user
+    from session_manager import resume_session
+    from tools_manager import discover_tools
+
     print(f"Initializing workspace for {user}...")
 
     # Add user
@@ -223,6 +180,8 @@ def init_workspace(user):
 
 def quick_propose(title):
     """Quick proposal submission with auto-validation"""
+    from proposal_system import auto_validate, convert_to_todo, submit_proposal
+
     print(f"Submitting proposal: {title}")
 
     # Get description
@@ -260,6 +219,8 @@ def quick_propose(title):
 def list_todos_by_priority():
     """List todos organized by priority"""
     try:
+        from workspace_manager import todo_list
+
         todos = todo_list()
 
         # Group by priority
@@ -300,6 +261,8 @@ def run_all_checks():
     # Quality gate
     print("\n1. Quality Gate...")
     try:
+        from quality_gate import execute_gate
+
         result = execute_gate("pre-commit")
         if result:
             status = "✓ PASS" if result["status"] == "pass" else "✗ FAIL"
@@ -310,6 +273,8 @@ def run_all_checks():
     # Prevention check
     print("\n2. Prevention Rules...")
     try:
+        from prevention_system import check_prevention_rules
+
         prevented = check_prevention_rules({})
         if prevented:
             print(f"   ⚠️  {len(prevented)} actions prevented")
@@ -321,6 +286,8 @@ def run_all_checks():
     # Proactive check
     print("\n3. Proactive Check...")
     try:
+        from prevention_system import proactive_check
+
         issues = proactive_check()
         if issues:
             print(f"   ⚠️  {len(issues)} issues found")
@@ -334,6 +301,8 @@ def run_all_checks():
     # Assessment
     print("\n4. System Assessment...")
     try:
+        from quality_gate import run_assessment
+
         assessment = run_assessment("system", "workspace")
         print(f"   Score: {assessment['score']}/100 (Grade: {assessment['grade']})")
     except:
@@ -350,6 +319,8 @@ def search_all(query):
 
     # Knowledge base
     try:
+        from kb_manager import search as kb_search
+
         kb_results = kb_search(query)
         if kb_results:
             print(f"📚 Knowledge Base ({len(kb_results)}):")
@@ -361,6 +332,8 @@ def search_all(query):
 
     # Proposals
     try:
+        from proposal_system import list_proposals
+
         proposals = list_proposals()
         matching = [
             p for p in proposals if query.lower() in p[1].lower() or query.lower() in p[2].lower()
@@ -375,6 +348,8 @@ def search_all(query):
 
     # Todos
     try:
+        from workspace_manager import todo_list
+
         todos = todo_list()
         matching = [t for t in todos if query.lower() in t[1].lower()]
         if matching:
@@ -389,236 +364,431 @@ def search_all(query):
         print("No results found.")
 
 
-def main():
-    if len(sys.argv) < 2:
-        show_help()
-        sys.exit(0)
+# === COMMANDS ===
+@command("status")
+def cmd_status():
+    status_dashboard()
 
-    cmd = sys.argv[1]
 
-    # Quick commands
-    if cmd == "status":
-        status_dashboard()
+@command("init", 3)
+def cmd_init():
+    init_workspace(sys.argv[2])
 
-    elif cmd == "init" and len(sys.argv) >= 3:
-        init_workspace(sys.argv[2])
 
-    elif cmd == "propose" and len(sys.argv) >= 3:
-        title = " ".join(sys.argv[2:])
-        quick_propose(title)
+@command("propose", 3)
+def cmd_propose():
+    title = " ".join(sys.argv[2:])
+    quick_propose(title)
 
-    elif cmd == "todo":
-        if len(sys.argv) == 2:
-            list_todos_by_priority()
-        else:
-            print("Use: ws todo (to list) or ws todo add <title> (to add)")
-
-    elif cmd == "review" and len(sys.argv) >= 3:
-        file_path = sys.argv[2]
-        print(f"Reviewing {file_path}...")
-        try:
-            review_id = auto_review_code(file_path)
-            print(f"✓ Review #{review_id} complete")
-        except Exception as e:
-            print(f"✗ Error: {e}")
-
-    elif cmd == "check":
-        run_all_checks()
-
-    elif cmd == "maintain":
-        print("Running maintenance tasks...")
-        try:
-            results = run_due_tasks()
-            if results:
-                print(f"✓ Ran {len(results)} tasks")
-                for r in results:
-                    status = "✓" if r["status"] == "success" else "✗"
-                    print(f"   {status} {r['task']}")
-            else:
-                print("No tasks due")
-        except Exception as e:
-            print(f"✗ Error: {e}")
-
-    elif cmd == "backup":
-        import subprocess
-
-        subprocess.run(["python3", "backup_manager.py", "backup"])
-
-    elif cmd == "health":
-        import subprocess
-
-        subprocess.run(["python3", "health_monitor.py", "check"])
-
-    elif cmd == "tasks":
-        import subprocess
-
-        subprocess.run(["python3", "task_automator.py", "list"])
-
-    elif cmd == "improve":
-        import subprocess
-
-        subprocess.run(["python3", "improvement_analyzer.py", "analyze"])
-
-    elif cmd == "optimize":
-        import subprocess
-
-        subprocess.run(["python3", "optimization_analyzer.py"])
-
-    elif cmd == "discuss":
-        if len(sys.argv) < 3:
-            print("Usage: ws discuss <add|list|resolve> ...")
-            return
-        subcmd = sys.argv[2]
-        if subcmd == "add" and len(sys.argv) >= 6:
-            review_id, review_type, user, message = (
-                sys.argv[3],
-                sys.argv[4],
-                sys.argv[5],
-                " ".join(sys.argv[6:]),
-            )
-            disc_id = add_discussion(int(review_id), review_type, user, message)
-            print(f"✓ Discussion #{disc_id} added")
-        elif subcmd == "list" and len(sys.argv) >= 5:
-            review_id, review_type = int(sys.argv[3]), sys.argv[4]
-            discussions = get_discussions(review_id, review_type)
-            for d in discussions:
-                status = "✓" if d["resolved"] else "○"
-                print(f"{status} [{d['user']}] {d['message']}")
-        elif subcmd == "resolve" and len(sys.argv) >= 4:
-            resolve_discussion(int(sys.argv[3]))
-            print("✓ Discussion resolved")
-
-    elif cmd == "admin":
-        if len(sys.argv) < 3:
-            print("Usage: ws admin <disable|enable|reset|logs> ...")
-            return
-        subcmd = sys.argv[2]
-        if subcmd == "disable" and len(sys.argv) >= 5:
-            admin_user, tool_id, reason = (
-                sys.argv[3],
-                int(sys.argv[4]),
-                " ".join(sys.argv[5:]),
-            )
-            admin_disable_tool(admin_user, tool_id, reason)
-            print(f"✓ Tool #{tool_id} disabled")
-        elif subcmd == "enable" and len(sys.argv) >= 5:
-            admin_user, tool_id = sys.argv[3], int(sys.argv[4])
-            admin_enable_tool(admin_user, tool_id)
-            print(f"✓ Tool #{tool_id} enabled")
-        elif subcmd == "reset" and len(sys.argv) >= 5:
-            admin_user, tool_id = sys.argv[3], int(sys.argv[4])
-            admin_reset_tool_stats(admin_user, tool_id)
-            print(f"✓ Tool #{tool_id} stats reset")
-        elif subcmd == "logs":
-            logs = get_admin_logs()
-            for log in logs:
-                print(
-                    f"[{log['created_at']}] {log['admin']}: {log['action']} on {log['target_type']}#{log['target_id']}"
-                )
 
-    elif cmd == "summary":
-        print("\n📊 System Summary\n")
-        tool_health = get_tool_health_summary()
-        print(f"Tools: {tool_health['status_counts']}")
-        print(f"Avg Success Rate: {tool_health['avg_success_rate']}%")
-        review_summary = get_review_summary()
-        print(f"\nReviews: {review_summary['review_counts']}")
-        print(f"Avg Score: {review_summary['avg_score']}")
-
-    elif cmd == "search" and len(sys.argv) >= 3:
-        query = " ".join(sys.argv[2:])
-        search_all(query)
-
-    elif cmd == "projects":
-        projects = list_projects()
-        if projects:
-            print("\n📁 Projects:")
-            for p in projects:
-                status_icon = "✓" if p[3] == "active" else "📦"
-                print(f"  {status_icon} [{p[3]}] {p[1]}")
-                print(f"     {p[2]}")
-        else:
-            print("\n📁 No projects registered")
-            print("   Run: python3 src/project_manager.py scan")
-
-    elif cmd == "project" and len(sys.argv) >= 3:
-        name = sys.argv[2]
-        project = get_project(name)
-        if project:
-            print(f"\n📁 Project: {project[1]}")
-            print(f"Status: {project[3]}")
-            print(f"Path: {project[2]}")
-            if project[4]:
-                print(f"Description: {project[4]}")
-            print(f"Created: {project[5]}")
-            print(f"Updated: {project[6]}")
-        else:
-            print(f"✗ Project '{name}' not found")
-
-    elif cmd == "project-analyze" and len(sys.argv) >= 3:
-        name = sys.argv[2]
-        project = get_project(name)
-        if project:
-            stats = analyze_project(project[2])
-            if stats:
-                print(f"\n📊 Project Analysis: {name}")
-                print(f"Path: {stats['path']}")
-                print(f"Files: {stats['files_count']:,}")
-                print(f"Python files: {stats['py_files']:,}")
-                print(f"Lines of code: {stats['lines_count']:,}")
-                print(f"Git: {'✓' if stats['has_git'] else '✗'}")
-                print(f"Tests: {'✓' if stats['has_tests'] else '✗'}")
-                print(f"Venv: {'✓' if stats['has_venv'] else '✗'}")
-                print(f"Requirements: {'✓' if stats['has_requirements'] else '✗'}")
-                if stats["last_commit"]:
-                    print(f"Last commit: {stats['last_commit']}")
+@command("todo")
+def cmd_todo():
+    if len(sys.argv) == 2:
+        list_todos_by_priority()
+    else:
+        print("Use: ws todo (to list) or ws todo add <title> (to add)")
+
+
+@command("review", 3)
+def cmd_review():
+    from review_tools import auto_review_code
+
+    file_path = sys.argv[2]
+    print(f"Reviewing {file_path}...")
+    try:
+        review_id = auto_review_code(file_path)
+        print(f"✓ Review #{review_id} complete")
+    except Exception as e:
+        print(f"✗ Error: {e}")
+
+
+@command("check")
+def cmd_check():
+    run_all_checks()
+
+
+@command("maintain")
+def cmd_maintain():
+    print("Running maintenance tasks...")
+    try:
+        from maintenance_system import run_due_tasks
+
+        results = run_due_tasks()
+        if results:
+            print(f"✓ Ran {len(results)} tasks")
+            for r in results:
+                status = "✓" if r["status"] == "success" else "✗"
+                print(f"   {status} {r['task']}")
         else:
-            print(f"✗ Project '{name}' not found")
+            print("No tasks due")
+    except Exception as e:
+        print(f"✗ Error: {e}")
+
+
+@command("backup")
+def cmd_backup():
+    # `ws backup` backs up the database; `ws backup <path> [reason]` tags a git repo
+    if len(sys.argv) >= 3:
+        from git_backup import git_backup
 
-    elif cmd == "backup" and len(sys.argv) >= 3:
         path = sys.argv[2]
         reason = sys.argv[3] if len(sys.argv) > 3 else "manual"
         tag = git_backup(path, reason)
         if tag:
             print(f"\n✓ Git backup created: {tag}")
+        return
 
-    elif cmd == "backups" and len(sys.argv) >= 3:
-        path = sys.argv[2]
-        backups = list_git_backups(path)
-        if backups:
-            print(f"\n📦 Git Backups ({len(backups)}):")
-            for tag in backups:
-                print(f"  {tag}")
-        else:
-            print("\n📦 No git backups found")
+    import backup_manager
 
-    elif cmd == "recover" and len(sys.argv) >= 4:
-        path = sys.argv[2]
-        tag = sys.argv[3]
-        success = git_recover(tag, path)
-        if success:
-            print("\n✓ Recovery complete")
+    backup_manager.backup_database()
+    backup_manager.rotate_backups()
 
-    elif cmd == "cleanup-backups" and len(sys.argv) >= 3:
-        path = sys.argv[2]
-        keep = int(sys.argv[3]) if len(sys.argv) > 3 else 5
-        removed = cleanup_old_backups(path, keep)
 
-    elif cmd == "analyze-cleanup" and len(sys.argv) >= 3:
-        path = sys.argv[2]
-        analyze_cleanup(path)
+@command("health")
+def cmd_health():
+    import health_monitor
 
-    elif cmd == "auto-cleanup" and len(sys.argv) >= 3:
-        path = sys.argv[2]
-        live = "--live" in sys.argv
-        auto_cleanup(path, dry_run=not live)
+    health_monitor.init_db()
+    health_monitor.print_health()
+
+
+@command("tasks")
+def cmd_tasks():
+    import task_automator
+
+    task_automator.init_db()
+    task_automator.list_tasks()
+
+
+@command("improve")
+def cmd_improve():
+    import improvement_analyzer
+
+    improvement_analyzer.init_db()
+    improvement_analyzer.generate_improvement_report()
+
+
+@command("optimize")
+def cmd_optimize():
+    import optimization_analyzer
+
+    optimization_analyzer.init_db()
+    optimization_analyzer.print_report()
+
+
+@command("scheduler")
+def cmd_scheduler():
+    from scheduler import list_upcoming, run_once, run_scheduler
+
+    subcmd = sys.argv[2] if len(sys.argv) > 2 else "run"
+    if subcmd == "once":
+        started = run_once()
+        print(f"✓ Dispatched {len(started)} due tasks")
+    elif subcmd == "next":
+        for due, source, name in list_upcoming():
+            print(f"  {due.strftime('%Y-%m-%d %H:%M')}  [{source}] {name}")
+    else:
+        run_scheduler()
+
+
+@command("metrics")
+def cmd_metrics():
+    from quality_gate import parse_metric_lines, record_metrics
+
+    subcmd = sys.argv[2] if len(sys.argv) > 2 else None
+    if subcmd == "push":
+        fmt = sys.argv[3] if len(sys.argv) > 3 else None
+        result = record_metrics(parse_metric_lines(sys.stdin, fmt))
+        print(
+            f"✓ Recorded {result['inserted']} metrics across {result['series']} series "
+            f"({result['skipped']} skipped, {result['alerts']} alerts)"
+        )
+    else:
+        print("Usage: ws metrics push [jsonl|csv] < metrics")
+
+
+@command("trends")
+def cmd_trends():
+    import trend_analysis
+
+    if trend_analysis.np is None:
+        print("✗ Trend analysis needs numpy: pip install numpy")
+        return
+    results = trend_analysis.analyze_series()
+    trend_analysis.print_scan(results)
+    if "--alert" in sys.argv:
+        print(f"\n✓ Wrote {trend_analysis.write_alerts(results)} alerts")
+
+
+@command("discuss")
+def cmd_discuss():
+    from tool_helpers import add_discussion, get_discussions, resolve_discussion
+
+    if len(sys.argv) < 3:
+        print("Usage: ws discuss <add|list|resolve> ...")
+        return
+    subcmd = sys.argv[2]
+    if subcmd == "add" and len(sys.argv) >= 6:
+        review_id, review_type, user, message = (
+            sys.argv[3],
+            sys.argv[4],
+            sys.argv[5],
+            " ".join(sys.argv[6:]),
+        )
+        disc_id = add_discussion(int(review_id), review_type, user, message)
+        print(f"✓ Discussion #{disc_id} added")
+    elif subcmd == "list" and len(sys.argv) >= 5:
+        review_id, review_type = int(sys.argv[3]), sys.argv[4]
+        discussions = get_discussions(review_id, review_type)
+        for d in discussions:
+            status = "✓" if d["resolved"] else "○"
+            print(f"{status} [{d['user']}] {d['message']}")
+    elif subcmd == "resolve" and len(sys.argv) >= 4:
+        resolve_discussion(int(sys.argv[3]))
+        print("✓ Discussion resolved")
+
+
+@command("admin")
+def cmd_admin():
+    from tool_helpers import (
+        admin_disable_tool,
+        admin_enable_tool,
+        admin_reset_tool_stats,
+        get_admin_logs,
+    )
+
+    if len(sys.argv) < 3:
+        print("Usage: ws admin <disable|enable|reset|logs> ...")
+        return
+    subcmd = sys.argv[2]
+    if subcmd == "disable" and len(sys.argv) >= 5:
+        admin_user, tool_id, reason = (
+            sys.argv[3],
+            int(sys.argv[4]),
+            " ".join(sys.argv[5:]),
+        )
+        admin_disable_tool(admin_user, tool_id, reason)
+        print(f"✓ Tool #{tool_id} disabled")
+    elif subcmd == "enable" and len(sys.argv) >= 5:
+        admin_user, tool_id = sys.argv[3], int(sys.argv[4])
+        admin_enable_tool(admin_user, tool_id)
+        print(f"✓ Tool #{tool_id} enabled")
+    elif subcmd == "reset" and len(sys.argv) >= 5:
+        admin_user, tool_id = sys.argv[3], int(sys.argv[4])
+        admin_reset_tool_stats(admin_user, tool_id)
+        print(f"✓ Tool #{tool_id} stats reset")
+    elif subcmd == "logs":
+        logs = get_admin_logs()
+        for log in logs:
+            print(
+                f"[{log['created_at']}] {log['admin']}: {log['action']} on {log['target_type']}#{log['target_id']}"
+            )
+
+
+@command("summary")
+def cmd_summary():
+    from tool_helpers import get_review_summary, get_tool_health_summary
+
+    print("\n📊 System Summary\n")
+    tool_health = get_tool_health_summary()
+    print(f"Tools: {tool_health['status_counts']}")
+    print(f"Avg Success Rate: {tool_health['avg_success_rate']}%")
+    review_summary = get_review_summary()
+    print(f"\nReviews: {review_summary['review_counts']}")
+    print(f"Avg Score: {review_summary['avg_score']}")
+
+
+@command("search", 3)
+def cmd_search():
+    query = " ".join(sys.argv[2:])
+    search_all(query)
+
+
+@command("projects")
+def cmd_projects():
+    from project_manager import list_projects
+
+    projects = list_projects()
+    if projects:
+        print("\n📁 Projects:")
+        for p in projects:
+            status_icon = "✓" if p[3] == "active" else "📦"
+            print(f"  {status_icon} [{p[3]}] {p[1]}")
+            print(f"     {p[2]}")
+    else:
+        print("\n📁 No projects registered")
+        print("   Run: python3 src/project_manager.py scan")
+
+
+@command("project", 3)
+def cmd_project():
+    from project_manager import get_project
+
+    name = sys.argv[2]
+    project = get_project(name)
+    if project:
+        print(f"\n📁 Project: {project[1]}")
+        print(f"Status: {project[3]}")
+        print(f"Path: {project[2]}")
+        if project[4]:
+            print(f"Description: {project[4]}")
+        print(f"Created: {project[5]}")
+        print(f"Updated: {project[6]}")
+    else:
+        print(f"✗ Project '{name}' not found")
+
+
+@command("project-analyze", 3)
+def cmd_project_analyze():
+    from project_manager import analyze_project, get_project
+
+    name = sys.argv[2]
+    project = get_project(name)
+    if project:
+        stats = analyze_project(project[2])
+        if stats:
+            print(f"\n📊 Project Analysis: {name}")
+            print(f"Path: {stats['path']}")
+            print(f"Files: {stats['files_count']:,}")
+            print(f"Python files: {stats['py_files']:,}")
+            print(f"Lines of code: {stats['lines_count']:,}")
+            print(f"Git: {'✓' if stats['has_git'] else '✗'}")
+            print(f"Tests: {'✓' if stats['has_tests'] else '✗'}")
+            print(f"Venv: {'✓' if stats['has_venv'] else '✗'}")
+            print(f"Requirements: {'✓' if stats['has_requirements'] else '✗'}")
+            if stats["last_commit"]:
+                print(f"Last commit: {stats['last_commit']}")
+    else:
+        print(f"✗ Project '{name}' not found")
 
-    elif cmd == "help":
-        show_help()
 
+@command("backups", 3)
+def cmd_backups():
+    from git_backup import list_git_backups
+
+    path = sys.argv[2]
+    backups = list_git_backups(path)
+    if backups:
+        print(f"\n📦 Git Backups ({len(backups)}):")
+        for b in backups:
+            print(f"  {b['tag']:50} {b['date']:%Y-%m-%d %H:%M}  {b['reason'] or '-'}")
     else:
+        print("\n📦 No git backups found")
+
+
+@command("recover", 4)
+def cmd_recover():
+    from git_backup import git_recover
+
+    path = sys.argv[2]
+    tag = sys.argv[3]
+    success = git_recover(tag, path)
+    if success:
+        print("\n✓ Recovery complete")
+
+
+@command("cleanup-backups", 3)
+def cmd_cleanup_backups():
+    from git_backup import cleanup_old_backups, keep_specs
+
+    path = sys.argv[2]
+    keep = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 5
+    cleanup_old_backups(path, keep, keep_specs(sys.argv), "--dry-run" in sys.argv)
+
+
+@command("analyze-cleanup", 3)
+def cmd_analyze_cleanup():
+    from smart_cleanup import analyze_project as analyze_cleanup
+
+    path = sys.argv[2]
+    analyze_cleanup(path)
+
+
+@command("auto-cleanup", 3)
+def cmd_auto_cleanup():
+    from smart_cleanup import auto_cleanup
+
+    path = sys.argv[2]
+    live = "--live" in sys.argv
+    auto_cleanup(path, dry_run=not live)
+
+
+@command("help")
+def cmd_help():
+    show_help()
+
+
+@command("bench-startup")
+def cmd_bench_startup():
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"\n⏱️  ws start-up time (best of {runs})")
+    for args, result in benchmark_startup(runs=runs).items():
+        print(f"  ws {args:20} {result['best'] * 1000:7.1f} ms  ({result['modules']} modules)")
+
+
+# === START-UP BENCHMARK ===
+BENCH_COMMANDS = (["help"], ["status"], ["search", "backup"])
+
+# Runs ws like `python3 workspace_cli.py ...`, then reports how many modules it loaded
+BENCH_SCRIPT = """
+import runpy, sys
+script, sys.argv = sys.argv[1], sys.argv[1:]
+sys.path.insert(0, script.rpartition("/")[0])
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    print(len(sys.modules), file=sys.stderr)
+"""
+
+
+def benchmark_startup(commands=BENCH_COMMANDS, runs=5):
+    """Time fresh `ws <command>` processes; returns {command: {best, mean, modules}}
+
+    Each run is a new interpreter, so the numbers include interpreter
+    start-up and every import the command triggers.
+    """
+    import os
+    import subprocess
+    import time
+
+    script = os.path.abspath(__file__)
+    results = {}
+    for args in commands:
+        times, modules = [], 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-c", BENCH_SCRIPT, script, *args],
+                capture_output=True,
+                text=True,
+            )
+            times.append(time.perf_counter() - start)
+            modules = int(proc.stderr.strip().splitlines()[-1])
+        results[" ".join(args)] = {
+            "best": min(times),
+            "mean": sum(times) / len(times),
+            "modules": modules,
+        }
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        show_help()
+        sys.exit(0)
+
+    cmd = sys.argv[1]
+    if cmd not in COMMANDS:
         print(f"Unknown command: {cmd}")
         print("Run 'ws help' for usage")
+        return
+
+    handler, min_args = COMMANDS[cmd]
+    if len(sys.argv) < min_args:
+        print(f"Missing arguments for: ws {cmd}")
+        print("Run 'ws help' for usage")
+        return
+    handler()
 
 
 if __name__ == "__main__":
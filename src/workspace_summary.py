@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Workspace Summary: Trigger-maintained counts per table, status and priority"""
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path("/media/sunil-kr/workspace/workspace-system/workspace_knowledge.db")
+
+# table -> (status expression, priority expression) over a row alias
+TRACKED_TABLES = {
+    "todos": ("{row}.status", "{row}.priority"),
+    "proposals": ("{row}.status", "{row}.impact"),
+    "degradation_alerts": (
+        "CASE WHEN {row}.resolved THEN 'resolved' ELSE 'unresolved' END",
+        "{row}.severity",
+    ),
+    "tools": ("{row}.status", "{row}.type"),
+}
+
+# Columns whose updates move a row between summary buckets
+TRACKED_COLUMNS = {
+    "todos": "status, priority",
+    "proposals": "status, impact",
+    "degradation_alerts": "resolved, severity",
+    "tools": "status, type",
+}
+
+
+def _bump(table, row, delta):
+    """SQL that adds delta to the bucket of NEW/OLD row"""
+    status, priority = (expr.format(row=row) for expr in TRACKED_TABLES[table])
+    return f"""INSERT INTO workspace_summary (table_name, status, priority, count)
+                VALUES ('{table}', COALESCE({status}, ''), COALESCE({priority}, ''), {delta})
+                ON CONFLICT (table_name, status, priority)
+                DO UPDATE SET count = count + ({delta});"""
+
+
+def init_db():
+    """Create the summary table and triggers, backfilling newly tracked tables"""
+    conn = sqlite3.connect(DB_PATH)
+    install(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def install(c):
+    """Idempotently create the summary table and any missing triggers
+
+    A tracked table gets its triggers (and a one-off backfill) the first time
+    this runs after the table exists, so it is cheap to call on every read.
+    """
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS workspace_summary (
+        table_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (table_name, status, priority)
+    ) WITHOUT ROWID"""
+    )
+
+    c.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    existing = {row[0] for row in c.fetchall()}
+
+    for table in TRACKED_TABLES:
+        if table not in existing or f"{table}_summary_insert" in existing:
+            continue
+
+        c.execute(
+            f"""CREATE TRIGGER {table}_summary_insert AFTER INSERT ON {table}
+            BEGIN {_bump(table, "NEW", 1)} END"""
+        )
+        c.execute(
+            f"""CREATE TRIGGER {table}_summary_delete AFTER DELETE ON {table}
+            BEGIN {_bump(table, "OLD", -1)} END"""
+        )
+        c.execute(
+            f"""CREATE TRIGGER {table}_summary_update
+            AFTER UPDATE OF {TRACKED_COLUMNS[table]} ON {table}
+            BEGIN {_bump(table, "OLD", -1)} {_bump(table, "NEW", 1)} END"""
+        )
+        _rebuild_table(c, table)
+
+
+def _rebuild_table(c, table):
+    """Recompute one table's buckets from scratch"""
+    status, priority = (expr.format(row=table) for expr in TRACKED_TABLES[table])
+    c.execute("DELETE FROM workspace_summary WHERE table_name=?", (table,))
+    c.execute(
+        f"""INSERT INTO workspace_summary (table_name, status, priority, count)
+            SELECT '{table}', COALESCE({status}, ''), COALESCE({priority}, ''), COUNT(*)
+            FROM {table} GROUP BY 1, 2, 3"""
+    )
+
+
+def refresh_summary():
+    """Rebuild every bucket (repair after bulk edits that bypassed the triggers)"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    install(c)
+    c.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in c.fetchall()}
+    for table in TRACKED_TABLES:
+        if table in tables:
+            _rebuild_table(c, table)
+    conn.commit()
+    conn.close()
+
+
+def _empty_entry():
+    return {"total": 0, "status": {}, "priority": {}, "buckets": {}}
+
+
+def get_summary(conn=None):
+    """Counts for every tracked table in one indexed query
+
+    Returns {table: {"total": n, "status": {...}, "priority": {...},
+    "buckets": {(status, priority): n}}}. A caller passing its own
+    connection (to read inside its transaction) runs install() first.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
+        install(conn.cursor())
+        conn.commit()
+    c = conn.cursor()
+    c.execute("SELECT table_name, status, priority, count FROM workspace_summary WHERE count > 0")
+    rows = c.fetchall()
+    if own_conn:
+        conn.close()
+
+    summary = {table: _empty_entry() for table in TRACKED_TABLES}
+    for table, status, priority, count in rows:
+        entry = summary.setdefault(table, _empty_entry())
+        entry["total"] += count
+        entry["status"][status] = entry["status"].get(status, 0) + count
+        entry["priority"][priority] = entry["priority"].get(priority, 0) + count
+        entry["buckets"][(status, priority)] = count
+    return summary
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "show"
+
+    if cmd == "refresh":
+        refresh_summary()
+        print("✓ Workspace summary rebuilt")
+
+    elif cmd == "show":
+        for table, entry in get_summary().items():
+            print(f"\n{table} ({entry['total']})")
+            for status, count in sorted(entry["status"].items()):
+                print(f"  {status or '-':15} {count}")
+
+    else:
+        print("Usage: workspace_summary.py [show|refresh]")
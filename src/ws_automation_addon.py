@@ -4,7 +4,7 @@
 # Add to workspace_cli.py help:
 AUTOMATION_HELP = """
 AUTOMATION COMMANDS:
-  ws report [daily|weekly|monthly]  - Generate automated report
+  ws report [daily|weekly|monthly]  - Generate automated report (cached; --refresh)
   ws health                          - Quick health check
   ws auto-review                     - Automated system review
   ws auto-study                      - Trend analysis
@@ -21,11 +21,12 @@ def handle_automation_commands(cmd, args):
         auto_review,
         auto_study,
         auto_conclude,
+        take_snapshot,
     )
 
     if cmd == "report":
-        period = args[0] if args else "daily"
-        generate_report(period)
+        period = next((a for a in args if a != "--refresh"), "daily")
+        generate_report(period, refresh="--refresh" in args)
 
     elif cmd == "health":
         quick_health_check()
@@ -64,8 +65,9 @@ def handle_automation_commands(cmd, args):
                 print(f"  💡 {insight}")
 
     elif cmd == "auto-conclude":
-        review = auto_review()
-        study = auto_study()
+        snapshot = take_snapshot()
+        review = auto_review(snapshot)
+        study = auto_study(snapshot)
         conclusion = auto_conclude(review, study)
 
         print("\n🎯 CONCLUSIONS")
@@ -0,0 +1,27 @@
+"""Shared test helpers: temporary directories and databases patched into src modules"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Base case giving each test a fresh temporary directory in self.tmp"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def patch(self, target, name, value):
+        """Replace target.name with value until the test ends"""
+        return self.enterContext(mock.patch.object(target, name, value))
+
+    def patch_db(self, *modules, name="test.db"):
+        """Point DB_PATH of every module at one temporary database and return its path"""
+        db_path = self.tmp / name
+        for module in modules:
+            self.patch(module, "DB_PATH", db_path)
+        return db_path
@@ -0,0 +1,90 @@
+"""Test the write-behind audit sink"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import time
+import unittest
+
+import audit_sink  # noqa: E402
+import health_monitor  # noqa: E402
+import tools_manager  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+INSERT_SQL = "INSERT INTO events (value) VALUES (?)"
+
+
+class TestAuditSink(TempDirTestCase):
+    """Test suite for buffered audit writes"""
+
+    def setUp(self):
+        super().setUp()
+        self.db_path = self.tmp / "test.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, value INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def _count(self):
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_writes_are_buffered_until_flush(self):
+        """Rows are held in memory and written together on flush."""
+        sink = audit_sink.AuditSink(self.db_path, max_rows=1000, interval=60)
+        for i in range(10):
+            sink.write(INSERT_SQL, (i,))
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(sink.flush(), 10)
+        self.assertEqual(self._count(), 10)
+
+    def test_size_threshold_wakes_writer(self):
+        """A full buffer is flushed by the background thread without waiting."""
+        sink = audit_sink.AuditSink(self.db_path, max_rows=5, interval=60)
+        for i in range(5):
+            sink.write(INSERT_SQL, (i,))
+        deadline = time.monotonic() + 5
+        while self._count() < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._count(), 5)
+
+    def test_tool_stats_apply_in_batches(self):
+        """Buffered executions update tool counters as if written one by one."""
+        self.patch_db(tools_manager)
+        tools_manager.init_db()
+        tools_manager.register_tool("ok", "shell", "true")
+        for _ in range(3):
+            tools_manager.execute_tool("ok")
+        tools_manager.update_tool_stats(tools_manager.get_tool("ok")[0], False, 0.0)
+        stats = tools_manager.get_tool_stats("ok")
+        self.assertEqual(
+            (stats["usage_count"], stats["success_count"], stats["failure_count"]), (4, 3, 1)
+        )
+
+    def test_failed_group_does_not_sink_the_batch(self):
+        """A statement that fails is dead-lettered; other groups still commit."""
+        self.patch_db(tools_manager, health_monitor)
+        # health_monitor's health_checks lacks the column tools_manager writes
+        health_monitor.init_db()
+        tools_manager.init_db()
+        tools_manager.register_tool("ok", "shell", "true")
+        tools_manager.execute_tool("ok")
+        tools_manager.run_health_check("ok", lambda: {"success": True})
+        sink = audit_sink.get_sink(self.db_path)
+        self.assertEqual(audit_sink.flush(self.db_path), 2)
+        stats = tools_manager.get_tool_stats("ok")
+
+        self.assertEqual(stats["usage_count"], 1)
+        self.assertEqual(len(sink.dead), 1)
+        self.assertIn("health_checks", sink.dead[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
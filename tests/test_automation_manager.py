@@ -0,0 +1,99 @@
+"""Test snapshot-based report generation"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+from datetime import datetime
+
+import automation_manager  # noqa: E402
+import quality_gate  # noqa: E402
+import tools_manager  # noqa: E402
+import workspace_manager  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+MODULES = (automation_manager, quality_gate, workspace_manager)
+
+
+class TestReportSnapshot(TempDirTestCase):
+    """Test suite for consistent-snapshot reports and cached artifacts"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(*MODULES)
+        for module in MODULES:
+            module.init_db()
+
+    def _add_todo(self, priority):
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(automation_manager.DB_PATH)
+        conn.execute(
+            "INSERT INTO todos (title, priority, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            ("t", priority, now, now),
+        )
+        conn.commit()
+        conn.close()
+
+    def test_missing_tables_are_skipped(self):
+        """Metrics for tables that do not exist are None and left out of the review."""
+        self._add_todo("urgent")
+        snapshot = automation_manager.take_snapshot()
+        self.assertIsNone(snapshot["metrics"]["tools_active"])
+
+        review = automation_manager.auto_review(snapshot)
+        self.assertEqual(review["metrics"]["todos_urgent"], 1)
+        self.assertNotIn("tools_active", review["metrics"])
+
+    def test_counts_come_from_workspace_summary(self):
+        """Todo counts are read from the trigger-maintained summary table."""
+        self._add_todo("urgent")
+        self.assertEqual(automation_manager.take_snapshot()["metrics"]["todos_urgent"], 1)
+
+        self._add_todo("urgent")
+        conn = sqlite3.connect(automation_manager.DB_PATH)
+        bucket = conn.execute(
+            "SELECT SUM(count) FROM workspace_summary WHERE table_name='todos' AND priority='urgent'"
+        ).fetchone()[0]
+        conn.close()
+        self.assertEqual(bucket, 2)
+        metrics = automation_manager.take_snapshot()["metrics"]
+        self.assertEqual((metrics["todos_urgent"], metrics["todos_pending"]), (2, 2))
+
+    def test_snapshot_with_tools_manager_health_schema(self):
+        """health_checks as tools_manager creates it does not break the snapshot."""
+        self.patch_db(tools_manager)
+        tools_manager.init_db()
+        tools_manager.run_health_check("db", lambda: {"success": True})
+
+        snapshot = automation_manager.take_snapshot()
+        self.assertEqual(snapshot["history"].get("degrading_series", []), [])
+        self.assertIn("issues", automation_manager.auto_review(snapshot))
+
+    def test_report_is_cached_until_data_changes(self):
+        """An unchanged snapshot reuses the artifact; a write invalidates it."""
+        _, markdown, cached = automation_manager.build_report("daily")
+        self.assertFalse(cached)
+        self.assertIn("# Automated System Report - Daily", markdown)
+        self.assertTrue((automation_manager.reports_dir() / "daily.json").exists())
+
+        _, _, cached = automation_manager.build_report("daily")
+        self.assertTrue(cached)
+
+        self._add_todo("high")
+        report, _, cached = automation_manager.build_report("daily")
+        self.assertFalse(cached)
+        self.assertEqual(report["review"]["metrics"]["todos_total"], 1)
+
+        conn = sqlite3.connect(automation_manager.DB_PATH)
+        reports = conn.execute("SELECT COUNT(*) FROM automated_reports").fetchone()[0]
+        conn.close()
+        self.assertEqual(reports, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
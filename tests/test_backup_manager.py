@@ -0,0 +1,150 @@
+"""Test online database backups"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+import backup_manager  # noqa: E402
+import backup_store  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestBackupManager(TempDirTestCase):
+    """Test suite for backups taken with the SQLite backup API"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(backup_manager)
+        self.patch(backup_manager, "BACKUP_DIR", self.tmp / "backups")
+        self.patch(backup_store, "STORE_DIR", self.tmp / "backups" / "store")
+
+        conn = sqlite3.connect(backup_manager.DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, body TEXT)")
+        conn.executemany("INSERT INTO items (body) VALUES (?)", [("x" * 500,)] * 200)
+        conn.commit()
+        conn.close()
+
+    def _count(self, path):
+        conn = sqlite3.connect(path)
+        count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_backup_in_steps_while_writing(self):
+        """A paged backup sees WAL contents and stays consistent under writes."""
+        writer = sqlite3.connect(backup_manager.DB_PATH, check_same_thread=False)
+        writer.execute("PRAGMA wal_autocheckpoint=0")
+        writer.execute("INSERT INTO items (body) VALUES ('in wal')")
+        writer.commit()
+
+        done = threading.Event()
+
+        def write():
+            while not done.is_set():
+                writer.execute("INSERT INTO items (body) VALUES ('during')")
+                writer.commit()
+                time.sleep(0.001)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            stats = backup_manager.backup_database(
+                verify=True, pages=4, pause=0.001, full=True
+            )
+        finally:
+            done.set()
+            thread.join()
+            writer.close()
+
+        self.assertEqual(stats["integrity"], "ok")
+        self.assertGreater(stats["steps"], 1)
+        self.assertGreater(stats["mb_per_s"], 0)
+        self.assertGreaterEqual(self._count(stats["path"]), 201)
+        self.assertEqual(list(backup_manager.BACKUP_DIR.glob("*.part")), [])
+
+    def test_restore_round_trip(self):
+        """Restoring a stored backup replaces the live contents in place."""
+        name = backup_manager.backup_database()["name"]
+        conn = sqlite3.connect(backup_manager.DB_PATH)
+        conn.execute("DELETE FROM items")
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(backup_manager.restore_backup(name))
+        self.assertEqual(self._count(backup_manager.DB_PATH), 200)
+        self.assertEqual(list(self.tmp.glob(".*.restore")), [])
+
+    def test_incremental_store_and_rotation(self):
+        """Repeat backups write only changed chunks; rotation collects the rest."""
+        self.patch(backup_store, "CHUNK_PAGES", 2)
+        first = backup_manager.backup_database()
+        conn = sqlite3.connect(backup_manager.DB_PATH)
+        conn.execute("UPDATE items SET body='changed' WHERE id=1")
+        conn.commit()
+        conn.close()
+        second = backup_store.put(backup_manager.DB_PATH, "workspace_20000101_000000")
+
+        self.assertLess(first["bytes_written"], first["bytes"])
+        self.assertLessEqual(second["written"], 2)
+        self.assertGreater(len(second["chunks"]), 2)
+        stats = backup_store.stats()
+        self.assertEqual(stats["backups"], 2)
+        self.assertGreater(stats["ratio"], 1)
+
+        backup_manager.rotate_backups(policy={"daily": 1})
+        self.assertEqual([m["name"] for m in backup_store.list_manifests()], [first["name"]])
+        self.assertEqual(backup_store.gc(), (0, 0))
+
+
+    def test_plan_rotation_over_hourly_backups(self):
+        """Each tier keeps its newest backup per bucket, even across gaps."""
+        start = datetime(2024, 1, 1)
+        backups = [
+            Path(f"workspace_{(start + timedelta(hours=h)):%Y%m%d_%H%M%S}.db")
+            for h in range(24 * 400)
+            if not (24 * 91 <= h < 24 * 121)  # no backups at all in April
+        ]
+        backups.append(Path("workspace_manual.db"))
+
+        plan = backup_manager.plan_rotation(backups)
+        keep = plan["keep"]
+        self.assertEqual(len(keep) + len(plan["delete"]), len(backups))
+        self.assertEqual(keep[Path("workspace_manual.db")], ["undated"])
+        self.assertEqual(keep[backups[-2]], ["daily", "weekly", "monthly"])
+        self.assertEqual(sum("daily" in tiers for tiers in keep.values()), 7)
+        self.assertEqual(sum("weekly" in tiers for tiers in keep.values()), 4)
+        self.assertEqual(sum("monthly" in tiers for tiers in keep.values()), 12)
+        monthly = sorted(p.stem for p, tiers in keep.items() if "monthly" in tiers)
+        self.assertEqual(monthly[:2], ["workspace_20240229_230000", "workspace_20240331_230000"])
+
+        plan = backup_manager.plan_rotation(backups, {"hourly": 3})
+        self.assertEqual(set(plan["keep"]), {backups[-1], *backups[-4:-1]})
+
+    def test_rotate_dry_run_deletes_nothing(self):
+        """A dry run reports the plan and leaves every backup in place."""
+        backup_manager.BACKUP_DIR.mkdir()
+        for day in (1, 2, 3):
+            (backup_manager.BACKUP_DIR / f"workspace_202401{day:02d}_120000.db").touch()
+
+        plan = backup_manager.rotate_backups(dry_run=True, policy={"daily": 1})
+        self.assertEqual(len(plan["delete"]), 2)
+        self.assertEqual(len(list(backup_manager.BACKUP_DIR.glob("*.db"))), 3)
+        backup_manager.rotate_backups(policy={"daily": 1})
+        self.assertEqual(
+            [p.name for p in backup_manager.BACKUP_DIR.glob("*.db")],
+            ["workspace_20240103_120000.db"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
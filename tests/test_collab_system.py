@@ -0,0 +1,118 @@
+"""Test collaboration notifications"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import unittest
+
+import audit_sink  # noqa: E402
+import collab_system  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestNotifications(TempDirTestCase):
+    """Test suite for notification fan-out and digests"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(collab_system)
+        collab_system.init_db()
+        for name in ("ana", "ben", "cy"):
+            collab_system.add_user(name, "maintainer")
+        collab_system.add_user("dee", "contributor")
+
+    def tearDown(self):
+        audit_sink.flush(collab_system.DB_PATH)
+
+    def test_role_fan_out(self):
+        """A role broadcast reaches every active member and nobody else."""
+        collab_system.update_user_role("cy", "contributor")
+        disc_id = collab_system.start_discussion("Release plan", "dee")
+
+        for user, expected in (("ana", 1), ("ben", 1), ("cy", 0), ("dee", 0)):
+            notes = collab_system.get_notifications(user)
+            self.assertEqual(len(notes), expected, user)
+        self.assertEqual(collab_system.get_notifications("ana")[0][4], f"discussion:{disc_id}")
+
+    def test_comment_notifies_participants_once(self):
+        """Commenters and the creator are notified, the author is not."""
+        disc_id = collab_system.start_discussion("Schema", "ana")
+        collab_system.add_comment(disc_id, "ben", "first")
+        collab_system.add_comment(disc_id, "ben", "second")
+        collab_system.add_comment(disc_id, "cy", "third")
+
+        comments = lambda user: [  # noqa: E731
+            n for n in collab_system.get_notifications(user) if n[2] == "comment"
+        ]
+        self.assertEqual(len(comments("ana")), 3)
+        self.assertEqual(len(comments("ben")), 1)
+        self.assertEqual(comments("cy"), [])
+
+    def test_digest_coalesces_until_read(self):
+        """Digest mode bumps one unread row per user and link."""
+        for i in range(3):
+            collab_system.notify_role("maintainer", "build", f"build {i} failed", "ci", digest=True)
+        collab_system.notify_user("ana", "build", "other job failed", "ci:other", digest=True)
+
+        notes = collab_system.get_notifications("ana")
+        self.assertEqual(len(notes), 2)
+        ci = next(n for n in notes if n[4] == "ci")
+        self.assertEqual((ci[3], ci[7]), ("build 2 failed", 3))
+
+        collab_system.mark_read(ci[0])
+        collab_system.notify_user("ana", "build", "build 3 failed", "ci", digest=True)
+        self.assertEqual(len(collab_system.get_notifications("ana", unread_only=True)), 2)
+
+
+    def test_unread_counters_follow_reads(self):
+        """Counters track inserts, digest bumps, reads and deletes."""
+        collab_system.notify_role("maintainer", "build", "failed", "ci", digest=True)
+        collab_system.notify_role("maintainer", "build", "failed again", "ci", digest=True)
+        collab_system.notify_user("ana", "assignment", "review this", "todo:1")
+        self.assertEqual(collab_system.unread_counts(), {"ana": 2, "ben": 1, "cy": 1})
+
+        first = collab_system.get_notifications("ana", unread_only=True)[0]
+        collab_system.mark_read(first[0])
+        self.assertEqual(collab_system.unread_count("ana"), 1)
+        self.assertEqual(collab_system.mark_all_read("ben"), 1)
+        self.assertEqual(collab_system.get_notifications("ben", unread_only=True), [])
+        self.assertEqual(collab_system.unread_counts(), {"ana": 1, "cy": 1})
+
+
+class TestThreads(TempDirTestCase):
+    """Test suite for threaded discussion loading"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(collab_system)
+        collab_system.init_db()
+
+    def tearDown(self):
+        audit_sink.flush(collab_system.DB_PATH)
+
+    def test_thread_order_and_subtree_pages(self):
+        """Replies follow their parent depth-first; pages hold whole subtrees."""
+        disc_id = collab_system.start_discussion("Design", "ana")
+        a = collab_system.add_comment(disc_id, "ana", "a")
+        b = collab_system.add_comment(disc_id, "ben", "b")
+        a1 = collab_system.add_comment(disc_id, "ben", "a1", reply_to=a)
+        b1 = collab_system.add_comment(disc_id, "ana", "b1", reply_to=b)
+        a1x = collab_system.add_comment(disc_id, "cy", "a1x", reply_to=a1)
+        a2 = collab_system.add_comment(disc_id, "cy", "a2", reply_to=a)
+
+        _, comments = collab_system.get_discussion(disc_id)
+        self.assertEqual([c[0] for c in comments], [a, a1, a1x, a2, b, b1])
+        self.assertEqual([c[6] for c in comments], [0, 1, 2, 1, 0, 1])
+
+        page = collab_system.get_thread(disc_id, limit=1)
+        self.assertEqual({c[7] for c in page}, {a})
+        page = collab_system.get_thread(disc_id, limit=1, after=page[-1][7])
+        self.assertEqual([c[0] for c in page], [b, b1])
+
+
+if __name__ == "__main__":
+    unittest.main()
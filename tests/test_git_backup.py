@@ -0,0 +1,90 @@
+"""Test git backup tag listing and cleanup"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import os
+import shutil
+import subprocess
+import unittest
+from datetime import datetime, timedelta
+
+import git_backup  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+@unittest.skipUnless(shutil.which("git"), "git not installed")
+class TestGitBackup(TempDirTestCase):
+    """Test suite for batched backup tag plumbing"""
+
+    def setUp(self):
+        super().setUp()
+        self.repo = self.tmp
+        self._git("init", "-q")
+        self._git("commit", "-q", "--allow-empty", "-m", "initial")
+
+        # reason -> ages in days
+        now = datetime.now()
+        for reason, ages in (("manual", (40, 20, 10, 1)), ("release", (300, 200))):
+            for age in ages:
+                stamp = now - timedelta(days=age)
+                env = {"GIT_COMMITTER_DATE": stamp.strftime("%Y-%m-%dT%H:%M:%S")}
+                tag = f"backup/{reason}/{stamp:%Y%m%d_%H%M%S}"
+                self._git("tag", "-a", tag, "-m", reason, env=env)
+
+    def _git(self, *args, env=None):
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": "test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            **(env or {}),
+        }
+        return subprocess.run(
+            ["git", "-C", str(self.repo), *args],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout
+
+    def _tags(self):
+        return self._git("tag", "-l", "backup/*").split()
+
+    def test_list_structured_records(self):
+        """Tags come back oldest first with their date and reason."""
+        backups = git_backup.list_git_backups(self.repo)
+        self.assertEqual(len(backups), 6)
+        self.assertEqual([b["reason"] for b in backups[:2]], ["release", "release"])
+        self.assertEqual(backups[-1]["reason"], "manual")
+        self.assertLess(datetime.now() - backups[-1]["date"], timedelta(days=2))
+
+    def test_keep_policy_deletes_in_one_batch(self):
+        """--keep rules combine; everything they don't cover is deleted."""
+        keep = ["15d", "release=1"]
+        self.assertEqual(git_backup.cleanup_old_backups(self.repo, keep=keep, dry_run=True), 0)
+        self.assertEqual(len(self._tags()), 6)
+
+        self.assertEqual(git_backup.cleanup_old_backups(self.repo, keep=keep), 3)
+        remaining = git_backup.list_git_backups(self.repo)
+        self.assertEqual([b["reason"] for b in remaining], ["release", "manual", "manual"])
+
+        self.assertEqual(git_backup.cleanup_old_backups(self.repo, keep_recent=1), 2)
+        self.assertEqual(len(self._tags()), 1)
+
+    def test_keep_specs(self):
+        """Specs parse into (reason, count, days) rules."""
+        args = ["cleanup", "repo", "--keep", "10", "--keep", "pre-release=30d"]
+        rules = git_backup.parse_keep(git_backup.keep_specs(args))
+        self.assertEqual(rules, [(None, 10, None), ("pre-release", None, 30)])
+        with self.assertRaises(ValueError):
+            git_backup.parse_keep(["soon"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Test maintenance task execution"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import time
+import unittest
+from datetime import datetime
+
+import maintenance_system  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class MaintenanceTestCase(TempDirTestCase):
+    """Base case: maintenance tables in a temporary database"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(maintenance_system)
+        maintenance_system.init_db()
+
+    def _make_due(self):
+        conn = sqlite3.connect(maintenance_system.DB_PATH)
+        conn.execute("UPDATE maintenance_tasks SET next_run=?", ("2000-01-01T00:00:00",))
+        conn.commit()
+        conn.close()
+
+
+class TestMaintenanceExecutor(MaintenanceTestCase):
+    """Test suite for the concurrent maintenance executor"""
+
+    def test_due_tasks_run_concurrently(self):
+        """Independent due tasks finish in roughly the time of the slowest one."""
+        for i in range(5):
+            maintenance_system.add_task(f"sleep{i}", "hourly", "sleep 0.4")
+        self._make_due()
+
+        start = time.monotonic()
+        results = maintenance_system.run_due_tasks()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertLess(elapsed, 1.5)
+
+        conn = sqlite3.connect(maintenance_system.DB_PATH)
+        executions = conn.execute("SELECT COUNT(*) FROM task_executions").fetchone()[0]
+        run_counts = conn.execute("SELECT SUM(run_count) FROM maintenance_tasks").fetchone()[0]
+        conn.close()
+        self.assertEqual(executions, 5)
+        self.assertEqual(run_counts, 5)
+
+    def test_resource_class_limits_concurrency(self):
+        """Tasks in a single-slot resource class run one at a time."""
+        for i in range(2):
+            maintenance_system.add_task(f"db{i}", "hourly", "sleep 0.3", resource_class="db")
+        self._make_due()
+
+        start = time.monotonic()
+        maintenance_system.run_due_tasks()
+        self.assertGreaterEqual(time.monotonic() - start, 0.6)
+
+    def test_priority_order(self):
+        """Higher priority tasks start first when workers are scarce."""
+        maintenance_system.add_task("low", "hourly", "true", priority="low")
+        maintenance_system.add_task("critical", "hourly", "true", priority="critical")
+        self._make_due()
+
+        results = maintenance_system.run_due_tasks(max_workers=1)
+        self.assertEqual([r["task"] for r in results], ["critical", "low"])
+
+
+class TestMaintenanceDag(MaintenanceTestCase):
+    """Test suite for dependency-aware execution"""
+
+    def _run(self):
+        self._make_due()
+        return maintenance_system.run_due_tasks()
+
+    def test_dependencies_run_in_order(self):
+        """A task starts only after its dependencies finish."""
+        log = self.tmp / "order.log"
+        maintenance_system.add_task("report", "hourly", f"echo report >> {log}", depends_on=["a"])
+        maintenance_system.add_task("a", "hourly", f"sleep 0.2; echo a >> {log}")
+        self._run()
+        self.assertEqual(log.read_text().split(), ["a", "report"])
+
+    def test_failed_dependency_skips_dependents(self):
+        """Dependents of a failed task are recorded as skipped."""
+        maintenance_system.add_task("broken", "hourly", "false")
+        maintenance_system.add_task("after", "hourly", "true", depends_on=["broken"])
+        statuses = {r["task"]: r["status"] for r in self._run()}
+        self.assertEqual(statuses, {"broken": "failed", "after": "skipped"})
+
+    def test_shared_lock_serializes(self):
+        """Tasks holding the same lock never overlap."""
+        for name in ("x", "y"):
+            maintenance_system.add_task(name, "hourly", "sleep 0.3", locks=["database"])
+        start = time.monotonic()
+        self._run()
+        self.assertGreaterEqual(time.monotonic() - start, 0.6)
+
+    def test_capability_graph_adds_edges(self):
+        """Capability dependencies order the tasks providing them."""
+        maintenance_system.register_capability("reporting", "feature", dependencies=["analysis"])
+        maintenance_system.register_capability("analysis", "feature")
+        tasks = [
+            {"name": "r", "capability": "reporting", "depends_on": []},
+            {"name": "an", "capability": "analysis", "depends_on": []},
+        ]
+        self.assertEqual(maintenance_system.build_task_graph(tasks), {"r": {"an"}, "an": set()})
+
+    def test_cycle_is_rejected(self):
+        """Cyclic dependencies raise instead of deadlocking."""
+        maintenance_system.add_task("p", "hourly", "true", depends_on=["q"])
+        maintenance_system.add_task("q", "hourly", "true", depends_on=["p"])
+        with self.assertRaises(ValueError):
+            self._run()
+
+    def test_missed_runs_are_coalesced(self):
+        """A long-overdue hourly task runs once and records the skipped slots."""
+        maintenance_system.add_task("hourly", "hourly", "true")
+        self.assertEqual(
+            maintenance_system.count_missed_runs(
+                "hourly", "2024-01-01T00:00:00", datetime(2024, 1, 1, 5, 30)
+            ),
+            6,
+        )
+        results = self._run()
+        self.assertEqual(len(results), 1)
+        conn = sqlite3.connect(maintenance_system.DB_PATH)
+        coalesced = conn.execute("SELECT coalesced FROM task_executions").fetchone()[0]
+        conn.close()
+        self.assertEqual(coalesced, maintenance_system.MAX_MISSED_RUNS - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
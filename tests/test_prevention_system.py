@@ -0,0 +1,159 @@
+"""Test compiled prevention rules and rate limiters"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import json
+import sqlite3
+import unittest
+
+import audit_sink  # noqa: E402
+import prevention_system  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class PreventionTestCase(TempDirTestCase):
+    """Base case: prevention tables in a temporary database"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(prevention_system)
+        prevention_system.init_db()
+
+    def tearDown(self):
+        self._drop_evaluators()
+        audit_sink.flush(prevention_system.DB_PATH)
+
+    def _drop_evaluators(self):
+        for evaluator in prevention_system._EVALUATORS.values():
+            evaluator.flush()
+            evaluator.conn.close()
+        prevention_system._EVALUATORS.clear()
+
+
+class TestPreventionRules(PreventionTestCase):
+    """Test suite for the compiled rule evaluator"""
+
+    def test_rule_changes_are_picked_up(self):
+        """Rules added after the first check are compiled on the next one."""
+        self.assertEqual(prevention_system.check_prevention_rules({"name": "Bad Name"}), [])
+
+        prevention_system.add_prevention_rule(
+            "slug", "validation", json.dumps({"field": "name", "pattern": r"[a-z_]+$"}), "block"
+        )
+        prevented = prevention_system.check_prevention_rules({"name": "Bad Name"})
+        self.assertEqual([p["rule"] for p in prevented], ["slug"])
+        self.assertEqual(prevention_system.check_prevention_rules({"name": "good_name"}), [])
+        self.assertEqual(prevention_system.get_prevention_stats()["total_prevented"], 1)
+
+    def test_malformed_rules_are_skipped(self):
+        """A rule that cannot compile is skipped; the others still apply."""
+        for name, type, condition in (
+            ("bad-regex", "validation", {"field": "name", "pattern": "("}),
+            ("no-rate", "rate_limit", {"component": "deploy", "max_per_minute": None}),
+            ("size", "size_limit", {"max_size": 5}),
+        ):
+            prevention_system.add_prevention_rule(name, type, json.dumps(condition), "block")
+
+        prevented = prevention_system.check_prevention_rules({"size": 10})
+        self.assertEqual([p["rule"] for p in prevented], ["size"])
+        self.assertEqual(prevention_system.check_prevention_rules({"name": "x", "size": 1}), [])
+
+    def test_rate_limit_uses_token_bucket(self):
+        """The limit trips after max_per_minute executions and survives a restart."""
+        prevention_system.add_prevention_rule(
+            "deploy-rate",
+            "rate_limit",
+            json.dumps({"component": "deploy", "max_per_minute": 3}),
+            "throttle",
+        )
+        for _ in range(2):
+            prevention_system.note_execution("deploy")
+        self.assertEqual(prevention_system.check_prevention_rules({}), [])
+
+        prevention_system.note_execution("deploy")
+        prevented = prevention_system.check_prevention_rules({})
+        self.assertEqual(prevented[0]["details"], {"rate": 3, "limit": 3})
+
+        # A new process starts from the persisted bucket
+        self._drop_evaluators()
+        self.assertEqual(len(prevention_system.check_prevention_rules({})), 1)
+
+    def _stored_tokens(self):
+        conn = sqlite3.connect(prevention_system.DB_PATH)
+        tokens = conn.execute("SELECT tokens FROM rate_limit_state").fetchone()[0]
+        conn.close()
+        return tokens
+
+    def test_processes_share_one_bucket(self):
+        """Evaluators spend in memory and reconcile into the same stored bucket."""
+        prevention_system.add_prevention_rule(
+            "deploy-rate",
+            "rate_limit",
+            json.dumps({"component": "deploy", "max_per_minute": 3}),
+            "throttle",
+        )
+        first = prevention_system.RuleEvaluator(prevention_system.DB_PATH)
+        second = prevention_system.RuleEvaluator(prevention_system.DB_PATH)
+        self.addCleanup(first.conn.close)
+        self.addCleanup(second.conn.close)
+
+        spent = [evaluator.note_execution("deploy") for evaluator in (first, second) * 2]
+        self.assertEqual(spent, [True] * 4)
+        self.assertEqual(first.check({}), [])
+
+        self.assertAlmostEqual(self._stored_tokens(), 3, places=1)
+        first.flush()
+        second.flush()
+        self.assertLess(self._stored_tokens(), 0.1)
+
+        self.assertEqual(len(first.check({})), 1)
+        self.assertEqual(len(second.check({})), 1)
+        self.assertFalse(second.note_execution("deploy"))
+
+    def test_bucket_refills(self):
+        """Tokens come back at max_per_minute / 60 per second."""
+        bucket = prevention_system.TokenBucket(6, 0.1, tokens=0, updated=100.0)
+        self.assertAlmostEqual(bucket.available(now=110.0), 1.0)
+        bucket.record(now=110.0)
+        self.assertAlmostEqual(bucket.available(now=200.0), 6.0)
+
+
+class TestGuardrails(PreventionTestCase):
+    """Test suite for cached guardrail checks"""
+
+    def _violation_rows(self):
+        conn = sqlite3.connect(prevention_system.DB_PATH)
+        count = conn.execute("SELECT COUNT(*) FROM guardrail_violations").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_batch_check_and_buffered_recording(self):
+        """Violations are returned per pair and written only on flush."""
+        prevention_system.add_guardrail("file-size", "size", json.dumps({"max": 100}))
+        prevention_system.add_guardrail("batch", "count", json.dumps({"min": 1, "max": 10}))
+
+        results = prevention_system.check_guardrails_batch(
+            [("size", 50), ("size", 500), ("count", 0), ("unknown", 1)]
+        )
+        self.assertEqual([len(r) for r in results], [0, 1, 1, 0])
+        self.assertEqual(results[1][0]["type"], "max_exceeded")
+        self.assertEqual(results[2][0]["type"], "min_violated")
+        self.assertEqual(self._violation_rows(), 0)
+
+        self._drop_evaluators()
+        self.assertEqual(self._violation_rows(), 2)
+
+    def test_guardrail_changes_are_seen(self):
+        """A guardrail added by another connection applies to the next check."""
+        self.assertEqual(prevention_system.check_guardrails("size", 500), [])
+        prevention_system.add_guardrail("file-size", "size", json.dumps({"max": 100}))
+        self.assertEqual(len(prevention_system.check_guardrails("size", 500)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Test compiled quality gate execution"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import json
+import sqlite3
+import statistics
+import unittest
+
+import audit_sink  # noqa: E402
+import quality_gate  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class QualityGateTestCase(TempDirTestCase):
+    """Base case: quality gate tables in a temporary database"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(quality_gate)
+        quality_gate.init_db()
+
+    def tearDown(self):
+        audit_sink.flush(quality_gate.DB_PATH)
+
+
+class TestQualityGate(QualityGateTestCase):
+    """Test suite for gate plans and the latest-metric index"""
+
+    def _insert_metric(self, component, metric, value, created_at):
+        conn = sqlite3.connect(quality_gate.DB_PATH)
+        conn.execute(
+            """INSERT INTO quality_metrics
+               (component, metric_name, value, threshold, status, created_at)
+               VALUES (?, ?, ?, 0, 'pass', ?)""",
+            (component, metric, value, created_at),
+        )
+        conn.commit()
+        conn.close()
+
+    def test_metric_rules_use_latest_value(self):
+        """Each metric rule sees the newest value, regardless of insert order."""
+        self._insert_metric("api", "coverage", 90, "2024-01-02T00:00:00")
+        self._insert_metric("api", "coverage", 50, "2024-01-01T00:00:00")
+        self._insert_metric("db", "coverage", 40, "2024-01-01T00:00:00")
+        rules = [
+            {"type": "metric", "component": "api", "metric": "coverage", "threshold": 80},
+            {"type": "metric", "component": "db", "metric": "coverage", "threshold": 80},
+            {"type": "metric", "component": "ui", "metric": "coverage", "threshold": 80},
+        ]
+        quality_gate.create_gate("ci", "standard", rules)
+
+        result = quality_gate.execute_gate("ci")
+        self.assertEqual([d["status"] for d in result["details"]], ["pass", "fail", "no_data"])
+        self.assertEqual((result["passed"], result["failed"]), (1, 2))
+
+    def test_deleting_latest_promotes_previous(self):
+        """Removing the newest sample falls back to the one before it."""
+        self._insert_metric("api", "coverage", 50, "2024-01-01T00:00:00")
+        self._insert_metric("api", "coverage", 90, "2024-01-02T00:00:00")
+        conn = sqlite3.connect(quality_gate.DB_PATH)
+        conn.execute("DELETE FROM quality_metrics WHERE value = 90")
+        conn.commit()
+        value = conn.execute("SELECT value FROM quality_metrics_latest").fetchone()[0]
+        conn.close()
+        self.assertEqual(value, 50)
+
+    def test_plan_recompiled_when_gate_changes(self):
+        """Editing a gate's rules invalidates the cached plan."""
+        self._insert_metric("api", "coverage", 70, "2024-01-01T00:00:00")
+        rule = {"type": "metric", "component": "api", "metric": "coverage", "threshold": 80}
+        quality_gate.create_gate("ci", "standard", [rule])
+        self.assertEqual(quality_gate.execute_gate("ci")["status"], "fail")
+
+        conn = sqlite3.connect(quality_gate.DB_PATH)
+        conn.execute(
+            "UPDATE quality_gates SET rules=? WHERE name='ci'",
+            (json.dumps([dict(rule, threshold=60)]),),
+        )
+        conn.commit()
+        conn.close()
+        self.assertEqual(quality_gate.execute_gate("ci")["status"], "pass")
+
+
+
+class TestMetricStats(QualityGateTestCase):
+    """Test suite for rolling metric statistics"""
+
+    def _alerts(self):
+        conn = sqlite3.connect(quality_gate.DB_PATH)
+        count = conn.execute("SELECT COUNT(*) FROM degradation_alerts").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_welford_matches_batch_statistics(self):
+        """Online mean and variance equal the batch results."""
+        values = [88.0, 91.5, 90.0, 87.25, 92.0, 89.0]
+        for value in values:
+            quality_gate.record_metric("api", "coverage", value, 0)
+
+        stats = quality_gate.get_metric_stats("api", "coverage")
+        self.assertEqual(stats["count"], len(values))
+        self.assertAlmostEqual(stats["mean"], statistics.mean(values))
+        self.assertAlmostEqual(stats["std"], statistics.stdev(values))
+        self.assertEqual(stats["recent"], values)
+
+    def test_outlier_raises_alert_but_noise_does_not(self):
+        """Only a drop well outside normal variation is reported as degradation."""
+        for value in [90, 92, 91, 89, 90, 91]:
+            quality_gate.record_metric("api", "coverage", value, 95)
+        self.assertEqual(self._alerts(), 0)
+
+        quality_gate.record_metric("api", "coverage", 60, 95)
+        self.assertEqual(self._alerts(), 1)
+        self.assertLess(quality_gate.get_metric_stats("api", "coverage")["last_z"], -2)
+
+
+
+class TestBulkIngestion(QualityGateTestCase):
+    """Test suite for bulk metric ingestion"""
+
+    def test_jsonl_and_csv_are_parsed(self):
+        """Both formats are detected and malformed rows are skipped."""
+        jsonl = ['{"component": "api", "metric": "coverage", "value": 90}', "not json", ""]
+        csv_lines = ["component,metric,value,threshold", "db, latency, 12.5, 0", "db,latency,x,0"]
+
+        result = quality_gate.record_metrics(
+            list(quality_gate.parse_metric_lines(jsonl))
+            + list(quality_gate.parse_metric_lines(csv_lines))
+        )
+        self.assertEqual((result["inserted"], result["skipped"], result["series"]), (2, 2, 2))
+        self.assertEqual(quality_gate.get_metric_stats("db", "latency")["mean"], 12.5)
+
+    def test_chunked_ingest_matches_single_records(self):
+        """Stats and latest values agree with per-sample recording."""
+        values = [90, 92, 91, 89, 90, 91, 60]
+        samples = [
+            {"component": "api", "metric": "coverage", "value": v, "threshold": 95}
+            for v in values
+        ]
+        result = quality_gate.record_metrics(samples, chunk_size=3)
+        self.assertEqual(result["inserted"], len(values))
+        self.assertEqual(result["alerts"], 1)
+
+        stats = quality_gate.get_metric_stats("api", "coverage")
+        self.assertEqual(stats["count"], len(values))
+        self.assertAlmostEqual(stats["mean"], statistics.mean(values))
+
+        conn = sqlite3.connect(quality_gate.DB_PATH)
+        latest = conn.execute("SELECT value FROM quality_metrics_latest").fetchone()[0]
+        conn.close()
+        self.assertEqual(latest, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Test retention rollups and pruning"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+from datetime import datetime, timedelta
+
+import retention  # noqa: E402
+import time_index  # noqa: E402
+import tools_manager  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+class TestRetention(TempDirTestCase):
+    """Test suite for the retention engine"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(retention, time_index, tools_manager)
+        tools_manager.init_db()
+        retention.init_db()
+
+        # Two old executions in one hour, one old a day later, one recent
+        stamps = [
+            (NOW - timedelta(days=40, minutes=10), "success", 1.0),
+            (NOW - timedelta(days=40, minutes=5), "failure", 3.0),
+            (NOW - timedelta(days=39), "success", 2.0),
+            (NOW - timedelta(days=1), "success", 5.0),
+        ]
+        conn = sqlite3.connect(retention.DB_PATH)
+        conn.executemany(
+            """INSERT INTO tool_executions (tool_id, status, runtime, created_at)
+                     VALUES (1, ?, ?, ?)""",
+            [(status, runtime, stamp.isoformat()) for stamp, status, runtime in stamps],
+        )
+        conn.commit()
+        conn.close()
+
+    def _remaining(self):
+        conn = sqlite3.connect(retention.DB_PATH)
+        count = conn.execute("SELECT COUNT(*) FROM tool_executions").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_rollup_then_prune_in_batches(self):
+        """Expired rows become hourly aggregates with histograms; recent rows stay."""
+        result = retention.run_retention(now=NOW, batch_size=1, tables=["tool_executions"])
+        self.assertEqual(result["tables"][0]["rolled_up"], 3)
+        self.assertEqual(self._remaining(), 1)
+
+        hourly = retention.get_rollups("tool_executions", resolution="hour")
+        self.assertEqual([r["count"] for r in hourly], [2, 1])
+        first = hourly[0]
+        self.assertEqual((first["sum"], first["min"], first["max"]), (4.0, 1.0, 3.0))
+        self.assertEqual(first["histogram"], {"failure": 1, "success": 1})
+
+    def test_hourly_rollups_coarsen_to_daily(self):
+        """Hourly buckets past their retention merge into daily ones."""
+        retention.set_policy("tool_executions", raw_days=30, hourly_days=30)
+        retention.run_retention(now=NOW, tables=["tool_executions"])
+        retention.run_retention(now=NOW + timedelta(days=5), tables=["tool_executions"])
+
+        self.assertEqual(retention.get_rollups("tool_executions", resolution="hour"), [])
+        daily = retention.get_rollups("tool_executions", resolution="day")
+        self.assertEqual(sum(r["count"] for r in daily), 3)
+        self.assertEqual(sum(sum(r["histogram"].values()) for r in daily), 3)
+        self.assertEqual(min(r["min"] for r in daily), 1.0)
+
+    def test_incremental_vacuum(self):
+        """Free pages are reclaimed once incremental vacuum is enabled."""
+        self.assertTrue(retention.enable_incremental_vacuum())
+        result = retention.run_retention(now=NOW)
+        self.assertIsNotNone(result["pages_freed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
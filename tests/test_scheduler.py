@@ -0,0 +1,127 @@
+"""Test cron parsing and the scheduler daemon"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+from datetime import datetime
+
+import cron_utils  # noqa: E402
+import maintenance_system  # noqa: E402
+import scheduler  # noqa: E402
+import task_automator  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestCronUtils(unittest.TestCase):
+    """Test suite for cron expression parsing"""
+
+    def test_cron_next(self):
+        """Common expressions resolve to the expected next run."""
+        base = datetime(2024, 1, 31, 10, 30)  # Wednesday
+        self.assertEqual(cron_utils.cron_next("*/15 * * * *", base), datetime(2024, 1, 31, 10, 45))
+        self.assertEqual(cron_utils.cron_next("0 2 * * *", base), datetime(2024, 2, 1, 2, 0))
+        self.assertEqual(cron_utils.cron_next("0 3 * * 0", base), datetime(2024, 2, 4, 3, 0))
+        self.assertEqual(cron_utils.cron_next("@monthly", base), datetime(2024, 2, 1, 0, 0))
+        self.assertEqual(cron_utils.cron_next("0 0 1 1 *", base), datetime(2025, 1, 1, 0, 0))
+
+    def test_invalid_expressions(self):
+        """Malformed or impossible expressions raise ValueError."""
+        for expr in ("61 * * * *", "* * *", "0 0 31 2 *", "*/0 * * * *"):
+            with self.assertRaises(ValueError):
+                cron_utils.cron_next(expr, datetime(2024, 1, 1))
+
+    def test_calculate_next_run_accepts_cron(self):
+        """maintenance_system schedules understand cron expressions."""
+        next_run = maintenance_system.calculate_next_run("30 4 * * *", datetime(2024, 1, 1, 5))
+        self.assertEqual(next_run, "2024-01-02T04:30:00")
+
+
+class TestScheduler(TempDirTestCase):
+    """Test suite for the deadline heap"""
+
+    def setUp(self):
+        super().setUp()
+        self.db_path = self.patch_db(maintenance_system, scheduler, task_automator)
+        scheduler.init_db()
+
+    def test_tick_runs_due_tasks_and_reloads_on_change(self):
+        """Due tasks are dispatched, and only task table edits trigger a reload."""
+        maintenance_system.add_task("due", "hourly", "true")
+        maintenance_system.add_task("later", "daily", "true")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE maintenance_tasks SET next_run='2000-01-01T00:00:00' WHERE name='due'")
+        conn.commit()
+
+        daemon = scheduler.Scheduler()
+        started = daemon.tick()
+        daemon.join()
+        self.assertEqual([t["name"] for t in started], ["due"])
+        self.assertEqual(daemon.upcoming(1)[0][2], "due")
+
+        # Recording the run changed the tasks table; an unrelated write does not
+        self.assertTrue(daemon.tasks_changed())
+        conn.execute("CREATE TABLE unrelated (x)")
+        conn.execute("INSERT INTO unrelated VALUES (1)")
+        conn.commit()
+        self.assertFalse(daemon.tasks_changed())
+
+        conn.execute("UPDATE maintenance_tasks SET enabled=0 WHERE name='later'")
+        conn.commit()
+        conn.close()
+        self.assertTrue(daemon.tasks_changed())
+        daemon.close()
+
+    def _tasks(self, daemon):
+        daemon.load()
+        return {task["name"]: dict(task, missed=1) for _, _, _, task in daemon.heap}
+
+    def test_locks_hold_across_batches(self):
+        """A batch dispatched later waits for a lock held by an earlier one."""
+        log = self.tmp / "order.log"
+        for name in ("backup", "report"):
+            maintenance_system.add_task(
+                name,
+                "daily",
+                f"echo {name} >> {log}; sleep 0.2; echo {name} >> {log}",
+                locks=["database"],
+            )
+        daemon = scheduler.Scheduler()
+        tasks = self._tasks(daemon)
+        daemon._dispatch([tasks["backup"]])
+        daemon._dispatch([tasks["report"]])
+        daemon.join()
+        daemon.close()
+        first, second = log.read_text().split()[::2]
+        self.assertEqual(log.read_text().split(), [first, first, second, second])
+        self.assertEqual({first, second}, {"backup", "report"})
+
+    def test_dependency_resolved_from_last_run(self):
+        """A task is skipped when a dependency outside its batch last failed."""
+        maintenance_system.add_task("analyze", "daily", "false")
+        maintenance_system.add_task("report", "daily", "true", depends_on=["analyze"])
+        daemon = scheduler.Scheduler()
+        tasks = self._tasks(daemon)
+
+        daemon._dispatch([tasks["analyze"]])
+        daemon.join()
+        daemon._dispatch([tasks["report"]])
+        daemon.join()
+        daemon.close()
+
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            """SELECT t.name, e.status FROM task_executions e
+               JOIN maintenance_tasks t ON t.id = e.task_id ORDER BY e.id"""
+        ).fetchall()
+        conn.close()
+        self.assertEqual(rows, [("analyze", "failed"), ("report", "skipped")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""Test session state caching"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import json
+import sqlite3
+import unittest
+
+import session_manager  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class SessionTestCase(TempDirTestCase):
+    """Base case: session tables in a temporary database"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(session_manager)
+        session_manager.init_db()
+        self.session_id = session_manager.start_session("alice", "work")
+
+
+class TestSessionState(SessionTestCase):
+    """Test suite for SessionState"""
+
+    def test_writes_batch_until_commit(self):
+        """Reads come from memory and dirty keys are written together on commit."""
+        session_manager.set_state(self.session_id, "step", 1)
+        state = session_manager.open_state(self.session_id, interval=None)
+        self.assertEqual(state.get("step"), 1)
+
+        for step in range(2, 20):
+            state.set("step", step)
+        state.set("goal", {"done": False})
+        self.assertEqual(session_manager.get_state(self.session_id, "step"), 1)
+
+        self.assertEqual(state.commit(), 2)
+        self.assertEqual(
+            session_manager.get_all_state(self.session_id), {"step": 19, "goal": {"done": False}}
+        )
+
+    def test_concurrent_writers_conflict(self):
+        """A stale handle refuses to overwrite a key changed by another writer."""
+        session_manager.set_state(self.session_id, "owner", "a")
+        first = session_manager.open_state(self.session_id, interval=None)
+        second = session_manager.open_state(self.session_id, interval=None)
+
+        with first:
+            first.set("owner", "first")
+        second.set("owner", "second")
+        second.set("other", 1)
+        with self.assertRaises(session_manager.StateConflict) as ctx:
+            second.commit()
+        self.assertEqual(ctx.exception.keys, ["owner"])
+        self.assertEqual(session_manager.get_all_state(self.session_id), {"owner": "first"})
+
+        # After reloading the handle can write again, including deletes
+        second.reload()
+        second.delete("owner")
+        second.commit()
+        self.assertEqual(session_manager.get_all_state(self.session_id), {})
+
+    def test_new_key_created_elsewhere_conflicts(self):
+        """Two handles creating the same key do not silently overwrite each other."""
+        first = session_manager.open_state(self.session_id, interval=None)
+        second = session_manager.open_state(self.session_id, interval=None)
+        first.set("lock", "first")
+        first.commit()
+        second.set("lock", "second")
+        with self.assertRaises(session_manager.StateConflict):
+            second.commit()
+
+
+class TestSessionMessages(SessionTestCase):
+    """Test suite for paginated, compressed and archived messages"""
+
+    def _add(self, count):
+        return [
+            session_manager.add_message(self.session_id, "user", f"message {i}")
+            for i in range(count)
+        ]
+
+    def test_keyset_pagination(self):
+        """Pages walk backwards by id without gaps or repeats."""
+        ids = self._add(7)
+        newest = session_manager.get_messages(self.session_id, limit=3)
+        self.assertEqual([m[0] for m in newest], ids[4:])
+        older = session_manager.get_messages(self.session_id, limit=3, before_id=newest[0][0])
+        self.assertEqual([m[0] for m in older], ids[1:4])
+        self.assertEqual([m[0] for m in session_manager.iter_messages(self.session_id, 2)], ids)
+
+    def test_large_bodies_are_compressed(self):
+        """Large bodies are stored compressed and read back unchanged."""
+        body = "traceback line\n" * 500
+        msg_id = session_manager.add_message(self.session_id, "tool", body)
+
+        conn = sqlite3.connect(session_manager.DB_PATH)
+        stored, encoding = conn.execute(
+            "SELECT content, encoding FROM session_messages WHERE id=?", (msg_id,)
+        ).fetchone()
+        conn.close()
+        self.assertEqual(encoding, "zlib")
+        self.assertLess(len(stored), len(body) // 10)
+        self.assertEqual(session_manager.get_messages(self.session_id)[0][3], body)
+        self.assertEqual(len(session_manager.search_messages("alice", "TRACEBACK")), 1)
+
+    def test_ended_sessions_are_archived(self):
+        """Archived sessions leave the hot table but stay readable."""
+        ids = self._add(5)
+        session_manager.end_session(self.session_id)
+        totals = session_manager.archive_sessions(days=-1)
+        self.assertEqual((totals["sessions"], totals["messages"]), (1, 5))
+
+        conn = sqlite3.connect(session_manager.DB_PATH)
+        hot = conn.execute("SELECT COUNT(*) FROM session_messages").fetchone()[0]
+        conn.close()
+        self.assertEqual(hot, 0)
+
+        page = session_manager.get_messages(self.session_id, limit=2, before_id=ids[3])
+        self.assertEqual([m[3] for m in page], ["message 1", "message 2"])
+        self.assertEqual(session_manager.get_session_summary(self.session_id)["messages"], 5)
+
+    def test_live_sessions_never_open_the_archive(self):
+        """Short pages of live sessions don't attach or read cold storage."""
+        self.patch(session_manager, "ARCHIVE_PATH", self.tmp / "archive.db")
+        ids = self._add(3)
+
+        self.assertEqual(len(session_manager.get_messages(self.session_id)), 3)
+        self.assertEqual(len(list(session_manager.iter_messages(self.session_id))), 3)
+        self.assertEqual(len(session_manager.get_message_context(self.session_id, ids[1])), 3)
+        self.assertEqual(session_manager.get_session_summary(self.session_id)["messages"], 3)
+        self.assertFalse(session_manager.ARCHIVE_PATH.exists())
+
+        session_manager.end_session(self.session_id)
+        session_manager.archive_sessions(days=-1)
+        self.assertTrue(session_manager.ARCHIVE_PATH.exists())
+        self.assertEqual([m[0] for m in session_manager.get_messages(self.session_id)], ids)
+
+
+class TestSessionSearch(SessionTestCase):
+    """Test suite for full-text search over session history"""
+
+    def test_ranked_hits_with_snippets(self):
+        """Hits are ranked, highlighted and scoped to the user."""
+        session_manager.add_message(self.session_id, "user", "fix the flaky scheduler test")
+        session_manager.add_message(self.session_id, "user", "scheduler scheduler scheduler")
+        session_manager.add_message(self.session_id, "user", "unrelated")
+        other = session_manager.start_session("bob")
+        session_manager.add_message(other, "user", "scheduler for bob")
+
+        hits = session_manager.search_history("alice", "scheduler")
+        self.assertEqual(len(hits), 2)
+        self.assertIn("[scheduler]", hits[0]["snippet"])
+        self.assertLessEqual(hits[0]["score"], hits[1]["score"])
+        self.assertEqual(session_manager.search_history("alice", 'sched* "'), hits)
+
+    def test_compressed_and_archived_messages_are_found(self):
+        """Compressed bodies are indexed and archival keeps sessions searchable."""
+        session_manager.add_message(self.session_id, "user", "plan the migration")
+        msg_id = session_manager.add_message(
+            self.session_id, "tool", "noise " * 300 + "needle " + "noise " * 300
+        )
+        bookmark = session_manager.add_bookmark(self.session_id, "migration plan", message_id=1)
+        session_manager.end_session(self.session_id)
+        session_manager.archive_sessions(days=-1)
+
+        hits = session_manager.search_history("alice", "needle")
+        self.assertEqual([h["message_id"] for h in hits], [msg_id])
+        self.assertEqual(hits[0]["bookmark"]["id"], bookmark)
+        context = session_manager.get_message_context(self.session_id, msg_id, before=1)
+        self.assertEqual([m[0] for m in context], [1, msg_id])
+
+    def test_search_messages_keeps_row_shape(self):
+        """search_messages returns full content and metadata, hot or archived."""
+        session_manager.add_message(self.session_id, "user", "deploy now", {"source": "cli"})
+        body = "noise " * 300 + "deploy " + "noise " * 300
+        session_manager.add_message(self.session_id, "tool", body)
+
+        hot = session_manager.search_messages("alice", "deploy")
+        self.assertEqual(sorted(m[3] for m in hot), sorted(["deploy now", body]))
+        cli = next(m for m in hot if m[3] == "deploy now")
+        self.assertEqual((json.loads(cli[4]), len(cli)), ({"source": "cli"}, 7))
+
+        session_manager.end_session(self.session_id)
+        session_manager.archive_sessions(days=-1)
+        self.assertEqual(session_manager.search_messages("alice", "deploy"), hot)
+
+
+if __name__ == "__main__":
+    unittest.main()
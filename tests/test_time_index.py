@@ -0,0 +1,131 @@
+"""Test epoch columns and monthly partitions"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+from datetime import datetime
+
+import health_monitor  # noqa: E402
+import time_index  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestTimeIndex(TempDirTestCase):
+    """Test suite for integer timestamps and time partitions"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(time_index)
+
+        conn = sqlite3.connect(time_index.DB_PATH)
+        conn.execute(
+            """CREATE TABLE health_checks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL,
+            data TEXT,
+            checked_at TEXT NOT NULL
+        )"""
+        )
+        stamps = [
+            datetime(2024, 1, 5, 12, 0, 0, 250000),
+            datetime(2024, 1, 20),
+            datetime(2024, 2, 3),
+            datetime(2024, 3, 1, 8, 30),
+        ]
+        conn.executemany(
+            "INSERT INTO health_checks (status, checked_at) VALUES (?, ?)",
+            [("HEALTHY", stamp.isoformat()) for stamp in stamps],
+        )
+        conn.commit()
+        conn.close()
+        time_index.init_db()
+
+    def _query(self, sql, params=()):
+        conn = sqlite3.connect(time_index.DB_PATH)
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def test_epoch_column_matches_python(self):
+        """The generated column agrees with epoch_ms and is used by range queries."""
+        checked_at, ts_ms = self._query("SELECT checked_at, ts_ms FROM health_checks")[0]
+        self.assertEqual(ts_ms, time_index.epoch_ms(checked_at))
+
+        plan = self._query(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM health_checks WHERE ts_ms > ?", (0,)
+        )
+        self.assertIn("idx_health_checks_ts_ms", " ".join(row[-1] for row in plan))
+
+    def test_partition_and_window(self):
+        """Old months move into partitions; windows read only what overlaps."""
+        moved = time_index.partition_table("health_checks", before=datetime(2024, 3, 15))
+        self.assertEqual(moved, {"202401": 2, "202402": 1})
+        self.assertEqual(self._query("SELECT COUNT(*) FROM health_checks")[0][0], 1)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM health_checks_all")[0][0], 4)
+
+        rows = time_index.query_window(
+            "health_checks", datetime(2024, 1, 10), datetime(2024, 2, 10), columns="id"
+        )
+        self.assertEqual([row[0] for row in rows], [2, 3])
+
+        conn = sqlite3.connect(time_index.DB_PATH)
+        start = time_index.epoch_ms(datetime(2024, 2, 10))
+        source = time_index.window_source(conn.cursor(), "health_checks", start)
+        conn.close()
+        self.assertIn("health_checks_p202402", source)
+        self.assertNotIn("health_checks_p202401", source)
+
+    def test_purge_drops_whole_partitions(self):
+        """Retention drops expired partitions and trims the boundary one."""
+        time_index.partition_table("health_checks", before=datetime(2024, 3, 15))
+        result = time_index.purge_before("health_checks", datetime(2024, 2, 2))
+        self.assertEqual(result, {"dropped": ["health_checks_p202401"], "deleted": 0})
+        self.assertEqual(self._query("SELECT COUNT(*) FROM health_checks_all")[0][0], 2)
+
+    def test_session_messages_are_never_partitioned(self):
+        """Conversation state gets ts_ms but stays out of partitioning."""
+        conn = sqlite3.connect(time_index.DB_PATH)
+        conn.execute("CREATE TABLE session_messages (id INTEGER PRIMARY KEY, created_at TEXT)")
+        conn.execute("INSERT INTO session_messages (created_at) VALUES ('2020-01-01T00:00:00')")
+        conn.commit()
+        conn.close()
+        time_index.init_db()
+
+        self.assertEqual(self._query("SELECT ts_ms > 0 FROM session_messages"), [(1,)])
+        with self.assertRaises(ValueError):
+            time_index.partition_table("session_messages")
+        self.assertEqual(self._query("SELECT COUNT(*) FROM session_messages"), [(1,)])
+
+    def test_readers_migrate_lazily(self):
+        """Readers add ts_ms to unmigrated tables, or fall back to the ISO text."""
+        db_path = self.tmp / "old.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE health_checks (id INTEGER PRIMARY KEY, status, checked_at)")
+        conn.execute("CREATE TABLE prevention_events (id INTEGER PRIMARY KEY, created_at)")
+        now = datetime.now().isoformat()
+        conn.execute("INSERT INTO health_checks VALUES (1, 'HEALTHY', ?)", (now,))
+        conn.execute("INSERT INTO prevention_events VALUES (1, ?)", (now,))
+        conn.commit()
+        conn.close()
+
+        self.patch_db(health_monitor, name="old.db")
+        self.assertEqual(len(health_monitor.get_health_history()), 1)
+
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        c = conn.cursor()
+        self.assertEqual(time_index.epoch_column(c, "health_checks"), "ts_ms")
+        ts = time_index.epoch_column(c, "prevention_events")
+        self.assertNotEqual(ts, "ts_ms")
+        count = c.execute(f"SELECT COUNT(*) FROM prevention_events WHERE {ts} > 0").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Test incremental tool discovery"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import os
+import unittest
+
+import tools_manager  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestToolDiscovery(TempDirTestCase):
+    """Test suite for tools_manager.sync_tools"""
+
+    def setUp(self):
+        super().setUp()
+        self.workspace = self.tmp / "scripts"
+        self.workspace.mkdir()
+        self.patch_db(tools_manager)
+        tools_manager.init_db()
+
+    def test_sync_adds_updates_and_retires(self):
+        """New scripts are added, touched ones updated, removed ones retired."""
+        (self.workspace / "alpha.py").write_text("print('a')\n")
+        (self.workspace / "beta.sh").write_text("echo b\n")
+
+        changes = tools_manager.sync_tools(self.workspace)
+        self.assertEqual(sorted(changes["added"]), ["alpha", "beta"])
+
+        # Unchanged directory is a no-op
+        changes = tools_manager.sync_tools(self.workspace)
+        self.assertEqual(changes, {"added": [], "updated": [], "retired": []})
+
+        alpha = self.workspace / "alpha.py"
+        stat = alpha.stat()
+        os.utime(alpha, (stat.st_atime, stat.st_mtime + 10))
+        (self.workspace / "beta.sh").unlink()
+
+        changes = tools_manager.sync_tools(self.workspace)
+        self.assertEqual(changes["updated"], ["alpha"])
+        self.assertEqual(changes["retired"], ["beta"])
+        self.assertEqual(tools_manager.get_tool("beta")[7], "retired")
+
+        # A script that comes back is reactivated
+        (self.workspace / "beta.sh").write_text("echo b\n")
+        changes = tools_manager.sync_tools(self.workspace)
+        self.assertEqual(changes["updated"], ["beta"])
+        self.assertEqual(tools_manager.get_tool("beta")[7], "active")
+
+    def test_manual_tools_are_not_retired(self):
+        """Manually registered tools are left alone by discovery."""
+        tools_manager.register_tool("manual", "shell", "echo hi")
+        changes = tools_manager.sync_tools(self.workspace)
+        self.assertEqual(changes["retired"], [])
+        self.assertEqual(tools_manager.get_tool("manual")[7], "active")
+
+
+if __name__ == "__main__":
+    unittest.main()
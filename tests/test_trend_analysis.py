@@ -0,0 +1,109 @@
+"""Test vectorized trend analysis"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+
+import quality_gate  # noqa: E402
+import trend_analysis  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+MODULES = (quality_gate, trend_analysis)
+
+
+@unittest.skipIf(trend_analysis.np is None, "numpy not installed")
+class TestTrendAnalysis(TempDirTestCase):
+    """Test suite for the all-series degradation scan"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(*MODULES)
+        quality_gate.init_db()
+
+    def _push(self, component, values):
+        quality_gate.record_metrics(
+            {
+                "component": component,
+                "metric": "coverage",
+                "value": value,
+                "created_at": f"2024-01-01T00:{i:02d}:00",
+            }
+            for i, value in enumerate(values)
+        )
+
+    def test_flags_only_degrading_series(self):
+        """A step down is detected; a noisy but flat series is not."""
+        self._push("flat", [90, 91, 89, 90, 92, 90, 91, 89, 90, 91, 90, 89])
+        self._push("drop", [90, 91, 89, 90, 92, 90, 70, 71, 69, 70, 71, 70])
+        self._push("short", [50])
+
+        results = {r["component"]: r for r in trend_analysis.analyze_series()}
+        self.assertEqual(set(results), {"flat", "drop", "short"})
+        self.assertFalse(results["flat"]["degrading"])
+        self.assertFalse(results["short"]["degrading"])
+        self.assertTrue(results["drop"]["degrading"])
+        self.assertEqual(results["drop"]["change_at"], "2024-01-01T00:06:00")
+
+    def test_lower_is_better_for_runtimes(self):
+        """Rising tool runtimes count as degradation."""
+        conn = sqlite3.connect(trend_analysis.DB_PATH)
+        conn.execute("CREATE TABLE tools (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute(
+            """CREATE TABLE tool_executions (
+                id INTEGER PRIMARY KEY, tool_id INTEGER, runtime REAL, created_at TEXT)"""
+        )
+        conn.executemany(
+            "INSERT INTO tool_executions (tool_id, runtime, created_at) VALUES (1, ?, ?)",
+            [(1.0 if i < 6 else 3.0, f"2024-01-01T00:{i:02d}:00") for i in range(12)],
+        )
+        conn.commit()
+        conn.close()
+
+        (result,) = trend_analysis.analyze_series()
+        self.assertEqual((result["source"], result["component"]), ("runtime", "tool#1"))
+        self.assertTrue(result["degrading"])
+
+    def test_alerts_written_once(self):
+        """Bulk alerts skip series that already have an open alert."""
+        self._push("drop", [90, 91, 89, 90, 92, 90, 70, 71, 69, 70, 71, 70])
+        self.assertEqual(trend_analysis.write_alerts(trend_analysis.analyze_series()), 1)
+        self.assertEqual(trend_analysis.write_alerts(trend_analysis.analyze_series()), 0)
+
+    def test_health_source_follows_either_schema(self):
+        """health_checks is read by component/created_at or as one checked_at series."""
+        conn = sqlite3.connect(trend_analysis.DB_PATH)
+        conn.execute(
+            """CREATE TABLE health_checks (
+                id INTEGER PRIMARY KEY, component TEXT, status TEXT, message TEXT,
+                created_at TEXT)"""
+        )
+        conn.executemany(
+            "INSERT INTO health_checks (component, status, created_at) VALUES (?, ?, ?)",
+            [
+                ("db", "healthy" if i < 6 else "error", f"2024-01-01T00:{i:02d}:00")
+                for i in range(12)
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        results = [r for r in trend_analysis.analyze_series() if r["source"] == "health"]
+        self.assertEqual([r["component"] for r in results], ["db"])
+        self.assertTrue(results[0]["degrading"])
+
+        conn = sqlite3.connect(trend_analysis.DB_PATH)
+        conn.execute("DROP TABLE health_checks")
+        conn.execute("CREATE TABLE health_checks (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.commit()
+        conn.close()
+        self.assertEqual(trend_analysis.analyze_series(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Test the ws command registry"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import io
+import subprocess
+import unittest
+from contextlib import redirect_stdout
+
+import workspace_cli  # noqa: E402
+
+
+class TestWorkspaceCli(unittest.TestCase):
+    """Test suite for lazy command dispatch"""
+
+    def _run(self, *args):
+        argv, sys.argv = sys.argv, ["ws", *args]
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                workspace_cli.main()
+        finally:
+            sys.argv = argv
+        return out.getvalue()
+
+    def test_help_imports_no_system_modules(self):
+        """Start-up loads only the CLI; system modules wait for their command."""
+        code = (
+            "import sys, workspace_cli; sys.argv = ['ws', 'help']; workspace_cli.main(); "
+            "print(' '.join(sys.modules))"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True
+        )
+        loaded = set(proc.stdout.strip().splitlines()[-1].split())
+        system_modules = {p.stem for p in SRC_DIR.glob("*.py")}
+        self.assertEqual(loaded & system_modules, {"workspace_cli"})
+
+    def test_dispatch(self):
+        """Registered commands run; unknown or short command lines explain themselves."""
+        self.assertIn("Workspace CLI", self._run("help"))
+        self.assertIn("Unknown command: nope", self._run("nope"))
+        self.assertIn("Missing arguments for: ws init", self._run("init"))
+        for name in ("backup", "health", "tasks", "improve", "optimize", "search"):
+            self.assertIn(name, workspace_cli.COMMANDS)
+
+    def test_benchmark_startup(self):
+        """The start-up benchmark times fresh processes and counts their modules."""
+        result = workspace_cli.benchmark_startup(commands=(["help"],), runs=1)["help"]
+        self.assertGreater(result["best"], 0)
+        self.assertGreater(result["modules"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Test the trigger-maintained workspace summary"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import sqlite3
+import unittest
+
+import workspace_summary  # noqa: E402
+from tests.helpers import TempDirTestCase  # noqa: E402
+
+
+class TestWorkspaceSummary(TempDirTestCase):
+    """Test suite for summary counts kept in sync by triggers"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch_db(workspace_summary)
+        conn = sqlite3.connect(workspace_summary.DB_PATH)
+        conn.execute("CREATE TABLE todos (id INTEGER PRIMARY KEY, status TEXT, priority TEXT)")
+        conn.executemany(
+            "INSERT INTO todos (status, priority) VALUES (?, ?)",
+            [("pending", "urgent"), ("pending", "high")],
+        )
+        conn.commit()
+        conn.close()
+
+    def _execute(self, sql, params=()):
+        conn = sqlite3.connect(workspace_summary.DB_PATH)
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+
+    def test_backfill_on_first_read(self):
+        """Rows that predate the triggers are counted."""
+        todos = workspace_summary.get_summary()["todos"]
+        self.assertEqual(todos["total"], 2)
+        self.assertEqual(todos["priority"], {"urgent": 1, "high": 1})
+
+    def test_triggers_track_writes(self):
+        """Inserts, updates and deletes move counts between buckets."""
+        workspace_summary.get_summary()
+        self._execute("INSERT INTO todos (status, priority) VALUES ('pending', 'urgent')")
+        self._execute("UPDATE todos SET status='done' WHERE priority='high'")
+        self._execute("DELETE FROM todos WHERE id=1")
+
+        todos = workspace_summary.get_summary()["todos"]
+        self.assertEqual(todos["total"], 2)
+        self.assertEqual(todos["status"], {"pending": 1, "done": 1})
+        self.assertEqual(todos["priority"], {"urgent": 1, "high": 1})
+
+    def test_refresh_matches_triggers(self):
+        """A full rebuild agrees with the incrementally maintained counts."""
+        workspace_summary.get_summary()
+        self._execute("UPDATE todos SET priority='low'")
+        before = workspace_summary.get_summary()
+        workspace_summary.refresh_summary()
+        self.assertEqual(workspace_summary.get_summary(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()